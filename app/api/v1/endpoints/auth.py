@@ -5,14 +5,14 @@ from app.db.session import get_db
 from app.services.user import UserService
 from app.repositories.user import UserRepository
 from app.schemas.user import Token
-from app.core.logging import log_service_call
+from app.core.tracing import traced
 
 
 router = APIRouter()
 
 
 @router.post("/token", response_model=Token)
-@log_service_call("AuthAPI")
+@traced("AuthAPI")
 async def login_for_access_token(
     form_data: OAuth2PasswordRequestForm = Depends(),
     request: Request = None,
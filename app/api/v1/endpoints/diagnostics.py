@@ -0,0 +1,38 @@
+from fastapi import APIRouter, Depends
+from fastapi.responses import Response
+from app.core.metrics import exporter, render
+from app.core.security import require_diagnostics_token, token_cache
+from app.core.sql_logging import sql_stats
+from app.schemas.base import BaseResponse
+from app.services.employee import employee_cache
+from app.core.responses import FastJSONRoute
+
+
+router = APIRouter(route_class=FastJSONRoute, dependencies=[Depends(require_diagnostics_token)])
+
+
+@router.post("/sql-stats")
+async def get_sql_stats(top: int = 50, reset: bool = False):
+    snapshot = sql_stats.snapshot(top=top)
+    if reset:
+        sql_stats.reset()
+    return BaseResponse.response(
+        status=1,
+        detail=snapshot,
+        msg="SQL statistics retrieved successfully"
+    )
+
+
+@router.post("/cache-stats")
+async def get_cache_stats():
+    return BaseResponse.response(
+        status=1,
+        detail={"employee": employee_cache.stats(), "token": token_cache.stats()},
+        msg="Cache statistics retrieved successfully"
+    )
+
+
+@router.get("/metrics")
+async def get_metrics():
+    # Prometheus text format, merged across the workers reporting to Redis
+    return Response(content=render(await exporter.collect()), media_type="text/plain; version=0.0.4")
@@ -1,43 +1,92 @@
 from fastapi import APIRouter, Depends, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.db.session import get_db
-from app.services.employee import EmployeeService
+from app.db.session import get_db, AsyncSessionLocal
+from app.services.employee import EmployeeService, EXPORT_MEDIA_TYPES
+from app.core.global_define import SystemMessages
 from app.repositories.employee import EmployeeRepository
 from app.schemas.employee import EmployeeCreate, EmployeeUpdate, EmployeeResponse
-from app.core.logging import log_service_call
-from typing import List
+from app.core.tracing import traced
+from app.core.config import settings
+from app.core.responses import FastJSONRoute, versioned_response
+from app.models.employee import Employee
+from typing import Any, Dict, List, Optional
 
 
-router = APIRouter()
+router = APIRouter(route_class=FastJSONRoute)
 
 
 @router.post("/get/{employee_id}")
-@log_service_call("HandlerEmployeeAPI") # này phải ghi tên url mới đúng
+@traced("HandlerEmployeeAPI") # này phải ghi tên url mới đúng
 async def get_employee(
     employee_id: int,
     request: Request = None,
+    fields: Optional[str] = None,
     db: AsyncSession = Depends(get_db)
 ):
     request_id = request.state.request_id
     service = EmployeeService(EmployeeRepository(db), request_id)
-    return await service.get_employee(employee_id=employee_id, request_id=request_id)
+    return await versioned_response(
+        request,
+        Employee.__tablename__,
+        lambda: service.get_employee(employee_id=employee_id, request_id=request_id, fields=fields)
+    )
 
 
 @router.post("/get-list")
-@log_service_call("EmployeeAPI")
+@traced("EmployeeAPI")
 async def get_employees(
     request: Request,
     skip: int = 0,
     limit: int = 100,
+    pagination: str = "offset",
+    cursor: Optional[str] = None,
+    sort_by: Optional[str] = None,
+    fields: Optional[str] = None,
     db: AsyncSession = Depends(get_db)
 ):
+    if not 0 < limit <= 1000 or skip < 0:
+        return SystemMessages.WRONG_PARAMS
     request_id = request.state.request_id
     service = EmployeeService(EmployeeRepository(db), request_id)
-    return await service.get_employees(request_id=request_id, skip=skip, limit=limit)
+    # Keyset mode when asked for or when continuing from a cursor
+    if pagination == "keyset" or cursor:
+        build = lambda: service.get_employees_page(
+            request_id=request_id, limit=limit, cursor=cursor, sort_by=sort_by, fields=fields
+        )
+    else:
+        build = lambda: service.get_employees(request_id=request_id, skip=skip, limit=limit, fields=fields)
+    return await versioned_response(request, Employee.__tablename__, build)
+
+
+@router.post("/export")
+@traced("EmployeeAPI")
+async def export_employees(
+    request: Request,
+    format: str = "ndjson",
+    batch_size: int = 1000
+):
+    if format not in EXPORT_MEDIA_TYPES or not 0 < batch_size <= 10000:
+        return SystemMessages.WRONG_PARAMS
+    request_id = request.state.request_id
+
+    async def stream():
+        # The session must outlive the handler, so it is owned by the stream
+        # rather than the get_db dependency
+        async with AsyncSessionLocal() as db:
+            service = EmployeeService(EmployeeRepository(db), request_id)
+            async for chunk in service.export_employees(request_id=request_id, format=format, batch_size=batch_size):
+                yield chunk
+
+    return StreamingResponse(
+        stream(),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f"attachment; filename=employees.{format}"}
+    )
 
 
 @router.post("/create")
-@log_service_call("EmployeeAPI")
+@traced("EmployeeAPI")
 async def create_employee(
     employee: EmployeeCreate,
     request: Request,
@@ -49,7 +98,7 @@ async def create_employee(
 
 
 @router.post("/update/{employee_id}")
-@log_service_call("EmployeeAPI")
+@traced("EmployeeAPI")
 async def update_employee(
     employee_update: EmployeeUpdate,
     request: Request,
@@ -57,4 +106,34 @@ async def update_employee(
 ):
     request_id = request.state.request_id
     service = EmployeeService(EmployeeRepository(db), request_id)
-    return await service.update_employee(request_id=request_id, employee_update=employee_update) 
\ No newline at end of file
+    return await service.update_employee(request_id=request_id, employee_update=employee_update)
+
+
+@router.post("/bulk-create")
+@traced("EmployeeAPI")
+async def bulk_create_employees(
+    employees: List[Dict[str, Any]],
+    request: Request,
+    batch_size: int = settings.EMPLOYEE_BULK_BATCH_SIZE,
+    db: AsyncSession = Depends(get_db)
+):
+    if len(employees) > settings.EMPLOYEE_BULK_MAX_ITEMS or not 0 < batch_size <= 5000:
+        return SystemMessages.WRONG_PARAMS
+    request_id = request.state.request_id
+    service = EmployeeService(EmployeeRepository(db), request_id)
+    return await service.bulk_create_employees(request_id=request_id, employees=employees, batch_size=batch_size)
+
+
+@router.post("/bulk-upsert")
+@traced("EmployeeAPI")
+async def bulk_upsert_employees(
+    employees: List[Dict[str, Any]],
+    request: Request,
+    batch_size: int = settings.EMPLOYEE_BULK_BATCH_SIZE,
+    db: AsyncSession = Depends(get_db)
+):
+    if len(employees) > settings.EMPLOYEE_BULK_MAX_ITEMS or not 0 < batch_size <= 5000:
+        return SystemMessages.WRONG_PARAMS
+    request_id = request.state.request_id
+    service = EmployeeService(EmployeeRepository(db), request_id)
+    return await service.bulk_upsert_employees(request_id=request_id, employees=employees, batch_size=batch_size)
@@ -1,6 +1,7 @@
 from fastapi import APIRouter
-from app.api.v1.endpoints import  employees
+from app.api.v1.endpoints import  employees, diagnostics
 
 
 api_router = APIRouter()
-api_router.include_router(employees.router, prefix="/employees", tags=["users"]) 
\ No newline at end of file
+api_router.include_router(employees.router, prefix="/employees", tags=["users"])
+api_router.include_router(diagnostics.router, prefix="/diagnostics", tags=["diagnostics"])
@@ -0,0 +1,69 @@
+import asyncio
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Deque
+
+
+class BlockingPool:
+    """
+    Runs blocking calls on a dedicated thread pool so they never hold the
+    event loop. At most `max_workers` calls run at once; the rest wait on
+    a semaphore (so a cancelled request leaves the queue instead of being
+    run anyway), and that wait is recorded as queue time.
+
+    Only worth it for calls that release the GIL while working, such as
+    bcrypt or hashlib on large inputs.
+    """
+
+    def __init__(self, name: str, max_workers: int, sample_size: int = 1000):
+        self.name = name
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self._semaphore = asyncio.Semaphore(max_workers)
+        self.queue_samples: Deque[float] = deque(maxlen=sample_size)
+        self.run_samples: Deque[float] = deque(maxlen=sample_size)
+        self.calls = 0
+        self.waiting = 0
+        self.in_flight = 0
+        self.max_queue_time = 0.0
+
+    async def run(self, func: Callable[..., Any], *args) -> Any:
+        t_queued = time.perf_counter()
+        self.waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        queue_time = time.perf_counter() - t_queued
+        self.queue_samples.append(queue_time)
+        self.max_queue_time = max(self.max_queue_time, queue_time)
+        self.calls += 1
+        self.in_flight += 1
+        t_begin = time.perf_counter()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+        finally:
+            self.run_samples.append(time.perf_counter() - t_begin)
+            self.in_flight -= 1
+            self._semaphore.release()
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> dict:
+        def pct(samples: Deque[float], p: float) -> float:
+            ordered = sorted(samples)
+            return ordered[min(len(ordered) - 1, int(p * len(ordered)))] * 1000 if ordered else 0.0
+
+        return {
+            "max_workers": self.max_workers,
+            "calls": self.calls,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "queue_p50_ms": pct(self.queue_samples, 0.50),
+            "queue_p99_ms": pct(self.queue_samples, 0.99),
+            "queue_max_ms": self.max_queue_time * 1000,
+            "run_p50_ms": pct(self.run_samples, 0.50),
+            "run_p99_ms": pct(self.run_samples, 0.99),
+        }
@@ -0,0 +1,254 @@
+import asyncio
+import json
+import time
+import uuid
+from collections import OrderedDict
+from itertools import count
+from typing import Any, Iterable, Optional, Set
+from loguru import logger
+from app.db.hooks import after_commit
+from app.db.redis import RedisClient, redis_client as default_redis_client
+
+
+class LRUCache:
+    """
+    In-process LRU with a per-entry TTL and a size bound. `set` takes an
+    optional TTL overriding the default for that entry.
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data: "OrderedDict[Any, tuple[float, Any]]" = OrderedDict()
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key) -> Optional[Any]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._data[key]
+            self.expirations += 1
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key, value, ttl: Optional[float] = None):
+        self._data[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def delete(self, key):
+        self._data.pop(key, None)
+
+    def clear(self):
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class TwoTierCache:
+    """
+    Read-through cache: L1 in-process LRU, L2 in Redis (JSON values).
+
+    Invalidations drop the L1 entry, replace the L2 one with a tombstone
+    for `tombstone_ttl` seconds and are published on a Redis channel so
+    every other worker drops its L1 copy too. Writes made inside a database
+    session are invalidated after that session commits.
+
+    A reader that missed, loaded the old row and calls `set` after the
+    invalidation must not cache it: pass the `generation(key)` taken before
+    the lookup to `set`, which then skips L1 if the key was invalidated in
+    between, and L2 only stores absent keys, so the tombstone blocks it.
+    Reads slower than `tombstone_ttl` can still cache a stale L2 entry.
+
+    If Redis fails, L2 is skipped for `l2_retry_after` seconds; invalidations
+    made meanwhile are queued, the keys are not read from L2, and they are
+    retried in the background until they reach Redis.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        l1_size: int = 10000,
+        l1_ttl: float = 30,
+        l2_ttl: int = 300,
+        redis: Optional[RedisClient] = None,
+        l2_retry_after: float = 5.0,
+        tombstone_ttl: float = 10.0,
+    ):
+        self.namespace = namespace
+        self.channel = f"cache:{namespace}:invalidate"
+        self.l1 = LRUCache(l1_size, l1_ttl)
+        self.l2_ttl = l2_ttl
+        self.l2_retry_after = l2_retry_after
+        self._redis = redis
+        self._origin = uuid.uuid4().hex
+        self._l2_down_until = 0.0
+        self._listener: Optional[asyncio.Task] = None
+        self.tombstone_ttl = tombstone_ttl
+        # key -> generation of its last invalidation, kept while a read
+        # started before it could still be in flight
+        self._generations = LRUCache(l1_size, tombstone_ttl)
+        self._counter = count(1)
+        self._unpublished: Set[Any] = set()
+        self._retry_task: Optional[asyncio.Task] = None
+        self.l1_hits = 0
+        self.l2_hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.l2_errors = 0
+
+    @property
+    def redis(self) -> RedisClient:
+        return self._redis or default_redis_client
+
+    def _key(self, key) -> str:
+        return f"cache:{self.namespace}:{key}"
+
+    def _l2_available(self) -> bool:
+        return time.monotonic() >= self._l2_down_until
+
+    def _l2_failed(self, e: Exception):
+        self.l2_errors += 1
+        self._l2_down_until = time.monotonic() + self.l2_retry_after
+        logger.bind(request_id="cache").warning("Cache L2 unavailable: {error}", error=str(e))
+
+    def generation(self, key) -> int:
+        return self._generations.get(key) or 0
+
+    def _invalidated(self, key):
+        self.l1.delete(key)
+        self._generations.set(key, next(self._counter))
+
+    async def get(self, key) -> Optional[dict]:
+        value = self.l1.get(key)
+        if value is not None:
+            self.l1_hits += 1
+            return value
+        if self._l2_available() and key not in self._unpublished:
+            try:
+                value = await self.redis.get_json(self._key(key))
+            except Exception as e:
+                self._l2_failed(e)
+            if value is not None:
+                self.l2_hits += 1
+                self.l1.set(key, value)
+                return value
+        self.misses += 1
+        return None
+
+    async def set(self, key, value: dict, generation: Optional[int] = None):
+        """
+        Cache a value loaded after a miss. With `generation`, nothing is
+        cached if the key has been invalidated since it was taken.
+        """
+        if generation is not None and self.generation(key) != generation:
+            return
+        self.l1.set(key, value)
+        if self._l2_available() and key not in self._unpublished:
+            try:
+                # Never over a tombstone (or a newer value)
+                await self.redis.set_json(self._key(key), value, self.l2_ttl, only_if_absent=True)
+            except Exception as e:
+                self._l2_failed(e)
+
+    async def invalidate(self, keys: Iterable):
+        keys = list(keys)
+        for key in keys:
+            self._invalidated(key)
+        self.invalidations += len(keys)
+        if not keys:
+            return
+        self._unpublished.update(keys)
+        if self._l2_available():
+            await self._publish()
+        if self._unpublished and (self._retry_task is None or self._retry_task.done()):
+            self._retry_task = asyncio.create_task(self._retry_publish())
+
+    async def _publish(self):
+        keys = list(self._unpublished)
+        try:
+            pipe = self.redis.redis.pipeline(transaction=False)
+            for key in keys:
+                pipe.set(self._key(key), "null", px=int(self.tombstone_ttl * 1000))
+            pipe.publish(self.channel, json.dumps({"origin": self._origin, "keys": keys}))
+            await pipe.execute()
+            self._unpublished.difference_update(keys)
+        except Exception as e:
+            self._l2_failed(e)
+
+    async def _retry_publish(self):
+        while self._unpublished:
+            await asyncio.sleep(self.l2_retry_after)
+            await self._publish()
+
+    def invalidate_on_commit(self, session, keys: Iterable):
+        """
+        Invalidate `keys` once `session` (AsyncSession or Session) commits.
+        """
+        keys = list(keys)
+        after_commit(session, lambda: self._invalidate_committed(keys))
+
+    def _invalidate_committed(self, keys: list):
+        # L1 synchronously, so this worker never serves the old row again
+        for key in keys:
+            self._invalidated(key)
+        return self.invalidate(keys)
+
+    async def start(self):
+        """
+        Subscribe to invalidations published by other workers.
+        """
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self):
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+
+    async def _listen(self):
+        while True:
+            try:
+                pubsub = self.redis.redis.pubsub(ignore_subscribe_messages=True)
+                await pubsub.subscribe(self.channel)
+                async for message in pubsub.listen():
+                    if message.get("type") != "message":
+                        continue
+                    payload = json.loads(message["data"])
+                    if payload.get("origin") == self._origin:
+                        continue
+                    for key in payload.get("keys", []):
+                        self._invalidated(key)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Entries may be stale until the L1 TTL while disconnected
+                self.l1.clear()
+                logger.bind(request_id="cache").warning("Cache invalidation listener error: {error}", error=str(e))
+                await asyncio.sleep(self.l2_retry_after)
+
+    def stats(self) -> dict:
+        lookups = self.l1_hits + self.l2_hits + self.misses
+        return {
+            "l1_size": len(self.l1),
+            "l1_hits": self.l1_hits,
+            "l2_hits": self.l2_hits,
+            "misses": self.misses,
+            "hit_ratio": (self.l1_hits + self.l2_hits) / lookups if lookups else 0.0,
+            "l1_evictions": self.l1.evictions,
+            "l1_expirations": self.l1.expirations,
+            "invalidations": self.invalidations,
+            "l2_errors": self.l2_errors,
+            "unpublished_invalidations": len(self._unpublished),
+        }
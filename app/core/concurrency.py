@@ -0,0 +1,189 @@
+import asyncio
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional
+from app.core.config import settings
+from app.core.metrics import LabelValues, registry
+
+
+class AdaptiveLimiter:
+    """
+    Concurrency limit adjusted from observed latency (AIMD). Latency is a
+    moving average of completions, so a mix of fast and slow routes reads
+    as one figure. While it stays within `tolerance` times the baseline,
+    the limit grows by about one per limit's worth of completions; above
+    that, a completion cuts it by `backoff`, at most once per round trip,
+    so a burst of slow requests started together counts once. The baseline
+    is the lowest average seen over the last `baseline_window` seconds: a
+    slowdown does not raise it, so the limit stays cut while the slowdown
+    lasts, and only one longer than the window becomes the new normal.
+
+    Requests over the limit wait in a FIFO of at most `queue_size` for up
+    to `queue_timeout` seconds; the rest are rejected at once.
+    """
+
+    def __init__(
+        self,
+        initial_limit: int = 20,
+        min_limit: int = 1,
+        max_limit: int = 200,
+        queue_size: int = 10,
+        queue_timeout: float = 0.1,
+        tolerance: float = 2.0,
+        backoff: float = 0.9,
+        smoothing: float = 0.05,
+        baseline_window: float = 300.0,
+    ):
+        self.initial_limit = initial_limit
+        self.limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.tolerance = tolerance
+        self.backoff = backoff
+        self.smoothing = smoothing
+        self.baseline_window = baseline_window
+        self.latency: Optional[float] = None
+        self.baseline: Optional[float] = None
+        # [start, lowest average latency] per tenth of the baseline window
+        self._minima: Deque[List[float]] = deque()
+        self.in_flight = 0
+        self.accepted = 0
+        self.rejected: Dict[str, int] = {"queue_full": 0, "queue_timeout": 0}
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._last_cut = 0.0
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self) -> bool:
+        """
+        Take a slot, waiting in the queue if needed. False means the request
+        should be shed; True must be paired with `release`.
+        """
+        if self.in_flight < int(self.limit) and not self._waiters:
+            self.in_flight += 1
+            self.accepted += 1
+            return True
+        if len(self._waiters) >= self.queue_size:
+            self.rejected["queue_full"] += 1
+            return False
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            async with asyncio.timeout(self.queue_timeout):
+                await waiter
+        except (TimeoutError, asyncio.CancelledError) as e:
+            if waiter.done() and not waiter.cancelled():
+                # Granted just as we gave up, hand the slot to the next one
+                self.in_flight -= 1
+                self._wake()
+            else:
+                waiter.cancel()
+                try:
+                    self._waiters.remove(waiter)
+                except ValueError:
+                    pass
+            if isinstance(e, TimeoutError):
+                self.rejected["queue_timeout"] += 1
+                return False
+            raise
+        self.accepted += 1
+        return True
+
+    def release(self, started: float, sample: bool = True):
+        """
+        Free the slot taken by a request that began running at `started`
+        (a time.perf_counter() value) and, with `sample`, adjust the limit
+        from its latency.
+        """
+        now = time.perf_counter()
+        self.in_flight -= 1
+        if sample:
+            self._update(now - started, started, now)
+        self._wake()
+
+    def _update(self, latency: float, started: float, now: float):
+        if self.latency is None:
+            self.latency = latency
+            self._record_minimum(latency, now)
+            return
+        self.latency += self.smoothing * (latency - self.latency)
+        self._record_minimum(self.latency, now)
+        if self.latency > self.baseline * self.tolerance:
+            # Requests started before the last cut saw the old limit
+            if started > self._last_cut:
+                self.limit = max(float(self.min_limit), self.limit * self.backoff)
+                self._last_cut = now
+        elif self.in_flight + 1 >= self.limit / 2:
+            # Only grow while the limit is actually being used
+            self.limit = min(float(self.max_limit), self.limit + 1 / self.limit)
+
+    def _record_minimum(self, latency: float, now: float):
+        if self._minima and now - self._minima[-1][0] < self.baseline_window / 10:
+            self._minima[-1][1] = min(self._minima[-1][1], latency)
+        else:
+            self._minima.append([now, latency])
+        while now - self._minima[0][0] > self.baseline_window:
+            self._minima.popleft()
+        self.baseline = min(minimum for _, minimum in self._minima)
+
+    def _wake(self):
+        while self._waiters and self.in_flight < int(self.limit):
+            waiter = self._waiters.popleft()
+            if waiter.done():
+                continue
+            self.in_flight += 1
+            waiter.set_result(None)
+
+    def reset(self):
+        """
+        Forget the learned latencies and start over from `initial_limit`,
+        e.g. between benchmark runs sharing the process-wide limiter.
+        """
+        self.limit = float(self.initial_limit)
+        self.latency = None
+        self.baseline = None
+        self._minima.clear()
+        self._last_cut = 0.0
+
+    def stats(self) -> dict:
+        return {
+            "limit": self.limit,
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "latency_ms": (self.latency or 0.0) * 1000,
+            "baseline_ms": (self.baseline or 0.0) * 1000,
+            "accepted": self.accepted,
+            "rejected": dict(self.rejected),
+        }
+
+
+request_limiter = AdaptiveLimiter(
+    initial_limit=settings.CONCURRENCY_INITIAL_LIMIT,
+    min_limit=settings.CONCURRENCY_MIN_LIMIT,
+    max_limit=settings.CONCURRENCY_MAX_LIMIT,
+    queue_size=settings.CONCURRENCY_QUEUE_SIZE,
+    queue_timeout=settings.CONCURRENCY_QUEUE_TIMEOUT_MS / 1000,
+    tolerance=settings.CONCURRENCY_LATENCY_TOLERANCE,
+    baseline_window=settings.CONCURRENCY_BASELINE_WINDOW,
+)
+
+
+def _limiter_state() -> Dict[LabelValues, float]:
+    return {
+        ("limit",): request_limiter.limit,
+        ("in_flight",): request_limiter.in_flight,
+        ("queued",): request_limiter.queued,
+    }
+
+
+def _shed_requests() -> Dict[LabelValues, float]:
+    return {(reason,): count for reason, count in request_limiter.rejected.items()}
+
+
+registry.gauge("concurrency_limit", "Adaptive concurrency limit and usage by state", ("state",), collect=_limiter_state)
+registry.counter("requests_shed_total", "Requests rejected with SYSTEM_BUSY by reason", ("reason",), collect=_shed_requests)
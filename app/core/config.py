@@ -18,11 +18,107 @@ class Settings(BaseSettings):
     REDIS_DB: int = Field(default=0)
     REDIS_PASSWORD: Optional[str] = None
 
+    # Redis pool settings
+    REDIS_MAX_CONNECTIONS: int = Field(default=50)
+    REDIS_POOL_TIMEOUT: float = Field(default=5.0)
+    REDIS_SOCKET_TIMEOUT: float = Field(default=2.0)
+    REDIS_SOCKET_CONNECT_TIMEOUT: float = Field(default=2.0)
+    REDIS_HEALTH_CHECK_INTERVAL: int = Field(default=30)
+
+    # Hybrid rate limit settings
+    RATE_LIMIT_HYBRID_SYNC_INTERVAL: float = Field(default=0.1)
+    RATE_LIMIT_HYBRID_MAX_DRIFT: int = Field(default=10)
+
     # JWT settings
     JWT_SECRET_KEY: str
     JWT_ALGORITHM: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int
 
+    # Threads running bcrypt for the async password helpers
+    PASSWORD_HASH_WORKERS: int = Field(default=2)
+
+    # Verified token cache settings
+    TOKEN_CACHE_SIZE: int = Field(default=10000)
+    TOKEN_CACHE_MAX_TTL: float = Field(default=300)
+
+    # Production logging settings (used when USE_PRODUCTION is set)
+    LOG_FILE: Optional[str] = Field(default="logs/app.log")
+    LOG_QUEUE_SIZE: int = Field(default=10000)
+    LOG_BATCH_SIZE: int = Field(default=256)
+    LOG_FLUSH_INTERVAL: float = Field(default=0.5)
+    LOG_ROTATION_MB: int = Field(default=500)
+    LOG_RETENTION_DAYS: int = Field(default=10)
+    LOG_OVERFLOW_POLICY: str = Field(default="drop_new")
+
+    # Request tracing: share of requests whose span tree is logged, argument
+    # repr length and spans kept per request
+    TRACE_SAMPLE_RATE: float = Field(default=0.1)
+    TRACE_ARG_MAX_LEN: int = Field(default=120)
+    TRACE_MAX_SPANS: int = Field(default=200)
+
+    # Per request profiling: requests sending X-Profile: <PROFILE_TOKEN>
+    # (disabled while empty) or drawn at PROFILE_SAMPLE_RATE are profiled
+    PROFILE_TOKEN: str = Field(default="")
+    PROFILE_SAMPLE_RATE: float = Field(default=0)
+    PROFILE_INTERVAL_MS: float = Field(default=1)
+    PROFILE_FORMAT: str = Field(default="speedscope")
+    PROFILE_DIR: str = Field(default="profiles")
+    PROFILE_RING_SIZE: int = Field(default=50)
+
+    # Diagnostics endpoints (SQL and cache stats, metrics) require
+    # Authorization: Bearer <DIAGNOSTICS_TOKEN>; they answer 404 while empty
+    DIAGNOSTICS_TOKEN: str = Field(default="")
+
+    # SQL telemetry settings
+    SQL_SLOW_QUERY_MS: float = Field(default=500)
+    SQL_N_PLUS_ONE_THRESHOLD: int = Field(default=10)
+
+    # Bulk write settings
+    EMPLOYEE_BULK_BATCH_SIZE: int = Field(default=500)
+    EMPLOYEE_BULK_MAX_ITEMS: int = Field(default=10000)
+
+    # Employee lookup cache settings
+    EMPLOYEE_CACHE_ENABLED: bool = Field(default=True)
+    EMPLOYEE_CACHE_L1_SIZE: int = Field(default=10000)
+    EMPLOYEE_CACHE_L1_TTL: float = Field(default=30)
+    EMPLOYEE_CACHE_L2_TTL: int = Field(default=300)
+
+    # Employee read response cache (0 disables it)
+    EMPLOYEE_RESPONSE_CACHE_TTL: float = Field(default=0)
+    EMPLOYEE_RESPONSE_CACHE_SIZE: int = Field(default=1000)
+
+    # Employee read coalescing settings
+    EMPLOYEE_LOADER_ENABLED: bool = Field(default=True)
+    EMPLOYEE_LOADER_WINDOW_MS: float = Field(default=2)
+    EMPLOYEE_LOADER_MAX_BATCH: int = Field(default=500)
+    EMPLOYEE_LOADER_TIMEOUT_MS: float = Field(default=5000)
+
+    # Read replica settings: comma separated SQLAlchemy URLs
+    DB_REPLICA_URLS: str = Field(default="")
+    DB_REPLICA_STRATEGY: str = Field(default="round_robin")
+    DB_REPLICA_RETRY_AFTER: float = Field(default=30)
+
+    # Seconds between pushes of this worker's metrics to Redis
+    METRICS_PUSH_INTERVAL: float = Field(default=5)
+
+    # Adaptive concurrency limit: requests over the limit wait in a queue of
+    # CONCURRENCY_QUEUE_SIZE for up to CONCURRENCY_QUEUE_TIMEOUT_MS, the rest
+    # get SYSTEM_BUSY. The limit is cut when the average latency exceeds
+    # CONCURRENCY_LATENCY_TOLERANCE times its lowest value in the last
+    # CONCURRENCY_BASELINE_WINDOW seconds
+    CONCURRENCY_INITIAL_LIMIT: int = Field(default=20)
+    CONCURRENCY_MIN_LIMIT: int = Field(default=2)
+    CONCURRENCY_MAX_LIMIT: int = Field(default=200)
+    CONCURRENCY_QUEUE_SIZE: int = Field(default=20)
+    CONCURRENCY_QUEUE_TIMEOUT_MS: float = Field(default=100)
+    CONCURRENCY_LATENCY_TOLERANCE: float = Field(default=2.0)
+    CONCURRENCY_BASELINE_WINDOW: float = Field(default=300)
+
+    # Request time budgets: DB and Redis calls are cancelled, and MySQL
+    # SELECTs aborted, once they run out. Bulk writes get a longer one
+    REQUEST_DEADLINE_MS: float = Field(default=5000)
+    BULK_REQUEST_DEADLINE_MS: float = Field(default=60000)
+
     # Database pool settings
     DB_POOL_SIZE: int = Field(default=20)
     DB_MAX_OVERFLOW: int = Field(default=10)
@@ -0,0 +1,96 @@
+import asyncio
+import contextvars
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional
+
+
+class DataLoader:
+    """
+    Coalesces concurrent lookups by key.
+
+    Callers asking for a key that is already queued or being fetched share
+    its future (singleflight). Distinct keys requested within `window`
+    seconds are fetched together with one `load_many(keys)` call, which
+    returns a dict of the keys it found; missing keys resolve to None.
+    A batch is dispatched early once it reaches `max_batch_size` keys.
+
+    A batch serves callers from many requests, so it runs in an empty
+    context rather than that of the caller who opened it: no request's
+    deadline, trace span or request id applies to it. It is bounded by its
+    own `timeout` seconds instead.
+    """
+
+    def __init__(
+        self,
+        load_many: Callable[[List[Hashable]], Awaitable[Dict[Hashable, Any]]],
+        window: float = 0.002,
+        max_batch_size: int = 500,
+        timeout: Optional[float] = None,
+    ):
+        self.load_many = load_many
+        self.window = window
+        self.max_batch_size = max_batch_size
+        self.timeout = timeout
+        self._futures: Dict[Hashable, asyncio.Future] = {}
+        self._queue: List[Hashable] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: set = set()
+        self.requests = 0
+        self.coalesced = 0
+        self.batches = 0
+
+    async def load(self, key: Hashable) -> Any:
+        self.requests += 1
+        future = self._futures.get(key)
+        if future is not None:
+            self.coalesced += 1
+        else:
+            loop = asyncio.get_running_loop()
+            future = self._futures[key] = loop.create_future()
+            self._queue.append(key)
+            if len(self._queue) >= self.max_batch_size:
+                self._dispatch()
+            elif self._timer is None:
+                self._timer = loop.call_later(self.window, self._dispatch, context=contextvars.Context())
+        # Shielded so one caller being cancelled does not fail the others
+        return await asyncio.shield(future)
+
+    def _dispatch(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        keys, self._queue = self._queue, []
+        if keys:
+            self.batches += 1
+            task = asyncio.get_running_loop().create_task(self._run_batch(keys), context=contextvars.Context())
+            # The loop only keeps weak references to tasks
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(self, keys: List[Hashable]):
+        try:
+            async with asyncio.timeout(self.timeout):
+                found = await self.load_many(keys)
+        except asyncio.CancelledError:
+            for key in keys:
+                self._futures.pop(key).cancel()
+            raise
+        except Exception as e:
+            for key in keys:
+                future = self._futures.pop(key)
+                if not future.done():
+                    future.set_exception(e)
+                    # Marks the exception retrieved in case every caller went away
+                    future.exception()
+            return
+        for key in keys:
+            future = self._futures.pop(key)
+            if not future.done():
+                future.set_result(found.get(key))
+
+    def stats(self) -> dict:
+        return {
+            "requests": self.requests,
+            "coalesced": self.coalesced,
+            "batches": self.batches,
+            "pending": len(self._futures),
+        }
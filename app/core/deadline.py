@@ -0,0 +1,67 @@
+import asyncio
+import functools
+from contextlib import nullcontext
+from contextvars import ContextVar, Token
+from typing import Callable, Optional
+
+# Absolute deadline of the current request in event loop time, None for no limit
+deadline_context: ContextVar[Optional[float]] = ContextVar("deadline", default=None)
+
+
+class DeadlineExceeded(TimeoutError):
+    pass
+
+
+def start_deadline(budget: float) -> Token:
+    """
+    Give the current context `budget` seconds from now. Pass the token to
+    end_deadline once the request is over.
+    """
+    return deadline_context.set(asyncio.get_running_loop().time() + budget)
+
+
+def end_deadline(token: Token):
+    deadline_context.reset(token)
+
+
+def remaining() -> Optional[float]:
+    """
+    Seconds left before the deadline (negative once it has passed), or None
+    outside a request with a deadline.
+    """
+    deadline = deadline_context.get()
+    if deadline is None:
+        return None
+    return deadline - asyncio.get_running_loop().time()
+
+
+def deadline_scope():
+    """
+    Async context manager cancelling the awaits inside it at the deadline,
+    which then raise TimeoutError. Raises DeadlineExceeded at once if the
+    deadline has already passed.
+    """
+    deadline = deadline_context.get()
+    if deadline is None:
+        return nullcontext()
+    if asyncio.get_running_loop().time() >= deadline:
+        raise DeadlineExceeded("Request deadline exceeded")
+    return asyncio.timeout_at(deadline)
+
+
+def within_deadline(func: Callable):
+    """
+    Run a coroutine function under the request deadline, raising
+    DeadlineExceeded if it is cut short. Goes under @traced, so the span
+    records the failure and the caller gets ErrorResponse.DEFAULT.
+    """
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        try:
+            async with deadline_scope():
+                return await func(*args, **kwargs)
+        except TimeoutError as e:
+            if isinstance(e, DeadlineExceeded):
+                raise
+            raise DeadlineExceeded(f"Request deadline exceeded in {func.__qualname__}") from e
+    return wrapper
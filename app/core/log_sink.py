@@ -0,0 +1,174 @@
+import json
+import os
+import queue
+import sys
+import threading
+import time
+import traceback
+from datetime import datetime, timedelta
+from typing import List, Optional, TextIO
+
+
+class BatchedLogSink:
+    """
+    Loguru sink that never blocks the caller.
+
+    Records are put on a bounded queue and written as JSON lines by a
+    background thread in batches of up to `batch_size`, at least every
+    `flush_interval` seconds. When the queue is full the overflow policy
+    decides what is lost: "drop_new" discards the incoming record,
+    "drop_oldest" discards the oldest queued one. Drops are counted.
+
+    With a `path` the file is rotated once it exceeds `rotation_bytes` and
+    rotated files older than `retention_days` are removed; without one the
+    lines go to `stream` (stdout by default).
+    """
+
+    OVERFLOW_POLICIES = ("drop_new", "drop_oldest")
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        queue_size: int = 10000,
+        batch_size: int = 256,
+        flush_interval: float = 0.5,
+        rotation_bytes: int = 500 * 1024 * 1024,
+        retention_days: int = 10,
+        overflow: str = "drop_new",
+        stream: Optional[TextIO] = None,
+    ):
+        if overflow not in self.OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {overflow}")
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.rotation_bytes = rotation_bytes
+        self.retention_days = retention_days
+        self.overflow = overflow
+        self.stream = stream
+
+        self.enqueued = 0
+        self.written = 0
+        self.dropped = 0
+        self.batches = 0
+        self.write_errors = 0
+
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._file: Optional[TextIO] = None
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="log-sink", daemon=True)
+        self._thread.start()
+
+    def __call__(self, message):
+        # Called by loguru on the logging thread: only enqueue the record
+        record = message.record
+        try:
+            self._queue.put_nowait(record)
+            self.enqueued += 1
+            return
+        except queue.Full:
+            pass
+        if self.overflow == "drop_oldest":
+            try:
+                self._queue.get_nowait()
+                self._queue.put_nowait(record)
+                self.enqueued += 1
+            except (queue.Empty, queue.Full):
+                pass
+        self.dropped += 1
+
+    def stats(self) -> dict:
+        return {
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "dropped": self.dropped,
+            "batches": self.batches,
+            "write_errors": self.write_errors,
+            "queue_depth": self._queue.qsize(),
+        }
+
+    def stop(self, timeout: float = 5.0):
+        """
+        Flush what is queued and stop the writer thread.
+        """
+        self._stopped.set()
+        self._thread.join(timeout)
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _run(self):
+        while not (self._stopped.is_set() and self._queue.empty()):
+            batch = self._next_batch()
+            if batch:
+                self._write_batch(batch)
+
+    def _next_batch(self) -> List[dict]:
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0 or (self._stopped.is_set() and self._queue.empty()):
+                break
+            try:
+                batch.append(self._queue.get(timeout=min(timeout, 0.1)))
+            except queue.Empty:
+                continue
+        return batch
+
+    def _write_batch(self, batch: List[dict]):
+        lines = "".join(json.dumps(self._serialize(record), ensure_ascii=False, default=str) + "\n" for record in batch)
+        try:
+            out = self._output()
+            out.write(lines)
+            out.flush()
+            self.written += len(batch)
+            self.batches += 1
+        except Exception:
+            self.write_errors += 1
+
+    @staticmethod
+    def _serialize(record: dict) -> dict:
+        extra = dict(record["extra"])
+        data = {
+            "time": record["time"].isoformat(),
+            "level": record["level"].name,
+            "request_id": extra.pop("request_id", None),
+            "message": record["message"],
+            "logger": record["name"],
+            "function": record["function"],
+            "line": record["line"],
+        }
+        if extra:
+            data["extra"] = extra
+        if record["exception"] is not None:
+            exc_type, exc_value, exc_tb = record["exception"]
+            data["exception"] = "".join(traceback.format_exception(exc_type, exc_value, exc_tb))
+        return data
+
+    def _output(self) -> TextIO:
+        if self.path is None:
+            return self.stream or sys.stdout
+        if self._file is not None and self._file.tell() >= self.rotation_bytes:
+            self._rotate()
+        if self._file is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._file = open(self.path, "a", encoding="utf-8")
+        return self._file
+
+    def _rotate(self):
+        self._file.close()
+        self._file = None
+        root, ext = os.path.splitext(self.path)
+        os.replace(self.path, f"{root}.{datetime.now().strftime('%Y-%m-%d_%H-%M-%S_%f')}{ext}")
+
+        # Retention: remove rotated files older than retention_days
+        directory = os.path.dirname(self.path) or "."
+        prefix = os.path.basename(root) + "."
+        cutoff = (datetime.now() - timedelta(days=self.retention_days)).timestamp()
+        for name in os.listdir(directory):
+            full_path = os.path.join(directory, name)
+            if name.startswith(prefix) and full_path != self.path and os.path.getmtime(full_path) < cutoff:
+                os.remove(full_path)
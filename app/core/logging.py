@@ -1,20 +1,39 @@
 import uuid
 import sys
 import time
-import functools
-import traceback
 from loguru import logger
 from fastapi import Request
-from typing import Callable
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.types import ASGIApp
-from app.core.global_define import ErrorResponse
+from typing import Optional
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.config import settings
+from app.core.log_sink import BatchedLogSink
+from app.core.tracing import end_trace, start_trace, traced
+
+
+log_sink: Optional[BatchedLogSink] = None
 
 
 def setup_logging():
+    global log_sink
+
     # Remove all existing handlers
     logger.remove()
-    
+
+    if settings.USE_PRODUCTION:
+        # JSON lines written in batches by a background thread, never blocking requests
+        log_sink = BatchedLogSink(
+            path=settings.LOG_FILE or None,
+            queue_size=settings.LOG_QUEUE_SIZE,
+            batch_size=settings.LOG_BATCH_SIZE,
+            flush_interval=settings.LOG_FLUSH_INTERVAL,
+            rotation_bytes=settings.LOG_ROTATION_MB * 1024 * 1024,
+            retention_days=settings.LOG_RETENTION_DAYS,
+            overflow=settings.LOG_OVERFLOW_POLICY,
+        )
+        logger.add(log_sink, format="{message}", level="INFO", backtrace=False, diagnose=False)
+        return
+
     # Add console handler with request_id context
     logger.add(
         sys.stdout,
@@ -24,66 +43,69 @@ def setup_logging():
         backtrace=True,
         diagnose=True
     )
-    
-    # # # Add file handler with request_id context
-    # logger.add(
-    #     "logs/app.log",
-    #     format="{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | request_id={extra[request_id]} | {message}",
-    #     rotation="500 MB",
-    #     retention="10 days",
-    #     level="INFO",
-    # )
-
-
-class RequestLoggingMiddleware(BaseHTTPMiddleware):
+
+
+def shutdown_logging():
+    global log_sink
+    if log_sink is not None:
+        logger.remove()
+        log_sink.stop()
+        log_sink = None
+
+
+class RequestLoggingMiddleware:
+    """
+    Pure ASGI middleware: assigns a request_id, logs start/completion and
+    adds the X-Request-ID header without wrapping the response body, so
+    streaming responses pass through untouched.
+    """
+
     def __init__(self, app: ASGIApp):
-        super().__init__(app)
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
 
-    async def dispatch(self, request: Request, call_next):
         request_id = str(uuid.uuid4())
-        request.state.request_id = request_id
-        
+        # request.state is backed by scope["state"]
+        scope.setdefault("state", {})["request_id"] = request_id
+        method, path = scope["method"], scope["path"]
+
         log = logger.bind(request_id=request_id)
-        log.info(f"Request started: {request.method} {request.url.path}")
+        log.info(f"Request started: {method} {path}")
+
+        async def send_wrapper(message: Message):
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append("X-Request-ID", request_id)
+            await send(message)
 
-        start_time = time.time()
+        trace, trace_token = start_trace(request_id)
+        start_time = time.perf_counter()
         try:
-            response = await call_next(request)
-            process_time = time.time() - start_time
-            
-            log.info(f"Request completed: {request.method} {request.url.path} in {process_time:.2f}s")
-            response.headers["X-Request-ID"] = request_id
-            return response
+            await self.app(scope, receive, send_wrapper)
         except Exception as e:
-            log.error(f"Request failed: {request.method} {request.url.path} - {str(e)}")
+            log.error(f"Request failed: {method} {path} - {str(e)}")
             raise
+        finally:
+            end_trace(trace_token)
+        process_time = time.perf_counter() - start_time
+        if not trace.sampled:
+            log.info(f"Request completed: {method} {path} in {process_time:.2f}s")
+            return
+        # Sampled: one summary with the span tree instead of a line per call
+        tree, spans = trace.summary()
+        log.bind(trace=spans).info(
+            "Request completed: {method} {path} in {time:.2f}ms, {sql} SQL in {sql_time:.2f}ms\n{tree}",
+            method=method, path=path, time=process_time * 1000,
+            sql=trace.sql_count, sql_time=trace.sql_time * 1000, tree=tree
+        )
 
 
 def get_request_id(request: Request) -> str:
     return getattr(request.state, "request_id", str(uuid.uuid4()))
 
 
-def log_service_call(service_name: str) -> Callable:
-    def decorator(func: Callable) -> Callable:
-        @functools.wraps(func)
-        async def wrapper(*args, **kwargs):
-            request_id = kwargs.get("request_id", "")
-            if not request_id and "request" in kwargs:
-                request_id = get_request_id(kwargs["request"])
-
-            log = logger.bind(request_id=request_id)
-            t_begin = time.time()
-            
-            log.info("Call {service}.{func} with input {args} {kwargs}", service=service_name, func=func.__name__, args=args, kwargs=kwargs)
-            try:
-                result = await func(*args, **kwargs)
-                log.info("Call completed: {service}.{func} in {time:.2f}s", 
-                        service=service_name, func=func.__name__, time=time.time() - t_begin)
-                return result
-            except Exception as e:
-                error_trace = traceback.format_exc()
-                log.error("Call failed: {service}.{func} - {error}\nTraceback:\n{trace}", 
-                         service=service_name, func=func.__name__, error=str(e), trace=error_trace)
-                return ErrorResponse.DEFAULT
-        return wrapper
-    return decorator 
\ No newline at end of file
+# Kept for existing imports: calls are now spans of the request trace
+log_service_call = traced
@@ -0,0 +1,319 @@
+import asyncio
+import json
+import os
+import uuid
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+from loguru import logger
+from app.core.config import settings
+
+# Latency buckets in seconds, from sub-millisecond cache hits to timeouts
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+LabelValues = Tuple[str, ...]
+
+
+class Metric:
+    """
+    A metric family. Series are keyed by their label values, in the order
+    of `labels`. With `collect`, the series are read from that callback at
+    snapshot time instead of being recorded.
+    """
+
+    type = ""
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labels: Sequence[str] = (),
+        collect: Optional[Callable[[], Dict[LabelValues, float]]] = None,
+    ):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.collect = collect
+        self._series: Dict[LabelValues, object] = {}
+
+    def samples(self) -> Dict[LabelValues, object]:
+        if self.collect is not None:
+            return self.collect()
+        return self._series
+
+    def snapshot(self) -> dict:
+        return {
+            "type": self.type,
+            "help": self.help,
+            "labels": list(self.labels),
+            "samples": [[list(key), value] for key, value in self.samples().items()],
+        }
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def inc(self, *label_values: str, amount: float = 1):
+        self._series[label_values] = self._series.get(label_values, 0) + amount
+
+
+class Gauge(Metric):
+    type = "gauge"
+
+    def set(self, value: float, *label_values: str):
+        self._series[label_values] = value
+
+
+class Histogram(Metric):
+    """
+    Fixed-bucket histogram. A series is a list of per-bucket counts (the
+    last one for +Inf) followed by the sum, so `observe` is one bisect and
+    two additions.
+    """
+
+    type = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, *label_values: str):
+        series = self._series.get(label_values)
+        if series is None:
+            series = self._series[label_values] = [0] * (len(self.buckets) + 1) + [0.0]
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def snapshot(self) -> dict:
+        snapshot = super().snapshot()
+        snapshot["buckets"] = list(self.buckets)
+        return snapshot
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric already registered: {metric.name}")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, labels: Sequence[str] = (), collect=None) -> Counter:
+        return self.register(Counter(name, help, labels, collect))
+
+    def gauge(self, name: str, help: str, labels: Sequence[str] = (), collect=None) -> Gauge:
+        return self.register(Gauge(name, help, labels, collect))
+
+    def histogram(self, name: str, help: str, labels: Sequence[str] = (), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, help, labels, buckets))
+
+    def snapshot(self) -> Dict[str, dict]:
+        snapshot = {}
+        for name, metric in self._metrics.items():
+            try:
+                snapshot[name] = metric.snapshot()
+            except Exception as e:
+                logger.bind(request_id="metrics").warning("Metric {name} failed: {error}", name=name, error=str(e))
+        return snapshot
+
+
+def merge(snapshots: Iterable[Dict[str, dict]]) -> Dict[str, dict]:
+    """
+    Add up snapshots from several workers: counters, gauges and histogram
+    buckets with the same labels are summed.
+    """
+    merged: Dict[str, dict] = {}
+    for snapshot in snapshots:
+        for name, metric in snapshot.items():
+            target = merged.setdefault(name, dict(metric, samples={}))
+            for label_values, value in metric["samples"]:
+                key = tuple(label_values)
+                current = target["samples"].get(key)
+                if current is None:
+                    target["samples"][key] = list(value) if isinstance(value, list) else value
+                elif isinstance(value, list):
+                    target["samples"][key] = [a + b for a, b in zip(current, value)]
+                else:
+                    target["samples"][key] = current + value
+    return merged
+
+
+def add_hit_ratios(merged: Dict[str, dict]) -> Dict[str, dict]:
+    """
+    Derive cache_hit_ratio{cache} from the merged cache_lookups_total, since
+    per-worker ratios cannot be added up.
+    """
+    lookups = merged.get("cache_lookups_total")
+    if lookups is None:
+        return merged
+    hits: Dict[str, float] = {}
+    totals: Dict[str, float] = {}
+    result_index = lookups["labels"].index("result")
+    cache_index = lookups["labels"].index("cache")
+    for key, value in lookups["samples"].items():
+        cache = key[cache_index]
+        totals[cache] = totals.get(cache, 0) + value
+        if key[result_index] != "miss":
+            hits[cache] = hits.get(cache, 0) + value
+    merged["cache_hit_ratio"] = {
+        "type": "gauge",
+        "help": "Share of cache lookups served from the cache, across workers",
+        "labels": ["cache"],
+        "samples": {(cache,): hits.get(cache, 0) / total if total else 0.0 for cache, total in totals.items()},
+    }
+    return merged
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value: float) -> str:
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+def render(merged: Dict[str, dict]) -> str:
+    """
+    Prometheus text exposition format (version 0.0.4).
+    """
+    lines: List[str] = []
+    for name, metric in merged.items():
+        lines.append(f"# HELP {name} {metric['help']}")
+        lines.append(f"# TYPE {name} {metric['type']}")
+        labels = metric["labels"]
+        for key, value in metric["samples"].items():
+            if metric["type"] != "histogram":
+                lines.append(f"{name}{_labels(labels, key)} {_number(value)}")
+                continue
+            cumulative = 0
+            for bound, count in zip(metric["buckets"] + ["+Inf"], value[:-1]):
+                cumulative += count
+                le = 'le="%s"' % ("+Inf" if bound == "+Inf" else _number(float(bound)))
+                lines.append(f"{name}_bucket{_labels(labels, key, le)} {cumulative}")
+            lines.append(f"{name}_sum{_labels(labels, key)} {_number(value[-1])}")
+            lines.append(f"{name}_count{_labels(labels, key)} {cumulative}")
+    return "\n".join(lines) + "\n"
+
+
+class MetricsExporter:
+    """
+    Shares this worker's snapshot with the other workers through Redis:
+    every `interval` seconds the snapshot is written to its own key,
+    expiring after three missed intervals, and `collect` merges the
+    snapshots of all live workers. Without Redis only this worker's
+    metrics are reported.
+    """
+
+    def __init__(
+        self,
+        registry: MetricsRegistry,
+        redis=None,
+        interval: float = 5.0,
+        prefix: str = "metrics:worker:",
+    ):
+        self.registry = registry
+        self.interval = interval
+        self.prefix = prefix
+        self.worker_id = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._redis = redis
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def redis(self):
+        # Imported here: RedisClient itself records into this module
+        from app.db.redis import redis_client as default_redis_client
+        return self._redis or default_redis_client
+
+    @property
+    def key(self) -> str:
+        return f"{self.prefix}{self.worker_id}"
+
+    async def publish(self):
+        await self.redis.set(self.key, json.dumps(self.registry.snapshot()), max(1, int(self.interval * 3)))
+
+    async def collect(self) -> Dict[str, dict]:
+        snapshots = [self.registry.snapshot()]
+        try:
+            keys = [key async for key in self.redis.redis.scan_iter(match=f"{self.prefix}*", count=100)]
+            keys = [key for key in keys if key != self.key]
+            if keys:
+                snapshots.extend(json.loads(data) for data in await self.redis.redis.mget(keys) if data)
+        except Exception as e:
+            logger.bind(request_id="metrics").warning("Could not read other workers' metrics: {error}", error=str(e))
+        return add_hit_ratios(merge(snapshots))
+
+    async def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        try:
+            await self.redis.delete(self.key)
+        except Exception:
+            pass
+
+    async def _run(self):
+        while True:
+            try:
+                await self.publish()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.bind(request_id="metrics").warning("Could not publish metrics: {error}", error=str(e))
+            await asyncio.sleep(self.interval)
+
+
+registry = MetricsRegistry()
+
+http_requests = registry.counter(
+    "http_requests_total", "HTTP requests by route and status", ("method", "route", "status")
+)
+http_request_duration = registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency by route", ("method", "route")
+)
+redis_command_duration = registry.histogram(
+    "redis_command_duration_seconds", "Redis command latency by command", ("command",)
+)
+db_pool_checkout_wait = registry.histogram(
+    "db_pool_checkout_wait_seconds", "Time spent waiting for a database connection", ("engine",)
+)
+
+# Cache name -> callable returning {result: count}, result being "miss" or
+# where the hit was served from
+_cache_lookups: Dict[str, Callable[[], Dict[str, float]]] = {}
+
+
+def register_cache(name: str, lookups: Callable[[], Dict[str, float]]):
+    _cache_lookups[name] = lookups
+
+
+def _collect_cache_lookups() -> Dict[LabelValues, float]:
+    return {
+        (cache, result): count
+        for cache, lookups in _cache_lookups.items()
+        for result, count in lookups().items()
+    }
+
+
+cache_lookups = registry.counter(
+    "cache_lookups_total", "Cache lookups by cache and result", ("cache", "result"), collect=_collect_cache_lookups
+)
+
+exporter = MetricsExporter(registry, interval=settings.METRICS_PUSH_INTERVAL)
@@ -0,0 +1,36 @@
+import base64
+import json
+from datetime import datetime
+from typing import Optional
+
+
+def encode_cursor(last_id: int, sort_by: Optional[str] = None, value=None) -> str:
+    """
+    Build an opaque continuation cursor from the last row of a page.
+    """
+    payload = {"id": last_id}
+    if sort_by:
+        payload["s"] = sort_by
+        payload["v"] = value.isoformat() if isinstance(value, datetime) else value
+        payload["dt"] = isinstance(value, datetime)
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort_by: Optional[str] = None) -> dict:
+    """
+    Decode a cursor made by `encode_cursor`. Raises ValueError when the
+    cursor is malformed or was issued for a different sort column.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        last_id = int(payload["id"])
+    except (ValueError, TypeError, KeyError) as e:
+        raise ValueError("Invalid cursor") from e
+    if payload.get("s") != sort_by:
+        raise ValueError("Cursor does not match sort_by")
+    value = payload.get("v")
+    if payload.get("dt") and value is not None:
+        value = datetime.fromisoformat(value)
+    return {"id": last_id, "value": value}
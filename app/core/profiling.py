@@ -0,0 +1,205 @@
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+# Leaf added to samples taken while the request was suspended in an await
+WAITING_FRAME = ("(waiting)", "", 0)
+
+
+def _short_path(filename: str) -> str:
+    marker = "site-packages" + os.sep
+    if marker in filename:
+        return filename.split(marker, 1)[1]
+    cwd = os.getcwd() + os.sep
+    return filename[len(cwd):] if filename.startswith(cwd) else filename
+
+
+def _frame_key(frame) -> Tuple[str, str, int]:
+    # Stacks are tuples of these, root to leaf
+    code = frame.f_code
+    return code.co_qualname, code.co_filename, code.co_firstlineno
+
+
+def _coroutine_frames(coro) -> list:
+    # The chain of coroutines the task is awaiting through, outermost first
+    frames = []
+    while coro is not None:
+        frame = getattr(coro, "cr_frame", None) or getattr(coro, "gi_frame", None) or getattr(coro, "ag_frame", None)
+        if frame is None:
+            break
+        frames.append(frame)
+        coro = getattr(coro, "cr_await", None) or getattr(coro, "gi_yieldfrom", None) or getattr(coro, "ag_await", None)
+    return frames
+
+
+class RequestProfile:
+    """
+    Stack samples of one request's task. Samples taken while the task runs
+    come from the loop thread's stack, cut at the task's coroutine; the
+    others from its await chain, ending in WAITING_FRAME.
+    """
+
+    def __init__(self, request_id: str, label: str, task: asyncio.Task, thread_id: int):
+        self.request_id = request_id
+        self.label = label
+        self.task = task
+        self.thread_id = thread_id
+        self.loop = task.get_loop()
+        self.started = time.perf_counter()
+        self.duration = 0.0
+        self.samples: Counter = Counter()
+
+    def sample(self, frames: Dict[int, object]):
+        root = self.task.get_coro()
+        root_frame = getattr(root, "cr_frame", None)
+        if root_frame is None:
+            return
+        stack: List = []
+        if asyncio.current_task(self.loop) is self.task:
+            frame = frames.get(self.thread_id)
+            while frame is not None:
+                stack.append(frame)
+                if frame is root_frame:
+                    break
+                frame = frame.f_back
+            else:
+                # Not inside the task's coroutine after all
+                return
+            stack.reverse()
+            self.samples[tuple(_frame_key(f) for f in stack)] += 1
+        else:
+            stack = _coroutine_frames(root)
+            self.samples[tuple(_frame_key(f) for f in stack) + (WAITING_FRAME,)] += 1
+
+    def collapsed(self) -> str:
+        """
+        Brendan Gregg's collapsed stack format, one "a;b;c count" per line.
+        """
+        lines = []
+        for stack, count in self.samples.most_common():
+            names = [f"{name} ({_short_path(filename)}:{line})" if filename else name for name, filename, line in stack]
+            lines.append(f"{';'.join(names)} {count}")
+        return "\n".join(lines) + "\n"
+
+    def speedscope(self, interval: float) -> str:
+        frames: List[dict] = []
+        index: Dict[Tuple[str, str, int], int] = {}
+        samples, weights = [], []
+        for stack, count in self.samples.most_common():
+            ids = []
+            for key in stack:
+                frame_id = index.get(key)
+                if frame_id is None:
+                    frame_id = index[key] = len(frames)
+                    name, filename, line = key
+                    frames.append({"name": name, "file": _short_path(filename), "line": line} if filename else {"name": name})
+                ids.append(frame_id)
+            samples.append(ids)
+            weights.append(count * interval * 1000)
+        return json.dumps({
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": f"{self.label} {self.request_id}",
+            "exporter": "fastapi-base",
+            "shared": {"frames": frames},
+            "profiles": [{
+                "type": "sampled",
+                "name": f"{self.label} {self.request_id}",
+                "unit": "milliseconds",
+                "startValue": 0,
+                "endValue": self.duration * 1000,
+                "samples": samples,
+                "weights": weights,
+            }],
+        })
+
+
+class StackSampler:
+    """
+    Background thread sampling the tasks of profiled requests every
+    `interval` seconds. It sleeps on a condition while nothing is being
+    profiled, so unprofiled traffic pays nothing.
+    """
+
+    def __init__(self, interval: float = 0.001):
+        self.interval = interval
+        self._profiles: Dict[int, RequestProfile] = {}
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = False
+
+    def start(self, request_id: str, label: str) -> RequestProfile:
+        profile = RequestProfile(request_id, label, asyncio.current_task(), threading.get_ident())
+        with self._condition:
+            self._profiles[id(profile)] = profile
+            if self._thread is None or not self._thread.is_alive():
+                self._stopped = False
+                self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+                self._thread.start()
+            self._condition.notify()
+        return profile
+
+    def finish(self, profile: RequestProfile) -> RequestProfile:
+        with self._condition:
+            self._profiles.pop(id(profile), None)
+        profile.duration = time.perf_counter() - profile.started
+        return profile
+
+    def stop(self):
+        with self._condition:
+            self._stopped = True
+            self._condition.notify()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._profiles and not self._stopped:
+                    self._condition.wait()
+                if self._stopped:
+                    return
+                profiles = list(self._profiles.values())
+            frames = sys._current_frames()
+            for profile in profiles:
+                try:
+                    profile.sample(frames)
+                except Exception:
+                    # The loop moved on while we were reading its stack
+                    pass
+            del frames
+            time.sleep(self.interval)
+
+
+class ProfileRing:
+    """
+    Keeps the last `max_files` profiles in `directory`, oldest deleted
+    first. Files must be named with `file_name`.
+    """
+
+    def __init__(self, directory: str, max_files: int = 50):
+        self.directory = directory
+        self.max_files = max_files
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def file_name(suffix: str) -> str:
+        # Time first, so names sort oldest first
+        return f"{time.time_ns()}-{suffix}"
+
+    def write(self, name: str, content: str) -> str:
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            path = os.path.join(self.directory, name)
+            with open(path + ".tmp", "w") as f:
+                f.write(content)
+            os.replace(path + ".tmp", path)
+            entries = sorted(entry for entry in os.listdir(self.directory) if not entry.endswith(".tmp"))
+            for entry in entries[:max(0, len(entries) - self.max_files)]:
+                try:
+                    os.remove(os.path.join(self.directory, entry))
+                except FileNotFoundError:
+                    pass
+            return path
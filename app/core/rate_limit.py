@@ -10,7 +10,8 @@ def rate_limit(
     endpoint: str,
     max_requests: int = 100,
     time_window_seconds: int = 60,
-    customer_id_header: str = "X-Customer-ID"
+    customer_id_header: str = "X-Customer-ID",
+    algorithm: str = "fixed_window"
 ):
     """
     Decorator for rate limiting API endpoints using Redis.
@@ -20,6 +21,7 @@ def rate_limit(
         max_requests: Maximum number of requests allowed in the time window
         time_window_seconds: Time window in seconds
         customer_id_header: Header name to get customer ID from
+        algorithm: Rate limit algorithm (fixed_window, sliding_window_log, gcra or hybrid)
     """
     def decorator(func: Callable):
         @wraps(func)
@@ -44,7 +46,7 @@ def rate_limit(
             redis_client = await get_redis_client()
             
             # Initialize rate limit service
-            rate_limit_service = RedisRateLimitService(redis_client)
+            rate_limit_service = RedisRateLimitService(redis_client, algorithm)
 
             # Check rate limit
             rate_limit_response = await rate_limit_service.check_rate_limit(
@@ -1,15 +1,10 @@
 import redis.asyncio as redis
-from app.core.config import settings
+from app.db.redis import redis_client
 
 
 async def get_redis_client() -> redis.Redis:
     """
-    Get Redis client instance.
+    Get the shared Redis client. Connections come from the pool created at
+    application startup, so no client is built per request.
     """
-    return redis.Redis(
-        host=settings.REDIS_HOST,
-        port=settings.REDIS_PORT,
-        db=settings.REDIS_DB,
-        password=settings.REDIS_PASSWORD,
-        decode_responses=False
-    ) 
\ No newline at end of file
+    return redis_client.redis
@@ -0,0 +1,99 @@
+import hashlib
+from typing import Any, Dict, Sequence
+import redis.asyncio as redis
+from redis.exceptions import NoScriptError
+
+
+class RedisScript:
+    """
+    Lua script executed server-side with EVALSHA.
+
+    The script is registered once per Redis server with SCRIPT LOAD. If the
+    server has lost its script cache (restart, SCRIPT FLUSH, failover) the
+    NOSCRIPT error is caught, the script is reloaded and the call retried.
+    """
+
+    def __init__(self, name: str, source: str):
+        self.name = name
+        self.source = source
+        self.sha = hashlib.sha1(source.encode()).hexdigest()
+
+    async def load(self, client: redis.Redis) -> str:
+        return await client.script_load(self.source)
+
+    async def __call__(self, client: redis.Redis, keys: Sequence[str], args: Sequence[Any]) -> Any:
+        try:
+            return await client.evalsha(self.sha, len(keys), *keys, *args)
+        except NoScriptError:
+            await self.load(client)
+            return await client.evalsha(self.sha, len(keys), *keys, *args)
+
+
+# All rate limit scripts take KEYS[1] = counter key, ARGV[1] = max requests,
+# ARGV[2] = window in milliseconds and return {allowed, remaining, retry_after_ms}.
+# Time is read from the Redis server so every worker shares the same clock.
+
+FIXED_WINDOW = RedisScript("fixed_window", """
+local limit = tonumber(ARGV[1])
+local window_ms = tonumber(ARGV[2])
+local current = tonumber(redis.call('GET', KEYS[1]) or '0')
+if current >= limit then
+    return {0, 0, redis.call('PTTL', KEYS[1])}
+end
+current = redis.call('INCR', KEYS[1])
+if current == 1 then
+    redis.call('PEXPIRE', KEYS[1], window_ms)
+end
+return {1, limit - current, 0}
+""")
+
+# ARGV[3] is a unique member for this request so concurrent requests landing
+# in the same millisecond are all recorded in the log.
+SLIDING_WINDOW_LOG = RedisScript("sliding_window_log", """
+local limit = tonumber(ARGV[1])
+local window_ms = tonumber(ARGV[2])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now - window_ms)
+local count = redis.call('ZCARD', KEYS[1])
+if count >= limit then
+    local oldest = redis.call('ZRANGE', KEYS[1], 0, 0, 'WITHSCORES')
+    return {0, 0, tonumber(oldest[2]) + window_ms - now}
+end
+redis.call('ZADD', KEYS[1], now, ARGV[3])
+redis.call('PEXPIRE', KEYS[1], window_ms)
+return {1, limit - count - 1, 0}
+""")
+
+# Generic cell rate algorithm: one key holding the theoretical arrival time.
+# Allows a burst of `limit` requests, then one every window/limit.
+GCRA = RedisScript("gcra", """
+local limit = tonumber(ARGV[1])
+local window_ms = tonumber(ARGV[2])
+local emission = window_ms / limit
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + tonumber(t[2]) / 1000
+local tat = tonumber(redis.call('GET', KEYS[1]) or now)
+if tat < now then
+    tat = now
+end
+local new_tat = tat + emission
+local allow_at = new_tat - window_ms
+if allow_at > now then
+    return {0, 0, math.ceil(allow_at - now)}
+end
+redis.call('SET', KEYS[1], string.format('%.3f', new_tat), 'PX', math.ceil(new_tat - now))
+return {1, math.floor((now - allow_at) / emission), 0}
+""")
+
+RATE_LIMIT_SCRIPTS: Dict[str, RedisScript] = {
+    script.name: script for script in (FIXED_WINDOW, SLIDING_WINDOW_LOG, GCRA)
+}
+
+
+async def load_rate_limit_scripts(client: redis.Redis) -> None:
+    """
+    Register every rate limit script on the server (SCRIPT LOAD).
+    """
+    for script in RATE_LIMIT_SCRIPTS.values():
+        await script.load(client)
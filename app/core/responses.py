@@ -0,0 +1,122 @@
+import functools
+from typing import Any, Awaitable, Callable, Dict, Optional
+import orjson
+from fastapi import Request
+from fastapi.responses import JSONResponse, Response
+from fastapi.routing import APIRoute
+from pydantic import BaseModel
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.core.global_define import ErrorResponse, SystemMessages
+from app.core.versioning import table_versions
+from app.schemas.base import BaseResponse
+
+
+def _default(value: Any):
+    if isinstance(value, BaseModel):
+        return value.model_dump()
+    return str(value)
+
+
+def encode(content: Any) -> bytes:
+    """
+    Serialize a response payload to JSON bytes without validating it again:
+    pydantic models through their compiled serializer, anything else with
+    orjson.
+    """
+    if isinstance(content, BaseModel):
+        return content.__pydantic_serializer__.to_json(content)
+    return orjson.dumps(content, default=_default)
+
+
+# Static responses encoded once, looked up by identity
+_pre_encoded: Dict[int, bytes] = {}
+
+
+def pre_encode(content: Any):
+    _pre_encoded[id(content)] = encode(content)
+
+
+for _message in vars(SystemMessages).values():
+    if isinstance(_message, BaseResponse):
+        pre_encode(_message)
+pre_encode(ErrorResponse.DEFAULT)
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        body = _pre_encoded.get(id(content))
+        if body is None:
+            body = encode(content)
+        return body
+
+
+class FastJSONRoute(APIRoute):
+    """
+    Route that turns whatever the endpoint returns into a FastJSONResponse
+    itself, so FastAPI skips jsonable_encoder and response validation.
+    Endpoints returning a Response are passed through unchanged.
+    """
+
+    def __init__(self, path: str, endpoint: Callable, **kwargs):
+        @functools.wraps(endpoint)
+        async def serialize(*args, **kwargs):
+            result = await endpoint(*args, **kwargs)
+            if isinstance(result, Response):
+                return result
+            return FastJSONResponse(result)
+
+        super().__init__(path, serialize, **kwargs)
+
+
+# Encoded bodies of successful responses keyed by (path, query, version)
+response_cache = LRUCache(settings.EMPLOYEE_RESPONSE_CACHE_SIZE, settings.EMPLOYEE_RESPONSE_CACHE_TTL)
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    # Weak comparison, as required for If-None-Match
+    return "*" in candidates or any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+async def versioned_response(
+    request: Request, table: str, build: Callable[[], Awaitable]
+) -> Response:
+    """
+    Serve a read that depends only on `table` and the query string with an
+    ETag from the table version: a matching If-None-Match gets a 304
+    without calling `build`, and with EMPLOYEE_RESPONSE_CACHE_TTL set,
+    repeat queries are answered from `response_cache`. Error responses are
+    never tagged or cached.
+
+    The body is tagged with the version read before `build`, which may read
+    from a replica: a lagging replica can serve rows older than that
+    version, accepted like any other replica read. A body built while the
+    version moved on is returned untagged.
+    """
+    version = await table_versions.get(table)
+    if version is None:
+        return await build()
+
+    etag = f'"{table}-{version}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    use_cache = response_cache.ttl > 0
+    key = (request.url.path, tuple(sorted(request.query_params.multi_items())), version)
+    body = response_cache.get(key) if use_cache else None
+    if body is None:
+        result = await build()
+        if isinstance(result, Response):
+            return result
+        if not isinstance(result, BaseResponse) or result.status != 1:
+            return FastJSONResponse(result)
+        if await table_versions.get(table) != version:
+            return FastJSONResponse(result)
+        body = FastJSONResponse(result).body
+        if use_cache:
+            response_cache.set(key, body)
+    return Response(content=body, media_type="application/json", headers=headers)
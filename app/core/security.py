@@ -1,15 +1,23 @@
+import hmac
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
-from fastapi.security import OAuth2PasswordBearer
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer, OAuth2PasswordBearer
+from app.core.blocking import BlockingPool
 from app.core.config import settings
+from app.core.metrics import register_cache
+from app.core.token_cache import TokenCache
 from app.schemas.user import TokenData
 
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/v1/auth/token")
+diagnostics_scheme = HTTPBearer(auto_error=False)
+password_pool = BlockingPool("password-hash", settings.PASSWORD_HASH_WORKERS)
+token_cache = TokenCache(settings.TOKEN_CACHE_SIZE, settings.TOKEN_CACHE_MAX_TTL)
+register_cache("token", lambda: {"hit": token_cache.hits, "miss": token_cache.misses})
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -20,6 +28,18 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """
+    verify_password on `password_pool`: bcrypt takes hundreds of
+    milliseconds and would otherwise stall every request on the worker.
+    """
+    return await password_pool.run(pwd_context.verify, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    return await password_pool.run(pwd_context.hash, password)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     to_encode = data.copy()
     if expires_delta:
@@ -33,6 +53,12 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     return encoded_jwt
 
 
+def decode_access_token(token: str) -> dict:
+    return jwt.decode(
+        token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM]
+    )
+
+
 async def get_current_user(token: str = Depends(oauth2_scheme)) -> TokenData:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -40,13 +66,30 @@ async def get_current_user(token: str = Depends(oauth2_scheme)) -> TokenData:
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        payload = jwt.decode(
-            token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM]
-        )
+        payload = token_cache.verify(token, decode_access_token)
         username: str = payload.get("sub")
         if username is None:
             raise credentials_exception
         token_data = TokenData(username=username)
     except JWTError:
         raise credentials_exception
-    return token_data 
\ No newline at end of file
+    return token_data
+
+
+async def require_diagnostics_token(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(diagnostics_scheme)
+):
+    """
+    Guard for the diagnostics routes: the bearer token must equal
+    DIAGNOSTICS_TOKEN. While no token is configured the routes do not exist.
+    """
+    if not settings.DIAGNOSTICS_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if credentials is None or not hmac.compare_digest(
+        credentials.credentials.encode(), settings.DIAGNOSTICS_TOKEN.encode()
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
@@ -1,9 +1,13 @@
+import re
+import time
+from collections import OrderedDict, deque
+from contextvars import ContextVar
+from typing import Deque, Dict, List, Optional
 from loguru import logger
-from sqlalchemy.engine import Engine
 from sqlalchemy import event
 from sqlalchemy.ext.asyncio import AsyncEngine
-from contextvars import ContextVar
-import time
+from app.core.config import settings
+from app.core.tracing import record_sql
 
 request_id_context: ContextVar[str] = ContextVar('request_id', default='')
 
@@ -13,20 +17,179 @@ def set_request_id(request_id: str):
 def get_request_id() -> str:
     return request_id_context.get()
 
-def setup_sql_logging(engine: AsyncEngine):
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER = re.compile(r"%\(\w+\)s|%s|:\w+|\?")
+_IN_LIST = re.compile(r"\bIN\s*\((?:\s*\?\s*,?)+\)", re.IGNORECASE)
+_VALUES_LIST = re.compile(r"\bVALUES\s*\([^)]*\)(?:\s*,\s*\([^)]*\))*", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+
+
+def fingerprint(statement: str) -> str:
+    """
+    Normalize a SQL statement so executions that differ only in literal
+    values, placeholder style or IN/VALUES list length share one key.
+    """
+    sql = _STRING_LITERAL.sub("?", statement)
+    sql = _PLACEHOLDER.sub("?", sql)
+    sql = _NUMBER_LITERAL.sub("?", sql)
+    sql = _IN_LIST.sub("IN (...)", sql)
+    sql = _VALUES_LIST.sub("VALUES (...)", sql)
+    return _WHITESPACE.sub(" ", sql).strip()
+
+
+class StatementStats:
+    __slots__ = ("count", "total_time", "max_time", "rows", "samples")
+
+    def __init__(self, sample_size: int):
+        self.count = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+        self.rows = 0
+        self.samples: Deque[float] = deque(maxlen=sample_size)
+
+    def record(self, elapsed: float, rowcount: int):
+        self.count += 1
+        self.total_time += elapsed
+        if elapsed > self.max_time:
+            self.max_time = elapsed
+        if rowcount > 0:
+            self.rows += rowcount
+        self.samples.append(elapsed)
+
+    def to_dict(self) -> dict:
+        ordered = sorted(self.samples)
+
+        def pct(p: float) -> float:
+            return ordered[min(len(ordered) - 1, int(p * len(ordered)))] * 1000 if ordered else 0.0
+
+        return {
+            "count": self.count,
+            "total_ms": self.total_time * 1000,
+            "avg_ms": self.total_time * 1000 / self.count if self.count else 0.0,
+            "max_ms": self.max_time * 1000,
+            "p50_ms": pct(0.50),
+            "p95_ms": pct(0.95),
+            "p99_ms": pct(0.99),
+            "rows": self.rows,
+        }
+
+
+class RequestQueryStats:
+    __slots__ = ("count", "total_time", "per_statement", "flagged")
+
+    def __init__(self):
+        self.count = 0
+        self.total_time = 0.0
+        self.per_statement: Dict[str, int] = {}
+        self.flagged: List[str] = []
+
+
+class SqlStatsAggregator:
+    """
+    In-memory SQL telemetry: per fingerprint count/latency aggregates and
+    per request query counters (keyed by request_id_context) used to flag
+    N+1 patterns. Latency percentiles come from the last `sample_size`
+    executions of each fingerprint.
+    """
+
+    def __init__(
+        self,
+        slow_query_ms: float = settings.SQL_SLOW_QUERY_MS,
+        n_plus_one_threshold: int = settings.SQL_N_PLUS_ONE_THRESHOLD,
+        max_statements: int = 1000,
+        max_requests: int = 1000,
+        sample_size: int = 1000,
+    ):
+        self.slow_query_ms = slow_query_ms
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self.max_statements = max_statements
+        self.max_requests = max_requests
+        self.sample_size = sample_size
+        self.statements: Dict[str, StatementStats] = {}
+        self.requests: "OrderedDict[str, RequestQueryStats]" = OrderedDict()
+        self.slow_queries = 0
+        self.n_plus_one_detected = 0
+        self._fingerprints: Dict[str, str] = {}
+
+    def _fingerprint(self, statement: str) -> str:
+        key = self._fingerprints.get(statement)
+        if key is None:
+            key = fingerprint(statement)
+            if len(self._fingerprints) < self.max_statements * 4:
+                self._fingerprints[statement] = key
+        return key
+
+    def record(self, statement: str, elapsed: float, rowcount: int):
+        key = self._fingerprint(statement)
+        stats = self.statements.get(key)
+        if stats is None:
+            if len(self.statements) >= self.max_statements:
+                key = "<other>"
+                stats = self.statements.get(key)
+            if stats is None:
+                stats = self.statements[key] = StatementStats(self.sample_size)
+        stats.record(elapsed, rowcount)
+
+        request_id = get_request_id()
+        if elapsed * 1000 >= self.slow_query_ms:
+            self.slow_queries += 1
+            # Only the fingerprint: bound values may be personal data or secrets
+            logger.bind(request_id=request_id).warning(
+                "Slow SQL ({time:.1f}ms): {sql}", time=elapsed * 1000, sql=key
+            )
+
+        if request_id:
+            self._record_request(request_id, key, elapsed)
+
+    def _record_request(self, request_id: str, key: str, elapsed: float):
+        request_stats = self.requests.get(request_id)
+        if request_stats is None:
+            request_stats = self.requests[request_id] = RequestQueryStats()
+            if len(self.requests) > self.max_requests:
+                self.requests.popitem(last=False)
+        request_stats.count += 1
+        request_stats.total_time += elapsed
+        count = request_stats.per_statement.get(key, 0) + 1
+        request_stats.per_statement[key] = count
+        if count == self.n_plus_one_threshold:
+            self.n_plus_one_detected += 1
+            request_stats.flagged.append(key)
+            logger.bind(request_id=request_id).warning(
+                "Possible N+1: statement executed {count} times in one request: {sql}",
+                count=count, sql=key
+            )
+
+    def get_request_stats(self, request_id: str) -> Optional[RequestQueryStats]:
+        return self.requests.get(request_id)
+
+    def snapshot(self, top: int = 50) -> dict:
+        ordered = sorted(self.statements.items(), key=lambda item: item[1].total_time, reverse=True)
+        return {
+            "statements": [{"sql": sql, **stats.to_dict()} for sql, stats in ordered[:top]],
+            "slow_queries": self.slow_queries,
+            "n_plus_one_detected": self.n_plus_one_detected,
+            "slow_query_ms": self.slow_query_ms,
+        }
+
+    def reset(self):
+        self.statements.clear()
+        self.requests.clear()
+        self.slow_queries = 0
+        self.n_plus_one_detected = 0
+
+
+sql_stats = SqlStatsAggregator()
+
+
+def setup_sql_logging(engine: AsyncEngine, aggregator: SqlStatsAggregator = sql_stats):
     @event.listens_for(engine.sync_engine, "before_cursor_execute")
     def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
-        conn.info.setdefault('query_start_time', []).append(time.time())
-        request_id = get_request_id()
-        log = logger.bind(request_id=request_id)
-        log.info("Executing SQL: {sql}", sql=statement)
-        if parameters:
-            log.info("Parameters: {params}", params=parameters)
+        context._query_start_time = time.perf_counter()
 
     @event.listens_for(engine.sync_engine, "after_cursor_execute")
     def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
-        total = time.time() - conn.info['query_start_time'].pop(-1)
-        request_id = get_request_id()
-        log = logger.bind(request_id=request_id)
-        rowcount = cursor.rowcount
-        log.info("SQL executed in {time:.2f}s, affected {rows} rows", time=total, rows=rowcount) 
\ No newline at end of file
+        total = time.perf_counter() - context._query_start_time
+        aggregator.record(statement, total, cursor.rowcount)
+        record_sql(statement, total)
@@ -0,0 +1,90 @@
+import hashlib
+import time
+from typing import Callable, Dict, Optional
+from jose import JWTError, jwt
+from app.core.cache import LRUCache
+
+
+class TokenCache:
+    """
+    Claims of verified JWTs keyed by the SHA-256 digest of the token, so a
+    token presented again skips signature verification. An entry expires
+    at the token's `exp` claim, and after `max_ttl` seconds at most.
+
+    Revocations are checked on every lookup, cached or not. A token is
+    revoked by its `jti` claim when it has one, by its digest otherwise,
+    and stays on the list until it would have expired anyway. The list is
+    per process: revoke on every worker.
+    """
+
+    def __init__(self, max_size: int = 10000, max_ttl: float = 300):
+        self.max_ttl = max_ttl
+        self.entries = LRUCache(max_size, max_ttl)
+        # Token id -> wall clock time after which the entry can be dropped
+        self._revoked: Dict[str, Optional[float]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.rejections = 0
+
+    @staticmethod
+    def digest(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def verify(self, token: str, decode: Callable[[str], dict]) -> dict:
+        """
+        Return the claims of `token`, calling `decode` (which verifies the
+        signature and raises JWTError) only when they are not cached.
+        """
+        digest = self.digest(token)
+        claims = self.entries.get(digest)
+        if claims is None:
+            self.misses += 1
+            claims = decode(token)
+            ttl = self.max_ttl
+            if "exp" in claims:
+                ttl = min(ttl, float(claims["exp"]) - time.time())
+            if ttl > 0:
+                self.entries.set(digest, claims, ttl)
+        else:
+            self.hits += 1
+        if self._revoked and (claims.get("jti") or digest) in self._revoked:
+            self.rejections += 1
+            raise JWTError("Token has been revoked")
+        return claims
+
+    def revoke(self, token: str):
+        """
+        Revoke `token` (its signature is not checked).
+        """
+        digest = self.digest(token)
+        self.entries.delete(digest)
+        claims = jwt.get_unverified_claims(token)
+        self.revoke_id(claims.get("jti") or digest, claims.get("exp"))
+
+    def revoke_id(self, token_id: str, expires_at: Optional[float] = None):
+        """
+        Revoke every token whose `jti` is `token_id`. Without `expires_at`
+        the entry is kept for the life of the process.
+        """
+        now = time.time()
+        for key, until in list(self._revoked.items()):
+            if until is not None and until < now:
+                del self._revoked[key]
+        self._revoked[token_id] = float(expires_at) if expires_at is not None else None
+
+    def clear(self):
+        self.entries.clear()
+        self._revoked.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self.entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "rejections": self.rejections,
+            "revoked": len(self._revoked),
+            "evictions": self.entries.evictions,
+            "expirations": self.entries.expirations,
+        }
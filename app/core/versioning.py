@@ -0,0 +1,76 @@
+import asyncio
+import time
+from typing import Optional, Set
+from loguru import logger
+from app.db.hooks import after_commit
+from app.db.redis import RedisClient, redis_client as default_redis_client
+
+
+class TableVersions:
+    """
+    Per-table version counters in Redis, shared by every worker and bumped
+    after each committed write. A table's version identifies its content,
+    so it can be used as an ETag and as a response cache key.
+
+    `get` returns None while Redis is unreachable (retried after
+    `retry_after` seconds): without a shared version there is no safe ETag.
+    A table whose bump failed also gets None, until a retry in the
+    background bumps it: its old version no longer matches its content.
+    """
+
+    def __init__(self, redis: Optional[RedisClient] = None, retry_after: float = 5.0, bump_retry_interval: float = 1.0):
+        self._redis = redis
+        self.retry_after = retry_after
+        self.bump_retry_interval = bump_retry_interval
+        self._down_until = 0.0
+        self._unbumped: Set[str] = set()
+        self._retry_task: Optional[asyncio.Task] = None
+
+    @property
+    def redis(self) -> RedisClient:
+        return self._redis or default_redis_client
+
+    @staticmethod
+    def _key(table: str) -> str:
+        return f"table_version:{table}"
+
+    def _failed(self, e: Exception):
+        self._down_until = time.monotonic() + self.retry_after
+        logger.bind(request_id="versioning").warning("Table versions unavailable: {error}", error=str(e))
+
+    async def get(self, table: str) -> Optional[int]:
+        if table in self._unbumped or time.monotonic() < self._down_until:
+            return None
+        try:
+            return int(await self.redis.get(self._key(table)) or 0)
+        except Exception as e:
+            self._failed(e)
+            return None
+
+    async def bump(self, table: str):
+        try:
+            await self.redis.redis.incr(self._key(table))
+        except Exception as e:
+            self._failed(e)
+            self._unbumped.add(table)
+            if self._retry_task is None or self._retry_task.done():
+                self._retry_task = asyncio.create_task(self._retry_bumps())
+
+    async def _retry_bumps(self):
+        # One increment covers any number of missed writes
+        while self._unbumped:
+            await asyncio.sleep(self.bump_retry_interval)
+            for table in list(self._unbumped):
+                try:
+                    await self.redis.redis.incr(self._key(table))
+                    self._unbumped.discard(table)
+                except Exception as e:
+                    logger.bind(request_id="versioning").warning(
+                        "Table version bump for {table} still failing: {error}", table=table, error=str(e)
+                    )
+
+    def bump_on_commit(self, session, table: str):
+        after_commit(session, lambda: self.bump(table))
+
+
+table_versions = TableVersions()
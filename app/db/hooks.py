@@ -0,0 +1,53 @@
+import asyncio
+import contextvars
+import inspect
+from typing import Any, Callable
+from loguru import logger
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app.core.deadline import deadline_context
+
+# session.info key holding the callbacks queued by after_commit()
+AFTER_COMMIT_KEY = "after_commit_callbacks"
+
+# The loop only keeps weak references to tasks
+_tasks: set = set()
+
+
+def after_commit(session, callback: Callable[[], Any]):
+    """
+    Run `callback` once `session` (AsyncSession or Session) commits; drop it
+    if the transaction rolls back. Coroutines it returns are scheduled on
+    the running loop, outside the request deadline: they must finish even
+    when the commit came late.
+    """
+    sync_session = getattr(session, "sync_session", session)
+    sync_session.info.setdefault(AFTER_COMMIT_KEY, []).append(callback)
+
+
+@event.listens_for(Session, "after_commit")
+def _run_after_commit(session: Session):
+    for callback in session.info.pop(AFTER_COMMIT_KEY, ()):
+        try:
+            result = callback()
+        except Exception as e:
+            logger.bind(request_id="db").warning("After commit callback failed: {error}", error=str(e))
+            continue
+        if inspect.iscoroutine(result):
+            context = contextvars.copy_context()
+            context.run(deadline_context.set, None)
+            try:
+                task = asyncio.get_running_loop().create_task(result, context=context)
+            except RuntimeError:
+                # No event loop (sync use): nothing can run the coroutine
+                result.close()
+                continue
+            _tasks.add(task)
+            task.add_done_callback(_tasks.discard)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_after_commit(session: Session, previous_transaction):
+    # Savepoint rollbacks keep the outer transaction and its callbacks
+    if previous_transaction.parent is None:
+        session.info.pop(AFTER_COMMIT_KEY, None)
@@ -0,0 +1,48 @@
+import time
+from typing import Dict
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from app.core.metrics import db_pool_checkout_wait, registry
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """
+    Queue pool that records how long each checkout waited for a connection
+    in db_pool_checkout_wait_seconds, labelled with `metrics_name`.
+    """
+
+    metrics_name = "primary"
+
+    def _do_get(self):
+        t_begin = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            db_pool_checkout_wait.observe(time.perf_counter() - t_begin, self.metrics_name)
+
+    def recreate(self):
+        # engine.dispose() swaps in a new pool
+        pool = super().recreate()
+        pool.metrics_name = self.metrics_name
+        return pool
+
+
+def register_pool_metrics(engines: Dict[str, AsyncEngine]):
+    """
+    Report the pools of `engines` (name -> engine) in db_pool_connections.
+    """
+
+    def collect():
+        samples = {}
+        for name, engine in engines.items():
+            pool = engine.pool
+            if not isinstance(pool, QueuePool):
+                continue
+            samples[(name, "size")] = pool.size()
+            samples[(name, "checked_out")] = pool.checkedout()
+            samples[(name, "idle")] = pool.checkedin()
+            # Negative while the pool is still below pool_size
+            samples[(name, "overflow")] = max(0, pool.overflow())
+        return samples
+
+    registry.gauge("db_pool_connections", "Database pool connections by state", ("engine", "state"), collect=collect)
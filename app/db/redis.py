@@ -1,24 +1,105 @@
 import json
+import time
 from typing import Any, List, Optional, Union
 import redis.asyncio as redis
 from app.core.config import settings
+from app.core.deadline import deadline_scope
+from app.core.metrics import redis_command_duration, registry
+
+
+class InstrumentedConnectionPool(redis.BlockingConnectionPool):
+    """
+    Blocking pool that records how long callers wait for a connection.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.acquisitions = 0
+        self.wait_time_total = 0.0
+        self.wait_time_max = 0.0
+
+    async def get_connection(self, command_name, *keys, **options):
+        t_begin = time.perf_counter()
+        connection = await super().get_connection(command_name, *keys, **options)
+        waited = time.perf_counter() - t_begin
+        self.acquisitions += 1
+        self.wait_time_total += waited
+        if waited > self.wait_time_max:
+            self.wait_time_max = waited
+        return connection
+
+    def stats(self) -> dict:
+        return {
+            "max_connections": self.max_connections,
+            "in_use": len(self._in_use_connections),
+            "idle": len(self._available_connections),
+            "acquisitions": self.acquisitions,
+            "wait_time_total_ms": self.wait_time_total * 1000,
+            "wait_time_avg_ms": self.wait_time_total * 1000 / self.acquisitions if self.acquisitions else 0.0,
+            "wait_time_max_ms": self.wait_time_max * 1000,
+        }
+
+
+class InstrumentedRedis(redis.Redis):
+    """
+    Redis client recording every command's latency, including the rate
+    limiter's EVALSHA calls, in redis_command_duration_seconds. Commands
+    are cancelled at the request deadline.
+    """
+
+    async def execute_command(self, *args, **options):
+        t_begin = time.perf_counter()
+        try:
+            async with deadline_scope():
+                return await super().execute_command(*args, **options)
+        finally:
+            redis_command_duration.observe(time.perf_counter() - t_begin, str(args[0]).upper())
 
 
 class RedisClient:
+    """
+    Process wide Redis client backed by a single connection pool.
+
+    The pool is created by `connect()` at application startup and closed by
+    `close()` at shutdown. Accessing `redis` before startup connects lazily
+    so scripts and tests keep working without the app lifecycle.
+    """
+
     def __init__(self):
-        self.pool = redis.ConnectionPool(
-            host=settings.REDIS_HOST,
-            port=settings.REDIS_PORT,
-            db=settings.REDIS_DB,
-            decode_responses=True,
-        )
-        self.redis = redis.Redis(connection_pool=self.pool)
+        self.pool: Optional[InstrumentedConnectionPool] = None
+        self._redis: Optional[redis.Redis] = None
+
+    def connect(self) -> redis.Redis:
+        if self._redis is None:
+            self.pool = InstrumentedConnectionPool(
+                host=settings.REDIS_HOST,
+                port=settings.REDIS_PORT,
+                db=settings.REDIS_DB,
+                password=settings.REDIS_PASSWORD,
+                max_connections=settings.REDIS_MAX_CONNECTIONS,
+                timeout=settings.REDIS_POOL_TIMEOUT,
+                socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+                socket_connect_timeout=settings.REDIS_SOCKET_CONNECT_TIMEOUT,
+                health_check_interval=settings.REDIS_HEALTH_CHECK_INTERVAL,
+                decode_responses=True,
+            )
+            self._redis = InstrumentedRedis(connection_pool=self.pool)
+        return self._redis
+
+    @property
+    def redis(self) -> redis.Redis:
+        return self._redis or self.connect()
+
+    def pool_stats(self) -> dict:
+        if self.pool is None:
+            return {}
+        return self.pool.stats()
 
     async def get(self, key: str) -> Optional[str]:
         return await self.redis.get(key)
 
-    async def set(self, key: str, value: str, expire: int = None) -> bool:
-        return await self.redis.set(key, value, ex=expire)
+    async def set(self, key: str, value: str, expire: int = None, only_if_absent: bool = False) -> bool:
+        return bool(await self.redis.set(key, value, ex=expire, nx=only_if_absent))
 
     async def delete(self, key: str) -> bool:
         return bool(await self.redis.delete(key))
@@ -27,8 +108,8 @@ class RedisClient:
         data = await self.get(key)
         return json.loads(data) if data else None
 
-    async def set_json(self, key: str, value: dict, expire: int = None) -> bool:
-        return await self.set(key, json.dumps(value), expire)
+    async def set_json(self, key: str, value: dict, expire: int = None, only_if_absent: bool = False) -> bool:
+        return await self.set(key, json.dumps(value), expire, only_if_absent)
 
     async def lpush(self, key: str, *values: Any) -> int:
         return await self.redis.lpush(key, *values)
@@ -46,7 +127,22 @@ class RedisClient:
         return await self.redis.rpop(key)
 
     async def close(self):
-        await self.redis.close()
+        if self._redis is not None:
+            await self._redis.aclose()
+            if self.pool is not None:
+                await self.pool.disconnect()
+            self._redis = None
+            self.pool = None
+
+
+redis_client = RedisClient()
+
+
+def _pool_connections() -> dict:
+    stats = redis_client.pool_stats()
+    if not stats:
+        return {}
+    return {("in_use",): stats["in_use"], ("idle",): stats["idle"], ("max",): stats["max_connections"]}
 
 
-redis_client = RedisClient() 
\ No newline at end of file
+registry.gauge("redis_pool_connections", "Redis pool connections by state", ("state",), collect=_pool_connections)
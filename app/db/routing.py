@@ -0,0 +1,170 @@
+import time
+from typing import Dict, List, Optional
+from loguru import logger
+from sqlalchemy import event, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select
+
+# Set in session.info once the session must stay on the primary
+USE_PRIMARY_KEY = "use_primary"
+# session.info key of the engine the session's reads were pinned to
+READ_ENGINE_KEY = "read_engine"
+
+
+def pin_to_primary(session):
+    """
+    Route every remaining statement of `session` to the primary.
+    """
+    getattr(session, "sync_session", session).info[USE_PRIMARY_KEY] = True
+
+
+def is_pinned_to_primary(session) -> bool:
+    return bool(getattr(session, "sync_session", session).info.get(USE_PRIMARY_KEY))
+
+
+class ReplicaRouter:
+    """
+    Picks the engine for read-only statements: one of the replicas by
+    "round_robin" or "least_connections" (fewest checked out pool
+    connections), or the primary when there is no healthy replica.
+
+    A replica whose connection fails is skipped for `retry_after` seconds.
+    """
+
+    STRATEGIES = ("round_robin", "least_connections")
+
+    def __init__(
+        self,
+        primary: AsyncEngine,
+        replicas: Optional[List[AsyncEngine]] = None,
+        strategy: str = "round_robin",
+        retry_after: float = 30.0,
+    ):
+        if strategy not in self.STRATEGIES:
+            raise ValueError(f"Unknown replica strategy: {strategy}")
+        self.primary = primary
+        self.replicas = list(replicas or [])
+        self.strategy = strategy
+        self.retry_after = retry_after
+        self._next = 0
+        self._down_until: Dict[Engine, float] = {}
+        self.reads = {"primary": 0, **{self._name(replica): 0 for replica in self.replicas}}
+        for replica in self.replicas:
+            event.listen(replica.sync_engine, "handle_error", self._on_error)
+
+    @staticmethod
+    def _name(engine: AsyncEngine) -> str:
+        return engine.url.render_as_string(hide_password=True)
+
+    def _on_error(self, context):
+        # Connect failures and dropped connections, not SQL errors
+        if context.connection is None or context.is_disconnect:
+            self.mark_unhealthy(context.engine)
+
+    def mark_unhealthy(self, engine: Engine):
+        self._down_until[engine] = time.monotonic() + self.retry_after
+        logger.bind(request_id="db").warning(
+            "Replica {url} unavailable, reads fall back for {seconds}s",
+            url=engine.url.render_as_string(hide_password=True), seconds=self.retry_after
+        )
+
+    def healthy_replicas(self) -> List[AsyncEngine]:
+        now = time.monotonic()
+        return [replica for replica in self.replicas if self._down_until.get(replica.sync_engine, 0) <= now]
+
+    def _choose(self, advance: bool) -> AsyncEngine:
+        healthy = self.healthy_replicas()
+        if not healthy:
+            return self.primary
+        if self.strategy == "least_connections":
+            return min(healthy, key=lambda replica: getattr(replica.sync_engine.pool, "checkedout", lambda: 0)())
+        for offset in range(len(self.replicas)):
+            index = (self._next + offset) % len(self.replicas)
+            if self.replicas[index] in healthy:
+                if advance:
+                    self._next = index + 1
+                return self.replicas[index]
+        return self.primary
+
+    def reader(self) -> AsyncEngine:
+        chosen = self._choose(advance=True)
+        self.count_read(chosen)
+        return chosen
+
+    def count_read(self, engine: AsyncEngine):
+        self.reads["primary" if engine is self.primary else self._name(engine)] += 1
+
+    def peek(self) -> AsyncEngine:
+        """
+        The engine `reader` would return now, without choosing it.
+        """
+        return self._choose(advance=False)
+
+    def is_healthy(self, engine: AsyncEngine) -> bool:
+        return engine is self.primary or self._down_until.get(engine.sync_engine, 0) <= time.monotonic()
+
+    async def check_health(self):
+        """
+        Ping every replica once; failures mark it unhealthy.
+        """
+        for replica in self.replicas:
+            try:
+                async with replica.connect() as conn:
+                    await conn.execute(select(1))
+                self._down_until.pop(replica.sync_engine, None)
+            except Exception:
+                self.mark_unhealthy(replica.sync_engine)
+
+    async def dispose(self):
+        for replica in self.replicas:
+            await replica.dispose()
+
+
+class RoutingSession(Session):
+    """
+    Sync session behind AsyncSession that sends plain SELECTs to a replica
+    chosen by the ReplicaRouter in `info["router"]` and everything else to
+    the primary. The replica is chosen once and kept for the session, so
+    reads in one request never move between replicas with different lag
+    (unless it fails). The first write (or flush) pins the session to the
+    primary, so reads later in the same request see its own writes.
+    """
+
+    def _uses_primary(self, clause) -> bool:
+        return (
+            bool(self.info.get(USE_PRIMARY_KEY))
+            or not isinstance(clause, Select)
+            or clause._for_update_arg is not None
+        )
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        router: ReplicaRouter = self.info["router"]
+        if self._flushing or (clause is not None and not isinstance(clause, Select)):
+            self.info[USE_PRIMARY_KEY] = True
+        if self._uses_primary(clause):
+            return router.primary.sync_engine
+        engine = self.info.get(READ_ENGINE_KEY)
+        if engine is None or not router.is_healthy(engine):
+            engine = self.info[READ_ENGINE_KEY] = router.reader()
+        else:
+            router.count_read(engine)
+        return engine.sync_engine
+
+
+def read_bind(session: AsyncSession) -> Engine:
+    """
+    Engine (sync) a read-only query issued now by `session` would use,
+    without choosing a replica or counting a read.
+    """
+    sync_session = getattr(session, "sync_session", session)
+    if not isinstance(sync_session, RoutingSession):
+        return sync_session.get_bind(clause=select(1))
+    router: ReplicaRouter = sync_session.info["router"]
+    if sync_session._uses_primary(select(1)):
+        return router.primary.sync_engine
+    engine = sync_session.info.get(READ_ENGINE_KEY)
+    if engine is None or not router.is_healthy(engine):
+        engine = router.peek()
+    return engine.sync_engine
@@ -1,7 +1,11 @@
+from sqlalchemy.exc import PendingRollbackError
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
 from app.core.sql_logging import setup_sql_logging, set_request_id
+from app.db.pool import InstrumentedQueuePool, register_pool_metrics
+from app.db.routing import ReplicaRouter, RoutingSession
+from app.db.statement_timeout import setup_statement_timeouts
 from fastapi import Request
 from loguru import logger
 
@@ -16,18 +20,56 @@ engine = create_async_engine(
     max_overflow=settings.DB_MAX_OVERFLOW,
     pool_recycle=settings.DB_POOL_RECYCLE,
     pool_timeout=settings.DB_POOL_TIMEOUT,
+    poolclass=InstrumentedQueuePool,
     echo=False,  # Disable SQLAlchemy's built-in logging
 )
 
 logger.info("Database engine initialized with pool_size={}, max_overflow={}", 
            settings.DB_POOL_SIZE, settings.DB_MAX_OVERFLOW)
 
+# Read replicas share the primary's pool settings
+replica_engines = [
+    create_async_engine(
+        url.strip(),
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        poolclass=InstrumentedQueuePool,
+        echo=False,
+    )
+    for url in settings.DB_REPLICA_URLS.split(",") if url.strip()
+]
+if replica_engines:
+    logger.info("Read replicas configured: {} ({})", len(replica_engines), settings.DB_REPLICA_STRATEGY)
+
 # Setup SQL logging with request_id context
 setup_sql_logging(engine)
+for replica_engine in replica_engines:
+    setup_sql_logging(replica_engine)
 
-AsyncSessionLocal = sessionmaker(
+# SELECTs are aborted server side when the request deadline runs out
+setup_statement_timeouts()
+
+# Pool gauges and checkout wait times for the metrics endpoint
+pool_engines = {"primary": engine}
+for index, replica_engine in enumerate(replica_engines):
+    replica_engine.pool.metrics_name = f"replica-{index}"
+    pool_engines[f"replica-{index}"] = replica_engine
+register_pool_metrics(pool_engines)
+
+replica_router = ReplicaRouter(
     engine,
+    replica_engines,
+    strategy=settings.DB_REPLICA_STRATEGY,
+    retry_after=settings.DB_REPLICA_RETRY_AFTER,
+)
+
+# Plain SELECTs go to a replica until the session writes, then to the primary
+AsyncSessionLocal = sessionmaker(
     class_=AsyncSession,
+    sync_session_class=RoutingSession,
+    info={"router": replica_router},
     expire_on_commit=False,
     autocommit=False,
     autoflush=False,
@@ -35,12 +77,21 @@ AsyncSessionLocal = sessionmaker(
 
 
 async def get_db(request: Request = None):
+    """
+    Request-scoped unit of work. Repositories only flush; the single commit
+    happens here once the handler has finished, or everything is rolled back.
+    """
     async with AsyncSessionLocal() as session:
         try:
             if request and hasattr(request.state, 'request_id'):
                 set_request_id(request.state.request_id)
             yield session
-            await session.commit()
+            try:
+                await session.commit()
+            except PendingRollbackError:
+                # An earlier call failed or was cancelled (e.g. at the request
+                # deadline) and the handler has answered; nothing to commit
+                await session.rollback()
         except Exception:
             await session.rollback()
             raise
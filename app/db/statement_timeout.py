@@ -0,0 +1,34 @@
+from sqlalchemy import event
+from sqlalchemy.orm import ORMExecuteState, Session
+from sqlalchemy.sql import Select
+from app.core.deadline import remaining
+
+# Timeouts are rounded down to this step, so statements compiled with a
+# hint only come in a few variants in the compiled cache
+TIMEOUT_STEP_MS = 100
+
+
+def limit_execution_time(statement: Select, seconds: float) -> Select:
+    """
+    Have MySQL abort the SELECT itself after `seconds`, so a cancelled
+    request does not leave it running on the server. Other dialects do not
+    render the hint.
+    """
+    milliseconds = max(TIMEOUT_STEP_MS, int(seconds * 1000) // TIMEOUT_STEP_MS * TIMEOUT_STEP_MS)
+    return statement.prefix_with(f"/*+ MAX_EXECUTION_TIME({milliseconds}) */", dialect="mysql")
+
+
+def _apply_deadline(orm_execute_state: ORMExecuteState):
+    if not orm_execute_state.is_select:
+        return
+    seconds = remaining()
+    if seconds is not None:
+        orm_execute_state.statement = limit_execution_time(orm_execute_state.statement, seconds)
+
+
+def setup_statement_timeouts():
+    """
+    Bound the SELECTs of every session by the remaining request deadline.
+    """
+    if not event.contains(Session, "do_orm_execute", _apply_deadline):
+        event.listen(Session, "do_orm_execute", _apply_deadline)
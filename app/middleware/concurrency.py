@@ -0,0 +1,52 @@
+import time
+from typing import Optional, Sequence
+from starlette.types import ASGIApp, Receive, Scope, Send
+from app.core.concurrency import AdaptiveLimiter, request_limiter
+from app.core.global_define import SystemMessages
+from app.core.responses import FastJSONResponse
+
+
+class ConcurrencyLimitMiddleware:
+    """
+    Pure ASGI load shedding middleware. Requests run under an
+    AdaptiveLimiter; those it turns away get the pre-encoded SYSTEM_BUSY
+    body with a 503 and Retry-After, instead of piling up on the database
+    pool timeout. Paths starting with an `exempt_paths` prefix bypass it,
+    such as the streaming export, which can run for minutes. Requests on
+    `unsampled_paths` take a slot but, being slow by design (bulk writes),
+    do not feed their latency to the limiter.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        limiter: Optional[AdaptiveLimiter] = None,
+        exempt_paths: Sequence[str] = (
+            "/docs", "/redoc", "/openapi.json", "/api/v1/diagnostics", "/api/v1/employees/export"
+        ),
+        unsampled_paths: Sequence[str] = ("/api/v1/employees/bulk-",),
+        retry_after: int = 1,
+    ):
+        self.app = app
+        self.limiter = limiter or request_limiter
+        self.exempt_paths = tuple(exempt_paths)
+        self.unsampled_paths = tuple(unsampled_paths)
+        self.retry_after = str(retry_after)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["path"].startswith(self.exempt_paths):
+            await self.app(scope, receive, send)
+            return
+
+        if not await self.limiter.acquire():
+            response = FastJSONResponse(
+                SystemMessages.SYSTEM_BUSY, status_code=503, headers={"Retry-After": self.retry_after}
+            )
+            await response(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.limiter.release(started, sample=not scope["path"].startswith(self.unsampled_paths))
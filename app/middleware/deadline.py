@@ -0,0 +1,52 @@
+from typing import Dict, Optional, Tuple
+from starlette.types import ASGIApp, Receive, Scope, Send
+from app.core.config import settings
+from app.core.deadline import end_deadline, start_deadline
+
+
+class DeadlineMiddleware:
+    """
+    Pure ASGI middleware giving every request a time budget, carried in a
+    contextvar down to the repositories and the Redis client, which cancel
+    their calls once it runs out.
+
+    `budgets` maps path prefixes to a budget in seconds (or None for no
+    deadline, e.g. streaming exports); the longest matching prefix wins and
+    other paths get `default`.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        default: Optional[float] = None,
+        budgets: Optional[Dict[str, Optional[float]]] = None,
+    ):
+        self.app = app
+        self.default = settings.REQUEST_DEADLINE_MS / 1000 if default is None else default
+        self.budgets = dict(budgets or {})
+        self._prefixes = sorted(self.budgets, key=len, reverse=True)
+        self._resolved: Dict[str, Tuple[Optional[float]]] = {}
+
+    def resolve(self, path: str) -> Optional[float]:
+        resolved = self._resolved.get(path)
+        if resolved is None:
+            resolved = (next(
+                (self.budgets[prefix] for prefix in self._prefixes if path.startswith(prefix)),
+                self.default
+            ),)
+            # Paths with ids are unbounded, keep the cache small
+            if len(self._resolved) < 1024:
+                self._resolved[path] = resolved
+        return resolved[0]
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        budget = self.resolve(scope["path"]) if scope["type"] == "http" else None
+        if not budget:
+            await self.app(scope, receive, send)
+            return
+
+        token = start_deadline(budget)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            end_deadline(token)
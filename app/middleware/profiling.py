@@ -0,0 +1,84 @@
+import asyncio
+import hmac
+import random
+import re
+from typing import Optional
+from loguru import logger
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.config import settings
+from app.core.profiling import ProfileRing, StackSampler
+
+_UNSAFE = re.compile(r"[^A-Za-z0-9_.-]")
+
+
+class ProfilingMiddleware:
+    """
+    Pure ASGI middleware profiling single requests: those carrying
+    `header` with the configured token, and a `sample_rate` share of the
+    rest. A profiled request's stacks are sampled by StackSampler and
+    written with its request_id to a ProfileRing, as speedscope JSON or
+    collapsed stacks; the file name is returned in X-Profile-Id.
+
+    With no token and a zero rate the middleware is a pass-through; other
+    requests cost a header lookup and a random draw.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        token: Optional[str] = None,
+        sample_rate: Optional[float] = None,
+        directory: Optional[str] = None,
+        max_files: Optional[int] = None,
+        output_format: Optional[str] = None,
+        interval_ms: Optional[float] = None,
+        header: str = "X-Profile",
+    ):
+        self.app = app
+        self.token = (settings.PROFILE_TOKEN if token is None else token).encode()
+        self.sample_rate = settings.PROFILE_SAMPLE_RATE if sample_rate is None else sample_rate
+        self.format = output_format or settings.PROFILE_FORMAT
+        if self.format not in ("speedscope", "collapsed"):
+            raise ValueError(f"Unknown profile format: {self.format}")
+        self.ring = ProfileRing(directory or settings.PROFILE_DIR, max_files or settings.PROFILE_RING_SIZE)
+        self.sampler = StackSampler((interval_ms or settings.PROFILE_INTERVAL_MS) / 1000)
+        self.header = header.lower().encode()
+        self.enabled = bool(self.token) or self.sample_rate > 0
+
+    def _should_profile(self, scope: Scope) -> bool:
+        if self.token:
+            for name, value in scope["headers"]:
+                if name == self.header:
+                    return hmac.compare_digest(value, self.token)
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if not self.enabled or scope["type"] != "http" or not self._should_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        request_id = scope.get("state", {}).get("request_id", "")
+        label = f"{scope['method']} {scope['path']}"
+        extension = "speedscope.json" if self.format == "speedscope" else "collapsed.txt"
+        name = self.ring.file_name(f"{_UNSAFE.sub('_', request_id or 'request')}.{extension}")
+
+        async def send_wrapper(message: Message):
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append("X-Profile-Id", name)
+            await send(message)
+
+        profile = self.sampler.start(request_id, label)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            self.sampler.finish(profile)
+            content = profile.speedscope(self.sampler.interval) if self.format == "speedscope" else profile.collapsed()
+            try:
+                # The response has been sent; keep the file write off the loop
+                path = await asyncio.to_thread(self.ring.write, name, content)
+                logger.bind(request_id=request_id).info(
+                    "Profile written: {path} ({samples} samples)", path=path, samples=sum(profile.samples.values())
+                )
+            except OSError as e:
+                logger.bind(request_id=request_id).warning("Could not write profile: {error}", error=str(e))
@@ -1,59 +1,194 @@
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
+import time
+from collections import OrderedDict
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Dict, Optional, Sequence, Tuple
+from fastapi import Request, Response, status
 from starlette.types import ASGIApp, Receive, Scope, Send
+from app.schemas.base import BaseResponse
 from app.services.rate_limit import RateLimitService
+from app.services.redis_rate_limit import RedisRateLimitService
 from app.repositories.rate_limit import RateLimitRepository
-from app.db.session import get_db
-from sqlalchemy.ext.asyncio import AsyncSession
-from app.core.rate_limit import rate_limit
+from app.db.session import AsyncSessionLocal
+from app.db.redis import redis_client
 
 
-class RateLimitMiddleware(BaseHTTPMiddleware):
+@dataclass(frozen=True)
+class RateLimitPolicy:
+    max_requests: int = 100
+    time_window_seconds: int = 60
+
+
+class RateLimitBackend(ABC):
+    """
+    Storage used by RateLimitMiddleware. Returns the same BaseResponse[bool]
+    as the rate limit services: detail is False when the request is rejected.
+    """
+
+    @abstractmethod
+    async def check_rate_limit(
+        self,
+        customer_id: str,
+        endpoint: str,
+        policy: RateLimitPolicy,
+        request: Request
+    ) -> BaseResponse[bool]:
+        ...
+
+
+class InMemoryRateLimitBackend(RateLimitBackend):
+    """
+    Fixed window counters kept in this worker only. Past `max_keys` counters,
+    expired windows are dropped first, then the least recently used, so a
+    client sending many distinct keys cannot reset the others' counts.
+    """
+
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        # (customer, endpoint) -> (window end, count), least recently used first
+        self._counters: "OrderedDict[Tuple[str, str], Tuple[float, int]]" = OrderedDict()
+
+    async def check_rate_limit(self, customer_id, endpoint, policy, request) -> BaseResponse[bool]:
+        now = time.time()
+        window_end = (now // policy.time_window_seconds + 1) * policy.time_window_seconds
+        key = (customer_id, endpoint)
+        counter_window, count = self._counters.get(key, (window_end, 0))
+        if counter_window != window_end:
+            count = 0
+        if count >= policy.max_requests:
+            self._counters.move_to_end(key)
+            return BaseResponse.error(
+                status=status.HTTP_429_TOO_MANY_REQUESTS,
+                msg=f"Rate limit exceeded. Maximum {policy.max_requests} requests per {policy.time_window_seconds} seconds",
+                detail=False
+            )
+        if key not in self._counters:
+            self._evict(now)
+        self._counters[key] = (window_end, count + 1)
+        self._counters.move_to_end(key)
+        return BaseResponse.success(detail=True, msg="Rate limit check passed")
+
+    def _evict(self, now: float):
+        # Expired windows gather at the least recently used end
+        while self._counters:
+            window_end, _ = next(iter(self._counters.values()))
+            if window_end > now:
+                break
+            self._counters.popitem(last=False)
+        while len(self._counters) >= self.max_keys:
+            self._counters.popitem(last=False)
+
+
+class RedisRateLimitBackend(RateLimitBackend):
+    def __init__(self, algorithm: str = "fixed_window"):
+        self.algorithm = algorithm
+
+    async def check_rate_limit(self, customer_id, endpoint, policy, request) -> BaseResponse[bool]:
+        service = RedisRateLimitService(redis_client.redis, self.algorithm)
+        return await service.check_rate_limit(
+            customer_id=customer_id,
+            endpoint=endpoint,
+            max_requests=policy.max_requests,
+            time_window_seconds=policy.time_window_seconds,
+            request=request
+        )
+
+
+class DatabaseRateLimitBackend(RateLimitBackend):
+    async def check_rate_limit(self, customer_id, endpoint, policy, request) -> BaseResponse[bool]:
+        # The backend owns this unit of work: one commit per check
+        async with AsyncSessionLocal() as db, db.begin():
+            service = RateLimitService(RateLimitRepository(db))
+            return await service.check_rate_limit(
+                customer_id=customer_id,
+                endpoint=endpoint,
+                max_requests=policy.max_requests,
+                time_window_seconds=policy.time_window_seconds,
+                request=request
+            )
+
+
+class RateLimitMiddleware:
+    """
+    Pure ASGI rate limiting middleware.
+
+    `policies` maps path prefixes to a RateLimitPolicy (or None to exempt
+    the prefix); the longest matching prefix wins and requests matching no
+    prefix use the default policy. Prefixes match whole path segments, so
+    "/docs" covers "/docs/oauth2-redirect" but not "/docsx". Requests sharing
+    a prefix share a counter.
+    """
+
     def __init__(
         self,
         app: ASGIApp,
+        backend: Optional[RateLimitBackend] = None,
+        policies: Optional[Dict[str, Optional[RateLimitPolicy]]] = None,
         max_requests: int = 100,
-        time_window_seconds: int = 60
+        time_window_seconds: int = 60,
+        exempt_paths: Sequence[str] = ("/docs", "/redoc", "/openapi.json"),
+        customer_id_header: str = "X-Customer-ID"
     ):
-        super().__init__(app)
-        self.max_requests = max_requests
-        self.time_window_seconds = time_window_seconds
-
-    async def dispatch(self, request: Request, call_next) -> Response:
-        # Skip rate limiting for certain paths
-        if request.url.path in ["/docs", "/redoc", "/openapi.json"]:
-            return await call_next(request)
+        self.app = app
+        self.backend = backend or RedisRateLimitBackend()
+        self.default_policy = RateLimitPolicy(max_requests, time_window_seconds)
+        self.policies: Dict[str, Optional[RateLimitPolicy]] = {path: None for path in exempt_paths}
+        self.policies.update(policies or {})
+        self._prefixes = sorted(self.policies, key=len, reverse=True)
+        self._resolved: Dict[str, Tuple[str, Optional[RateLimitPolicy]]] = {}
+        self.customer_id_header = customer_id_header.lower().encode()
 
-        # Get customer_id from request (you might need to adjust this based on your auth system)
-        customer_id = request.headers.get("X-Customer-ID")
-        if not customer_id:
-            return Response(
-                content="Customer ID is required",
-                status_code=400
+    def resolve(self, path: str) -> Tuple[str, Optional[RateLimitPolicy]]:
+        resolved = self._resolved.get(path)
+        if resolved is None:
+            resolved = next(
+                ((prefix, self.policies[prefix]) for prefix in self._prefixes if self._matches(path, prefix)),
+                (path, self.default_policy)
             )
+            # Paths with ids are unbounded, keep the cache small
+            if len(self._resolved) < 1024:
+                self._resolved[path] = resolved
+        return resolved
+
+    @staticmethod
+    def _matches(path: str, prefix: str) -> bool:
+        if not path.startswith(prefix):
+            return False
+        return len(path) == len(prefix) or prefix.endswith("/") or path[len(prefix)] == "/"
 
-        # Get database session
-        db: AsyncSession = next(get_db())
-        
-        # Initialize services
-        rate_limit_repo = RateLimitRepository(db)
-        rate_limit_service = RateLimitService(rate_limit_repo)
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
 
-        # Check rate limit
-        rate_limit_response = await rate_limit_service.check_rate_limit(
+        endpoint, policy = self.resolve(scope["path"])
+        if policy is None:
+            await self.app(scope, receive, send)
+            return
+
+        customer_id = next(
+            (value.decode() for name, value in scope["headers"] if name == self.customer_id_header),
+            None
+        )
+        if not customer_id:
+            response = Response(content="Customer ID is required", status_code=400)
+            await response(scope, receive, send)
+            return
+
+        rate_limit_response = await self.backend.check_rate_limit(
             customer_id=customer_id,
-            endpoint=request.url.path,
-            max_requests=self.max_requests,
-            time_window_seconds=self.time_window_seconds,
-            request=request
+            endpoint=endpoint,
+            policy=policy,
+            request=Request(scope)
         )
 
         if not rate_limit_response.detail:
-            return Response(
+            response = Response(
                 content=rate_limit_response.msg,
                 status_code=rate_limit_response.status
             )
+            await response(scope, receive, send)
+            return
 
         # If rate limit check passes, proceed with the request
-        response = await call_next(request)
-        return response 
\ No newline at end of file
+        await self.app(scope, receive, send)
@@ -14,4 +14,4 @@ class Employee(Base):
     hometown = Column(String(500), nullable=False)
     age = Column(Integer, nullable=False)
     active = Column(Integer, nullable=False, default=1)
-    t_create = Column(DateTime(timezone=True), server_default=func.now())
+    t_create = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
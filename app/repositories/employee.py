@@ -1,29 +1,160 @@
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from typing import AsyncIterator, Optional, Sequence
+from sqlalchemy.engine import Row
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy import and_, insert, or_, select, update
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from app.models.employee import Employee
-from app.schemas.employee import EmployeeCreate, EmployeeUpdate
-from app.core.logging import log_service_call
+from app.schemas.employee import EmployeeCreate, EmployeeUpdate, EmployeeUpsert
+from app.core.config import settings
+from app.core.dataloader import DataLoader
+from app.core.deadline import within_deadline
+from app.core.tracing import traced
+from app.core.versioning import table_versions
+from app.db.routing import is_pinned_to_primary, pin_to_primary, read_bind
+
+
+_loaders: dict = {}
+
+# Sort columns that may hold NULLs: t_create is NOT NULL only in tables
+# created since it was declared so
+NULLABLE_SORT_COLUMNS = {"t_create"}
+
+
+def employee_loader(bind) -> DataLoader:
+    """
+    Process-wide loader for the engine `bind` (sync or async), so lookups
+    from every request reading from that engine are coalesced together.
+    """
+    if isinstance(bind, AsyncEngine):
+        bind = bind.sync_engine
+    loader = _loaders.get(bind)
+    if loader is None:
+        engine = AsyncEngine(bind)
+
+        async def load_employees(ids: list[int]) -> dict[int, Employee]:
+            # Own short-lived session: the batch serves callers from many requests
+            async with AsyncSession(engine, expire_on_commit=False) as db:
+                result = await db.execute(select(Employee).where(Employee.id.in_(ids)))
+                return {employee.id: employee for employee in result.scalars()}
+
+        loader = _loaders[bind] = DataLoader(
+            load_employees,
+            window=settings.EMPLOYEE_LOADER_WINDOW_MS / 1000,
+            max_batch_size=settings.EMPLOYEE_LOADER_MAX_BATCH,
+            timeout=settings.EMPLOYEE_LOADER_TIMEOUT_MS / 1000,
+        )
+    return loader
 
 
 class EmployeeRepository:
     def __init__(self, db: AsyncSession):
         self.db = db
 
-    @log_service_call("EmployeeRepository")
-    async def get_by_id(self, request_id: str, employee_id: int)  -> Employee | None:
+    @traced("EmployeeRepository")
+    @within_deadline
+    async def get_by_id(
+        self,
+        request_id: str,
+        employee_id: int,
+        columns: Optional[Sequence] = None
+    )  -> Employee | Row | None:
+        # Projections are a plain row of `columns`, read directly
+        if columns:
+            result = await self.db.execute(select(*columns).where(Employee.id == employee_id))
+            return result.first()
+        # Concurrent lookups share one batched query; a session that has
+        # written must read its own uncommitted rows instead
+        if settings.EMPLOYEE_LOADER_ENABLED and not is_pinned_to_primary(self.db):
+            employee = await employee_loader(read_bind(self.db)).load(employee_id)
+            if employee is None:
+                return None
+            # Attach a per-session copy of the shared detached instance
+            return await self.db.merge(employee, load=False)
         result = await self.db.execute(select(Employee).where(Employee.id == employee_id))
         return result.scalar_one_or_none()
 
-    @log_service_call("EmployeeRepository")
-    async def get_all(self, request_id: str, skip: int = 0, limit: int = 100) -> list[Employee]:
+    @traced("EmployeeRepository")
+    @within_deadline
+    async def get_all(
+        self,
+        request_id: str,
+        skip: int = 0,
+        limit: int = 100,
+        columns: Optional[Sequence] = None
+    ) -> list[Employee] | Sequence[Row]:
+        """
+        Employees as ORM objects, or as plain rows of `columns` when given.
+        """
         result = await self.db.execute(
-            select(Employee)
+            (select(*columns) if columns else select(Employee))
             .offset(skip)
             .limit(limit)
         )
-        return result.scalars().all()
+        return result.all() if columns else result.scalars().all()
+
+    @traced("EmployeeRepository")
+    @within_deadline
+    async def get_page(
+        self,
+        request_id: str,
+        limit: int = 100,
+        after: Optional[dict] = None,
+        sort_by: Optional[str] = None,
+        columns: Optional[Sequence] = None
+    ) -> list[Employee] | Sequence[Row]:
+        """
+        Keyset pagination ordered by (sort_by, id), or by id alone.
+        `after` holds the id and sort value of the last row already returned,
+        so every page is an index range scan instead of an OFFSET skip.
+        NULLs of a nullable sort column come last, ordered by id.
+        Returns plain rows of `columns` when given, ORM objects otherwise.
+        """
+        query = select(*columns) if columns else select(Employee)
+        if sort_by in NULLABLE_SORT_COLUMNS:
+            sort_column = getattr(Employee, sort_by)
+            # IS NULL first in the key instead of NULLS LAST, which MySQL lacks
+            query = query.order_by(sort_column.is_(None), sort_column, Employee.id)
+            if after and after["value"] is None:
+                query = query.where(sort_column.is_(None), Employee.id > after["id"])
+            elif after:
+                query = query.where(or_(
+                    sort_column > after["value"],
+                    and_(sort_column == after["value"], Employee.id > after["id"]),
+                    sort_column.is_(None)
+                ))
+        elif sort_by:
+            sort_column = getattr(Employee, sort_by)
+            query = query.order_by(sort_column, Employee.id)
+            if after:
+                query = query.where(or_(
+                    sort_column > after["value"],
+                    and_(sort_column == after["value"], Employee.id > after["id"])
+                ))
+        else:
+            query = query.order_by(Employee.id)
+            if after:
+                query = query.where(Employee.id > after["id"])
+        result = await self.db.execute(query.limit(limit))
+        return result.all() if columns else result.scalars().all()
+
+    async def stream_rows(self, request_id: str, batch_size: int = 1000) -> AsyncIterator[Sequence[Row]]:
+        """
+        Yield all employees as plain rows, `batch_size` at a time, from a
+        server-side cursor so memory stays flat regardless of table size.
+        """
+        result = await self.db.stream(
+            select(*Employee.__table__.columns)
+            .order_by(Employee.id)
+            .execution_options(yield_per=batch_size)
+        )
+        async for partition in result.partitions():
+            yield partition
 
-    @log_service_call("EmployeeRepository")
+    @traced("EmployeeRepository")
+    @within_deadline
     async def create(self, request_id:str, employee: EmployeeCreate) -> Employee:
         db_employee = Employee(
             name=employee.name,
@@ -34,36 +165,158 @@ class EmployeeRepository:
             age=employee.age
         )
         self.db.add(db_employee)
-        await self.db.commit()
-        await self.db.refresh(db_employee)
+        self._written()
+        # Flush only: the request-scoped transaction in get_db commits
+        await self.db.flush()
         return db_employee
 
-    @log_service_call("EmployeeRepository")
-    async def update(self, request_id: str, employee_update: EmployeeUpdate) -> Employee:
-        # First check if employee exists
-        db_employee = await self.get_by_id(request_id, employee_update.id)
-        if not db_employee:
-            raise Exception(f"Không tồn tại employee_id {employee_update.id}")
-
+    @traced("EmployeeRepository")
+    @within_deadline
+    async def update(self, request_id: str, employee_update: EmployeeUpdate) -> Employee | None:
         # Convert Pydantic model to dict, excluding unset values
         update_data = employee_update.model_dump(exclude_unset=True)
-        
+
         # Remove id from update data since it's used in where clause
         employee_id = update_data.pop('id', None)
-        
-        # Create update statement
+        if not update_data:
+            return await self.get_by_id(request_id, employee_id)
+        self._written()
+
         stmt = (
             update(Employee)
             .where(Employee.id == employee_id)
             .values(update_data)
+            .execution_options(synchronize_session=False)
         )
-        
-        # Execute the update
-        await self.db.execute(stmt)
-        await self.db.commit()
-        
-        # Refresh and return the updated employee with all fields
-        await self.db.refresh(db_employee)
-        return db_employee
-        
-        
\ No newline at end of file
+
+        # One round trip where the dialect supports UPDATE ... RETURNING
+        if self.db.get_bind().dialect.update_returning:
+            result = await self.db.execute(
+                stmt.returning(Employee).execution_options(populate_existing=True)
+            )
+            return result.scalar_one_or_none()
+
+        # Otherwise (MySQL) the UPDATE plus a single read
+        result = await self.db.execute(stmt)
+        if result.rowcount == 0:
+            return None
+        result = await self.db.execute(
+            select(Employee)
+            .where(Employee.id == employee_id)
+            .execution_options(populate_existing=True)
+        )
+        return result.scalar_one_or_none()
+
+    @traced("EmployeeRepository")
+    @within_deadline
+    async def bulk_create(
+        self,
+        request_id: str,
+        employees: list[tuple[int, EmployeeCreate]],
+        batch_size: int = 500
+    ) -> tuple[int, list[tuple[int, str]]]:
+        """
+        Insert (index, employee) pairs with one multi-row INSERT per batch.
+        Returns the number created and (index, error) for failed items.
+        """
+        created, errors = 0, []
+        self._written()
+        for start in range(0, len(employees), batch_size):
+            batch = employees[start:start + batch_size]
+            rows = [employee.model_dump() for _, employee in batch]
+            created_in_batch, batch_errors = await self._execute_batch(
+                batch, rows, lambda batch_rows: insert(Employee).values(batch_rows)
+            )
+            created += created_in_batch
+            errors.extend(batch_errors)
+        return created, errors
+
+    @traced("EmployeeRepository")
+    @within_deadline
+    async def bulk_upsert(
+        self,
+        request_id: str,
+        employees: list[tuple[int, EmployeeUpsert]],
+        batch_size: int = 500
+    ) -> tuple[int, int, list[tuple[int, str]]]:
+        """
+        Insert or update (index, employee) pairs by id, using
+        INSERT ... ON DUPLICATE KEY UPDATE on MySQL, ON CONFLICT DO UPDATE on
+        SQLite/PostgreSQL, and UPDATE + INSERT elsewhere.
+        Returns (created, updated, [(index, error)]).
+        """
+        created, updated, errors = 0, 0, []
+        self._written()
+        for start in range(0, len(employees), batch_size):
+            batch = employees[start:start + batch_size]
+            rows = [employee.model_dump() for _, employee in batch]
+            existing = set((await self.db.execute(
+                select(Employee.id).where(Employee.id.in_([row["id"] for row in rows]))
+            )).scalars().all())
+
+            succeeded, batch_errors = await self._execute_batch(batch, rows, self._upsert_statement)
+            failed = {index for index, _ in batch_errors}
+            for (index, _), row in zip(batch, rows):
+                if index in failed:
+                    continue
+                if row["id"] in existing:
+                    updated += 1
+                else:
+                    created += 1
+            errors.extend(batch_errors)
+        return created, updated, errors
+
+    def _written(self):
+        # Reads stay on the primary, and the table version moves on commit
+        pin_to_primary(self.db)
+        table_versions.bump_on_commit(self.db, Employee.__tablename__)
+
+    def _upsert_statement(self, rows: list[dict]):
+        update_columns = [column for column in rows[0] if column != "id"]
+        dialect = self.db.get_bind().dialect.name
+        if dialect == "mysql":
+            stmt = mysql_insert(Employee).values(rows)
+            return stmt.on_duplicate_key_update({column: stmt.inserted[column] for column in update_columns})
+        if dialect in ("sqlite", "postgresql"):
+            stmt = (sqlite_insert if dialect == "sqlite" else postgresql_insert)(Employee).values(rows)
+            return stmt.on_conflict_do_update(
+                index_elements=[Employee.id],
+                set_={column: stmt.excluded[column] for column in update_columns}
+            )
+        return None
+
+    async def _execute_batch(self, batch: list[tuple], rows: list[dict], build_statement) -> tuple[int, list[tuple[int, str]]]:
+        # Whole batch in one statement inside a savepoint; if it fails, retry
+        # row by row so only the offending items are reported
+        try:
+            async with self.db.begin_nested():
+                await self._execute_rows(rows, build_statement)
+            return len(rows), []
+        except SQLAlchemyError:
+            pass
+
+        succeeded, errors = 0, []
+        for (index, _), row in zip(batch, rows):
+            try:
+                async with self.db.begin_nested():
+                    await self._execute_rows([row], build_statement)
+                succeeded += 1
+            except SQLAlchemyError as e:
+                errors.append((index, str(getattr(e, "orig", None) or e)))
+        return succeeded, errors
+
+    async def _execute_rows(self, rows: list[dict], build_statement):
+        stmt = build_statement(rows)
+        if stmt is not None:
+            await self.db.execute(stmt)
+            return
+        # Dialect without a native upsert: update the existing ids, insert the rest
+        existing = set((await self.db.execute(
+            select(Employee.id).where(Employee.id.in_([row["id"] for row in rows]))
+        )).scalars().all())
+        to_update = [row for row in rows if row["id"] in existing]
+        to_insert = [row for row in rows if row["id"] not in existing]
+        if to_update:
+            await self.db.execute(update(Employee), to_update)
+        if to_insert:
+            await self.db.execute(insert(Employee).values(to_insert))
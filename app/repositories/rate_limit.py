@@ -1,14 +1,15 @@
+from datetime import datetime
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from app.models.rate_limit import RateLimit
-from app.core.logging import log_service_call
+from app.core.tracing import traced
 
 
 class RateLimitRepository:
     def __init__(self, db: AsyncSession):
         self.db = db
 
-    @log_service_call("RateLimitRepository")
+    @traced("RateLimitRepository")
     async def get_rate_limit(self, customer_id: str, endpoint: str, request_id: str) -> RateLimit:
         result = await self.db.execute(
             select(RateLimit)
@@ -19,7 +20,7 @@ class RateLimitRepository:
         )
         return result.scalar_one_or_none()
 
-    @log_service_call("RateLimitRepository")
+    @traced("RateLimitRepository")
     async def create_rate_limit(
         self,
         customer_id: str,
@@ -35,11 +36,10 @@ class RateLimitRepository:
             window_start=window_start
         )
         self.db.add(rate_limit)
-        await self.db.commit()
-        await self.db.refresh(rate_limit)
+        await self.db.flush()
         return rate_limit
 
-    @log_service_call("RateLimitRepository")
+    @traced("RateLimitRepository")
     async def update_rate_limit(
         self,
         customer_id: str,
@@ -55,6 +55,5 @@ class RateLimitRepository:
         rate_limit.request_count = request_count
         rate_limit.window_start = window_start
 
-        await self.db.commit()
-        await self.db.refresh(rate_limit)
+        await self.db.flush()
         return rate_limit 
\ No newline at end of file
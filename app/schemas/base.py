@@ -11,3 +11,15 @@ class BaseResponse(BaseModel, Generic[T]):
     @classmethod
     def response(cls, status: int, msg: str, detail: Optional[T] = None) -> 'BaseResponse[T]':
         return cls(status=status, msg=msg, detail=detail)
+
+    @classmethod
+    def success(cls, msg: str, detail: Optional[T] = None, status: int = 200) -> 'BaseResponse[T]':
+        return cls(status=status, msg=msg, detail=detail)
+
+    @classmethod
+    def error(cls, status: int, msg: str, detail: Optional[T] = None) -> 'BaseResponse[T]':
+        return cls(status=status, msg=msg, detail=detail)
+
+
+class CursorPageResponse(BaseResponse[T], Generic[T]):
+    next_cursor: Optional[str] = None
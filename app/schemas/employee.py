@@ -1,6 +1,7 @@
-from pydantic import BaseModel, Field
-from typing import Optional
+from pydantic import BaseModel, Field, create_model
+from typing import List, Optional, Tuple, Type
 from datetime import datetime
+from functools import lru_cache
 
 
 class EmployeeBase(BaseModel):
@@ -24,6 +25,11 @@ class EmployeeCreate(BaseModel):
         
 
 
+class EmployeeUpsert(EmployeeCreate):
+    id: int = Field(..., gt=0)
+    active: int = Field(1, ge=0, le=1)
+
+
 class EmployeeUpdate(BaseModel):
     id: int = Field(..., gt=0)
     name: Optional[str] = Field(None, min_length=2, max_length=500)
@@ -38,4 +44,29 @@ class EmployeeUpdate(BaseModel):
 class EmployeeResponse(EmployeeBase):
 
     class Config:
-        from_attributes = True 
\ No newline at end of file
+        from_attributes = True
+
+
+@lru_cache(maxsize=None)
+def employee_projection(fields: Tuple[str, ...]) -> Type[BaseModel]:
+    """
+    EmployeeResponse restricted to `fields`, for sparse fieldset responses.
+    """
+    return create_model(
+        "EmployeeProjection",
+        __config__={"from_attributes": True},
+        **{name: (EmployeeResponse.model_fields[name].annotation, EmployeeResponse.model_fields[name]) for name in fields}
+    )
+
+
+class EmployeeBulkError(BaseModel):
+    index: int
+    error: str
+
+
+class EmployeeBulkResult(BaseModel):
+    total: int
+    created: int = 0
+    updated: int = 0
+    failed: int = 0
+    errors: List[EmployeeBulkError] = []
@@ -1,11 +1,87 @@
 from fastapi import Request, status
 from app.repositories.employee import EmployeeRepository
-from app.schemas.employee import EmployeeCreate, EmployeeUpdate, EmployeeResponse
+from app.schemas.employee import (
+    EmployeeCreate, EmployeeUpdate, EmployeeResponse, EmployeeUpsert, EmployeeBulkError, EmployeeBulkResult,
+    employee_projection
+)
 from app.models.employee import Employee
-from app.schemas.base import BaseResponse
-from app.core.logging import log_service_call, get_request_id
+from app.schemas.base import BaseResponse, CursorPageResponse
+from app.core.pagination import encode_cursor, decode_cursor
+from app.core.cache import TwoTierCache
+from app.core.config import settings
+from app.core.metrics import register_cache
+from app.core.logging import get_request_id
+from app.core.tracing import traced
 from app.core.global_define import *
 from loguru import logger
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple, Type
+from functools import lru_cache
+from pydantic import BaseModel, TypeAdapter, ValidationError
+from datetime import datetime
+import csv
+import io
+import json
+
+# Columns allowed as the secondary keyset sort, after which ties break on id
+EMPLOYEE_SORT_COLUMNS = {"name", "department", "role", "type_of_working", "hometown", "age", "t_create"}
+
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+# List endpoints select these columns as plain rows and validate the whole
+# page in one call instead of hydrating and validating ORM objects per row
+EMPLOYEE_RESPONSE_FIELDS = tuple(EmployeeResponse.model_fields)
+EMPLOYEE_RESPONSE_COLUMNS = [Employee.__table__.c[name] for name in EMPLOYEE_RESPONSE_FIELDS]
+EMPLOYEE_LIST_ADAPTER = TypeAdapter(list[EmployeeResponse])
+
+
+def parse_fields(fields: Optional[str]) -> Tuple[str, ...]:
+    """
+    Comma separated `fields=` value as response fields in column order.
+    Raises ValueError for unknown fields.
+    """
+    if not fields:
+        return EMPLOYEE_RESPONSE_FIELDS
+    requested = {field.strip() for field in fields.split(",") if field.strip()}
+    unknown = requested - set(EMPLOYEE_RESPONSE_FIELDS)
+    if not requested or unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    return tuple(field for field in EMPLOYEE_RESPONSE_FIELDS if field in requested)
+
+
+def employee_columns(fields: Tuple[str, ...], *extra: Optional[str]) -> list:
+    # Extra columns needed by the query itself go last, after the fields
+    names = list(fields) + [name for name in dict.fromkeys(extra) if name and name not in fields]
+    return [Employee.__table__.c[name] for name in names]
+
+
+@lru_cache(maxsize=None)
+def _list_adapter(fields: Tuple[str, ...]) -> TypeAdapter:
+    if fields == EMPLOYEE_RESPONSE_FIELDS:
+        return EMPLOYEE_LIST_ADAPTER
+    return TypeAdapter(list[employee_projection(fields)])
+
+
+def rows_to_employees(rows, fields: Tuple[str, ...] = EMPLOYEE_RESPONSE_FIELDS) -> list:
+    # Extra trailing columns (e.g. a keyset sort column) are dropped by zip
+    return _list_adapter(fields).validate_python([dict(zip(fields, row)) for row in rows])
+
+
+# Read-through cache for get_employee, keyed by employee id
+employee_cache = TwoTierCache(
+    "employee",
+    l1_size=settings.EMPLOYEE_CACHE_L1_SIZE,
+    l1_ttl=settings.EMPLOYEE_CACHE_L1_TTL,
+    l2_ttl=settings.EMPLOYEE_CACHE_L2_TTL,
+)
+register_cache("employee", lambda: {
+    "l1": employee_cache.l1_hits, "l2": employee_cache.l2_hits, "miss": employee_cache.misses
+})
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
 
 class EmployeeService:
     def __init__(self, repository: EmployeeRepository, request_id: str):
@@ -13,31 +89,144 @@ class EmployeeService:
         self.request_id = request_id
         self.logger = logger.bind(request_id=request_id)
 
-    @log_service_call("EmployeeService")
-    async def get_employee(self, employee_id: int, request_id: str) -> BaseResponse[EmployeeResponse]:
+    @traced("EmployeeService")
+    async def get_employee(self, employee_id: int, request_id: str, fields: Optional[str] = None) -> BaseResponse[EmployeeResponse]:
+        try:
+            selected = parse_fields(fields)
+        except ValueError:
+            return SystemMessages.WRONG_PARAMS
+        model = EmployeeResponse if selected == EMPLOYEE_RESPONSE_FIELDS else employee_projection(selected)
+
+        generation = employee_cache.generation(employee_id)
+        cached = await employee_cache.get(employee_id) if settings.EMPLOYEE_CACHE_ENABLED else None
+        if cached is not None:
+            return BaseResponse.response(
+                status=1,
+                detail=model.model_validate({field: cached[field] for field in selected}),
+                msg="Employee retrieved successfully"
+            )
+
+        if model is not EmployeeResponse:
+            # Partial rows are not cached, only full ones
+            row = await self.repository.get_by_id(
+                request_id=request_id, employee_id=employee_id, columns=employee_columns(selected)
+            )
+            if row is ErrorResponse.DEFAULT:
+                return SystemMessages.DB_FAILED
+            if not row:
+                return SystemMessages.WRONG_PARAMS
+            return BaseResponse.response(
+                status=1,
+                detail=model.model_validate(dict(zip(selected, row))),
+                msg="Employee retrieved successfully"
+            )
+
         employee_db = await self.repository.get_by_id(request_id=request_id, employee_id=employee_id)
+        if employee_db is ErrorResponse.DEFAULT:
+            return SystemMessages.DB_FAILED
         if not employee_db:
             return SystemMessages.WRONG_PARAMS
+        employee = EmployeeResponse.model_validate(employee_db)
+        if settings.EMPLOYEE_CACHE_ENABLED:
+            await employee_cache.set(employee_id, employee.model_dump(mode="json"), generation=generation)
         return BaseResponse.response(
             status=1,
-            detail=EmployeeResponse.model_validate(employee_db),
+            detail=employee,
             msg="Employee retrieved successfully"
         )
 
-    @log_service_call("EmployeeService")
-    async def get_employees(self, request_id: str, skip: int = 0, limit: int = 100) -> BaseResponse[list[EmployeeResponse]]:
-        employees = await self.repository.get_all(request_id=self.request_id, skip=skip, limit=limit)
+    @traced("EmployeeService")
+    async def get_employees(
+        self,
+        request_id: str,
+        skip: int = 0,
+        limit: int = 100,
+        fields: Optional[str] = None
+    ) -> BaseResponse[list[EmployeeResponse]]:
+        try:
+            selected = parse_fields(fields)
+        except ValueError:
+            return SystemMessages.WRONG_PARAMS
+        rows = await self.repository.get_all(
+            request_id=self.request_id, skip=skip, limit=limit, columns=employee_columns(selected)
+        )
+        if not isinstance(rows, list):
+            return SystemMessages.DB_FAILED
         return BaseResponse.response(
             status=1,
-            detail=[EmployeeResponse.model_validate(emp) for emp in employees],
+            detail=rows_to_employees(rows, selected),
             msg="Employees retrieved successfully"
         )
 
-    @log_service_call("EmployeeService")
+    @traced("EmployeeService")
+    async def get_employees_page(
+        self,
+        request_id: str,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        sort_by: Optional[str] = None,
+        fields: Optional[str] = None
+    ) -> CursorPageResponse[list[EmployeeResponse]]:
+        if limit < 1 or sort_by and sort_by not in EMPLOYEE_SORT_COLUMNS:
+            return SystemMessages.WRONG_PARAMS
+        try:
+            after = decode_cursor(cursor, sort_by) if cursor else None
+            selected = parse_fields(fields)
+        except ValueError:
+            return SystemMessages.WRONG_PARAMS
+
+        # The cursor needs id and the sort value even when not requested
+        columns = employee_columns(selected, "id", sort_by)
+
+        # Fetch one extra row to know whether another page exists
+        rows = await self.repository.get_page(
+            request_id=self.request_id, limit=limit + 1, after=after, sort_by=sort_by, columns=columns
+        )
+        if not isinstance(rows, list):
+            return SystemMessages.DB_FAILED
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1]
+            next_cursor = encode_cursor(last.id, sort_by, getattr(last, sort_by) if sort_by else None)
+        return CursorPageResponse(
+            status=1,
+            detail=rows_to_employees(rows, selected),
+            msg="Employees retrieved successfully",
+            next_cursor=next_cursor
+        )
+
+    async def export_employees(self, request_id: str, format: str = "ndjson", batch_size: int = 1000) -> AsyncIterator[bytes]:
+        """
+        Encode the whole employees table as NDJSON or CSV, one chunk of
+        bytes per database batch.
+        """
+        columns = [column.name for column in Employee.__table__.columns]
+        exported = 0
+        self.logger.info(f"Exporting employees as {format}")
+        if format == "csv":
+            yield (",".join(columns) + "\r\n").encode()
+
+        async for rows in self.repository.stream_rows(request_id=self.request_id, batch_size=batch_size):
+            if format == "csv":
+                buffer = io.StringIO()
+                csv.writer(buffer).writerows(rows)
+                chunk = buffer.getvalue()
+            else:
+                chunk = "".join(
+                    json.dumps(dict(zip(columns, row)), ensure_ascii=False, default=_json_default) + "\n"
+                    for row in rows
+                )
+            exported += len(rows)
+            yield chunk.encode()
+        self.logger.info(f"Exported {exported} employees")
+
+    @traced("EmployeeService")
     async def create_employee(self, request_id: str, employee: EmployeeCreate) -> BaseResponse[EmployeeResponse]:
         created_employee = await self.repository.create(request_id= self.request_id, employee=employee)
         if not isinstance(created_employee, Employee):
             return SystemMessages.DB_FAILED
+        employee_cache.invalidate_on_commit(self.repository.db, [created_employee.id])
         self.logger.info(f"Successfully created employee with ID: {created_employee.id}")
         return BaseResponse.response(
             status=1,
@@ -45,13 +234,84 @@ class EmployeeService:
             msg="Employee created successfully"
         )
 
-    @log_service_call("EmployeeService")
+    @traced("EmployeeService")
+    async def bulk_create_employees(
+        self,
+        request_id: str,
+        employees: List[Dict[str, Any]],
+        batch_size: int = 500
+    ) -> BaseResponse[EmployeeBulkResult]:
+        valid, errors = self._validate_items(employees, EmployeeCreate)
+        result = await self.repository.bulk_create(
+            request_id=self.request_id, employees=valid, batch_size=batch_size
+        )
+        if not isinstance(result, tuple):
+            return SystemMessages.DB_FAILED
+        created, db_errors = result
+        return self._bulk_response(len(employees), created, 0, errors + db_errors, "Employees created")
+
+    @traced("EmployeeService")
+    async def bulk_upsert_employees(
+        self,
+        request_id: str,
+        employees: List[Dict[str, Any]],
+        batch_size: int = 500
+    ) -> BaseResponse[EmployeeBulkResult]:
+        valid, errors = self._validate_items(employees, EmployeeUpsert)
+
+        # The same id twice would make the batch statement ambiguous
+        seen, unique = set(), []
+        for index, employee in valid:
+            if employee.id in seen:
+                errors.append((index, f"Duplicate id {employee.id} in request"))
+                continue
+            seen.add(employee.id)
+            unique.append((index, employee))
+
+        result = await self.repository.bulk_upsert(
+            request_id=self.request_id, employees=unique, batch_size=batch_size
+        )
+        if not isinstance(result, tuple):
+            return SystemMessages.DB_FAILED
+        created, updated, db_errors = result
+        employee_cache.invalidate_on_commit(self.repository.db, seen)
+        return self._bulk_response(len(employees), created, updated, errors + db_errors, "Employees upserted")
+
+    @staticmethod
+    def _validate_items(items: List[Dict[str, Any]], schema: Type[BaseModel]) -> tuple[list, list]:
+        valid, errors = [], []
+        for index, item in enumerate(items):
+            try:
+                valid.append((index, schema.model_validate(item)))
+            except ValidationError as e:
+                errors.append((index, "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors())))
+        return valid, errors
+
+    def _bulk_response(self, total: int, created: int, updated: int, errors: list, msg: str) -> BaseResponse[EmployeeBulkResult]:
+        errors.sort()
+        self.logger.info(f"{msg}: created={created} updated={updated} failed={len(errors)}")
+        return BaseResponse.response(
+            status=1,
+            detail=EmployeeBulkResult(
+                total=total,
+                created=created,
+                updated=updated,
+                failed=len(errors),
+                errors=[EmployeeBulkError(index=index, error=error) for index, error in errors]
+            ),
+            msg=f"{msg} successfully"
+        )
+
+    @traced("EmployeeService")
     async def update_employee(self, request_id: str, employee_update: EmployeeUpdate) -> BaseResponse[EmployeeResponse]:
         self.logger.info(f"Updating employee with ID: {employee_update.id}")
         updated_employee = await self.repository.update(request_id=self.request_id, employee_update=employee_update)
+        if updated_employee is ErrorResponse.DEFAULT:
+            return SystemMessages.DB_FAILED
         if updated_employee is None:
             self.logger.warning(f"Employee not found with ID: {employee_update.id}")
             return SystemMessages.WRONG_PARAMS
+        employee_cache.invalidate_on_commit(self.repository.db, [employee_update.id])
         self.logger.info(f"Successfully updated employee with ID: {employee_update.id}")
         return BaseResponse.response(
             status=1,
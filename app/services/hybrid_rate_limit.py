@@ -0,0 +1,168 @@
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional
+import redis.asyncio as redis
+from loguru import logger
+from app.core.config import settings
+from app.db.redis import redis_client
+
+
+@dataclass
+class LocalBucket:
+    window_id: int
+    redis_key: str
+    max_requests: int
+    window_seconds: int
+    # Last global count seen in Redis for this window (includes our flushed usage)
+    known_count: int = 0
+    # Tokens leased to this worker that can be spent without asking Redis
+    tokens: int = 0
+
+
+class HybridRateLimiter:
+    """
+    Per worker token buckets reconciled with Redis in the background.
+
+    Each (customer_id, endpoint) gets a local bucket holding at most
+    `max_drift` tokens leased from the global fixed window budget. Requests
+    are decided locally; consumed tokens are pushed to Redis with INCRBY in
+    one batched pipeline every `sync_interval` seconds and the leases are
+    refilled from the returned global counts. A worker whose lease runs out
+    syncs that key inline once before denying.
+
+    Error bound: between two syncs every worker may spend its whole lease
+    against the same known global count, so a window can be exceeded by at
+    most (workers - 1) * max_drift requests.
+    """
+
+    def __init__(
+        self,
+        redis_client: Optional[redis.Redis] = None,
+        sync_interval: float = settings.RATE_LIMIT_HYBRID_SYNC_INTERVAL,
+        max_drift: int = settings.RATE_LIMIT_HYBRID_MAX_DRIFT,
+    ):
+        self._redis = redis_client
+        self.sync_interval = sync_interval
+        self.max_drift = max_drift
+        self._buckets: Dict[str, LocalBucket] = {}
+        self._pending: Dict[str, int] = {}
+        self._ttl_ms: Dict[str, int] = {}
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._lock = asyncio.Lock()
+        self._sync_task: Optional[asyncio.Task] = None
+
+    @property
+    def redis(self) -> redis.Redis:
+        return self._redis or redis_client.redis
+
+    async def acquire(self, customer_id: str, endpoint: str, max_requests: int, time_window_seconds: int) -> bool:
+        self._ensure_sync_task()
+        now = time.time()
+        window_id = int(now // time_window_seconds)
+        bucket_key = f"{customer_id}:{endpoint}"
+
+        bucket = self._buckets.get(bucket_key)
+        if bucket is None or bucket.window_id != window_id or bucket.max_requests != max_requests:
+            redis_key = f"rate_limit:hybrid:{customer_id}:{endpoint}:{window_id}"
+            bucket = LocalBucket(
+                window_id=window_id,
+                redis_key=redis_key,
+                max_requests=max_requests,
+                window_seconds=time_window_seconds,
+                tokens=min(self.max_drift, max_requests),
+            )
+            self._buckets[bucket_key] = bucket
+            self._ttl_ms[redis_key] = time_window_seconds * 1000
+
+        while bucket.tokens <= 0:
+            if bucket.known_count + self._pending.get(bucket.redis_key, 0) >= max_requests:
+                return False
+            # Lease exhausted but the window may still have budget: sync inline
+            await self._sync_key(bucket.redis_key)
+            if self._buckets.get(bucket_key) is not bucket:
+                # The window rolled over (or was evicted) meanwhile; this bucket
+                # is no longer refilled, so decide against the current one
+                return await self.acquire(customer_id, endpoint, max_requests, time_window_seconds)
+
+        bucket.tokens -= 1
+        self._pending[bucket.redis_key] = self._pending.get(bucket.redis_key, 0) + 1
+        return True
+
+    async def flush(self, keys: Optional[list] = None):
+        """
+        Push pending usage to Redis in one pipeline and refill the leases.
+        """
+        # One sync at a time so a lease is never refilled while usage is in flight
+        async with self._lock:
+            if keys is None:
+                batch, self._pending = self._pending, {}
+            else:
+                batch = {key: self._pending.pop(key) for key in keys if key in self._pending}
+
+            totals = {}
+            if batch:
+                try:
+                    pipe = self.redis.pipeline(transaction=False)
+                    for key, delta in batch.items():
+                        pipe.incrby(key, delta)
+                        pipe.pexpire(key, self._ttl_ms.get(key, 60000))
+                    results = await pipe.execute()
+                    totals = dict(zip(batch.keys(), results[::2]))
+                except Exception as e:
+                    # Keep the usage so the next sync reports it; leases are refilled
+                    # from local knowledge only until Redis is reachable again
+                    for key, delta in batch.items():
+                        self._pending[key] = self._pending.get(key, 0) + delta
+                    logger.bind(request_id="rate_limit_sync").warning("Rate limit sync failed: {error}", error=str(e))
+
+            refill = set(batch) | set(keys or ())
+            for bucket in self._buckets.values():
+                if bucket.redis_key not in refill:
+                    continue
+                if bucket.redis_key in totals:
+                    bucket.known_count = int(totals[bucket.redis_key])
+                remaining = bucket.max_requests - bucket.known_count - self._pending.get(bucket.redis_key, 0)
+                bucket.tokens = max(0, min(self.max_drift, remaining))
+
+            # Drop buckets of finished windows, then forget their keys once
+            # they have nothing left to report
+            now = time.time()
+            for bucket_key, bucket in list(self._buckets.items()):
+                if (bucket.window_id + 1) * bucket.window_seconds <= now and bucket.redis_key not in self._pending:
+                    del self._buckets[bucket_key]
+            current = {bucket.redis_key for bucket in self._buckets.values()}
+            for key in list(self._ttl_ms):
+                if key not in current and key not in self._pending:
+                    del self._ttl_ms[key]
+
+    async def _sync_key(self, key: str):
+        # Concurrent requests waiting on the same key share one inline sync
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self.flush([key]))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        await task
+
+    def _ensure_sync_task(self):
+        if self._sync_task is None or self._sync_task.done():
+            self._sync_task = asyncio.create_task(self._sync_loop())
+
+    async def _sync_loop(self):
+        while True:
+            await asyncio.sleep(self.sync_interval)
+            await self.flush()
+
+    async def stop(self):
+        if self._sync_task is not None:
+            self._sync_task.cancel()
+            try:
+                await self._sync_task
+            except asyncio.CancelledError:
+                pass
+            self._sync_task = None
+        await self.flush()
+
+
+hybrid_rate_limiter = HybridRateLimiter()
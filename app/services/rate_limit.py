@@ -2,7 +2,8 @@ from typing import Dict, Optional
 from datetime import datetime, timedelta
 from fastapi import Request, status
 from app.schemas.base import BaseResponse
-from app.core.logging import log_service_call, get_request_id
+from app.core.logging import get_request_id
+from app.core.tracing import traced
 from app.repositories.rate_limit import RateLimitRepository
 
 
@@ -11,7 +12,7 @@ class RateLimitService:
         self.repository = repository
         self.rate_limits: Dict[str, Dict[str, int]] = {}  # customer_id -> {endpoint -> count}
 
-    @log_service_call("RateLimitService")
+    @traced("RateLimitService")
     async def check_rate_limit(
         self,
         customer_id: str,
@@ -1,16 +1,28 @@
+import uuid
 from typing import Optional
-from datetime import datetime, timedelta
 from fastapi import Request, status
 import redis.asyncio as redis
 from app.schemas.base import BaseResponse
-from app.core.logging import log_service_call, get_request_id
+from app.core.tracing import traced
+from app.core.redis_scripts import RATE_LIMIT_SCRIPTS
+from app.services.hybrid_rate_limit import HybridRateLimiter, hybrid_rate_limiter
 
 
 class RedisRateLimitService:
-    def __init__(self, redis_client: redis.Redis):
+    def __init__(
+        self,
+        redis_client: redis.Redis,
+        algorithm: str = "fixed_window",
+        hybrid_limiter: Optional[HybridRateLimiter] = None
+    ):
+        if algorithm != "hybrid" and algorithm not in RATE_LIMIT_SCRIPTS:
+            raise ValueError(f"Unknown rate limit algorithm: {algorithm}")
         self.redis = redis_client
+        self.algorithm = algorithm
+        self.script = RATE_LIMIT_SCRIPTS.get(algorithm)
+        self.hybrid_limiter = hybrid_limiter or hybrid_rate_limiter
 
-    @log_service_call("RedisRateLimitService")
+    @traced("RedisRateLimitService")
     async def check_rate_limit(
         self,
         customer_id: str,
@@ -20,50 +32,29 @@ class RedisRateLimitService:
         request: Request
     ) -> BaseResponse[bool]:
         try:
-            request_id = get_request_id(request)
-            current_time = datetime.utcnow()
-            
-            # Create a unique key for this customer and endpoint
-            key = f"rate_limit:{customer_id}:{endpoint}"
-            
-            # Get current count and window start from Redis
-            pipe = self.redis.pipeline()
-            pipe.get(key)
-            pipe.get(f"{key}:window_start")
-            count, window_start_str = await pipe.execute()
-            
-            count = int(count) if count else 0
-            window_start = datetime.fromisoformat(window_start_str.decode()) if window_start_str else current_time
-            
-            # Check if window has expired
-            if current_time - window_start > timedelta(seconds=time_window_seconds):
-                # Reset window
-                pipe = self.redis.pipeline()
-                pipe.set(key, 1)
-                pipe.set(f"{key}:window_start", current_time.isoformat())
-                pipe.expire(key, time_window_seconds)
-                pipe.expire(f"{key}:window_start", time_window_seconds)
-                await pipe.execute()
-                return BaseResponse.success(
-                    detail=True,
-                    msg="Rate limit check passed"
+            if self.algorithm == "hybrid":
+                # Decided from the local bucket, reconciled with Redis in the background
+                allowed = await self.hybrid_limiter.acquire(
+                    customer_id, endpoint, max_requests, time_window_seconds
+                )
+            else:
+                # Create a unique key for this customer, endpoint and algorithm
+                key = f"rate_limit:{self.algorithm}:{customer_id}:{endpoint}"
+
+                # Check and consume in a single atomic round trip
+                allowed, remaining, retry_after_ms = await self.script(
+                    self.redis,
+                    keys=[key],
+                    args=[max_requests, time_window_seconds * 1000, uuid.uuid4().hex],
                 )
 
-            # Check if limit exceeded
-            if count >= max_requests:
+            if not allowed:
                 return BaseResponse.error(
                     status=status.HTTP_429_TOO_MANY_REQUESTS,
                     msg=f"Rate limit exceeded. Maximum {max_requests} requests per {time_window_seconds} seconds",
                     detail=False
                 )
 
-            # Increment count
-            pipe = self.redis.pipeline()
-            pipe.incr(key)
-            pipe.expire(key, time_window_seconds)
-            pipe.expire(f"{key}:window_start", time_window_seconds)
-            await pipe.execute()
-
             return BaseResponse.success(
                 detail=True,
                 msg="Rate limit check passed"
@@ -74,4 +65,4 @@ class RedisRateLimitService:
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 msg="Failed to check rate limit",
                 detail=str(e)
-            ) 
\ No newline at end of file
+            )
@@ -0,0 +1,68 @@
+"""
+Rows per second: single-row EmployeeRepository.create vs. bulk_create and
+bulk_upsert, on a SQLite file.
+
+    python -m benchmarks.bench_bulk_write [--rows N] [--batch-size N]
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from app.db.base import Base
+from app.repositories.employee import EmployeeRepository
+from app.schemas.employee import EmployeeCreate, EmployeeUpsert
+from benchmarks.common import silence_logging
+
+
+def make_employee(i: int) -> dict:
+    return dict(
+        name=f"Employee {i:07d}", department="Engineering", role="Developer",
+        type_of_working="Fulltime", hometown="Ha Noi", age=20 + i % 40,
+    )
+
+
+async def main(rows: int, batch_size: int):
+    silence_logging()
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{os.path.join(tmp, 'bench.db')}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        creates = [(i, EmployeeCreate(**make_employee(i))) for i in range(rows)]
+
+        results = []
+        async with session_factory() as db:
+            repository = EmployeeRepository(db)
+            t_begin = time.perf_counter()
+            for _, employee in creates:
+                await repository.create(request_id="bench", employee=employee)
+            results.append(("single-row create", time.perf_counter() - t_begin))
+
+        async with session_factory() as db:
+            repository = EmployeeRepository(db)
+            t_begin = time.perf_counter()
+            await repository.bulk_create(request_id="bench", employees=creates, batch_size=batch_size)
+            results.append((f"bulk_create (batch={batch_size})", time.perf_counter() - t_begin))
+
+        upserts = [(i, EmployeeUpsert(id=i + 1, **make_employee(i))) for i in range(rows)]
+        async with session_factory() as db:
+            repository = EmployeeRepository(db)
+            t_begin = time.perf_counter()
+            await repository.bulk_upsert(request_id="bench", employees=upserts, batch_size=batch_size)
+            results.append((f"bulk_upsert (batch={batch_size})", time.perf_counter() - t_begin))
+        await engine.dispose()
+
+    print(f"{'path':<32} {'rows':>8} {'seconds':>10} {'rows/s':>12}")
+    for name, elapsed in results:
+        print(f"{name:<32} {rows:>8} {elapsed:>10.3f} {rows / elapsed:>12.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.batch_size))
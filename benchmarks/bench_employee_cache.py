@@ -0,0 +1,74 @@
+"""
+get_employee latency: database read vs. L1 (in-process) hit vs. L2 (Redis)
+hit, over a generated SQLite employees table. L2 runs against fakeredis
+unless --redis is given.
+
+    python -m benchmarks.bench_employee_cache [--rows N] [--iterations N] [--redis]
+"""
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import fakeredis
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.db.redis import RedisClient
+from app.repositories.employee import EmployeeRepository
+from app.services.employee import EmployeeService, employee_cache
+from benchmarks.common import print_report, run_timed, seed_employees_sqlite, silence_logging
+
+
+async def main(rows: int, iterations: int, use_redis: bool):
+    silence_logging()
+    redis = RedisClient()
+    if not use_redis:
+        redis._redis = fakeredis.FakeAsyncRedis(decode_responses=True)
+    employee_cache._redis = redis
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        seed_employees_sqlite(path, rows)
+        engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+        session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        ids = [random.randint(1, rows) for _ in range(iterations)]
+
+        async with session_factory() as db:
+            service = EmployeeService(EmployeeRepository(db), "bench")
+
+            def lookup():
+                employee_id = ids[lookup.n % len(ids)]
+                lookup.n += 1
+                return service.get_employee(employee_id=employee_id, request_id="bench")
+            lookup.n = 0
+
+            settings.EMPLOYEE_CACHE_ENABLED = False
+            database = await run_timed("database (cache disabled)", lookup, iterations)
+            db.expunge_all()
+
+            settings.EMPLOYEE_CACHE_ENABLED = True
+            # First pass fills both tiers
+            await run_timed("warm up", lookup, iterations)
+            l1 = await run_timed("L1 hit", lookup, iterations)
+
+            # Empty L1 before every lookup so each one is served by Redis
+            async def l2_lookup():
+                employee_cache.l1 = LRUCache(settings.EMPLOYEE_CACHE_L1_SIZE, settings.EMPLOYEE_CACHE_L1_TTL)
+                await lookup()
+            l2 = await run_timed("L2 hit", l2_lookup, iterations)
+
+        print_report([database, l1, l2])
+        print(employee_cache.stats())
+        await engine.dispose()
+    await redis.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--iterations", type=int, default=5000)
+    parser.add_argument("--redis", action="store_true", help="use the configured Redis instead of fakeredis")
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.iterations, args.redis))
@@ -0,0 +1,78 @@
+"""
+Redis round trips per request: Lua fixed window vs. hybrid local buckets.
+
+    python -m benchmarks.bench_hybrid_rate_limit [--requests N] [--customers N]
+"""
+import argparse
+import asyncio
+import random
+import time
+import fakeredis
+from fastapi import Request
+from app.services.hybrid_rate_limit import HybridRateLimiter
+from app.services.redis_rate_limit import RedisRateLimitService
+from benchmarks.common import silence_logging
+
+
+class CountingRedis(fakeredis.FakeAsyncRedis):
+    """
+    fakeredis client counting network round trips (commands and pipelines).
+    """
+
+    round_trips = 0
+
+    async def execute_command(self, *args, **options):
+        self.round_trips += 1
+        return await super().execute_command(*args, **options)
+
+    def pipeline(self, transaction=True, shard_hint=None):
+        pipe = super().pipeline(transaction, shard_hint)
+        execute = pipe.execute
+
+        async def counted_execute(raise_on_error=True):
+            self.round_trips += 1
+            return await execute(raise_on_error)
+        pipe.execute = counted_execute
+        return pipe
+
+
+async def run(service: RedisRateLimitService, client: CountingRedis, requests: int, customers: int) -> dict:
+    request = Request({"type": "http", "headers": []})
+    rng = random.Random(42)
+    started = time.perf_counter()
+    for _ in range(requests):
+        await service.check_rate_limit(
+            customer_id=f"c{rng.randrange(customers)}", endpoint="/bench",
+            max_requests=1_000_000, time_window_seconds=60, request=request,
+        )
+    elapsed = time.perf_counter() - started
+    return {"round_trips": client.round_trips, "elapsed": elapsed}
+
+
+async def main(requests: int, customers: int, max_drift: int):
+    silence_logging()
+
+    client = CountingRedis()
+    lua = await run(RedisRateLimitService(client, "fixed_window"), client, requests, customers)
+
+    client = CountingRedis()
+    limiter = HybridRateLimiter(client, sync_interval=0.1, max_drift=max_drift)
+    hybrid = await run(RedisRateLimitService(client, "hybrid", hybrid_limiter=limiter), client, requests, customers)
+    await limiter.stop()
+    hybrid["round_trips"] = client.round_trips
+
+    print(f"{'mode':<14} {'requests':>10} {'redis ops':>10} {'ops/request':>12} {'req/s':>10}")
+    for name, result in (("lua", lua), (f"hybrid d={max_drift}", hybrid)):
+        print(
+            f"{name:<14} {requests:>10} {result['round_trips']:>10} "
+            f"{result['round_trips'] / requests:>12.4f} {requests / result['elapsed']:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--customers", type=int, default=50)
+    parser.add_argument("--max-drift", type=int, default=10)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.customers, args.max_drift))
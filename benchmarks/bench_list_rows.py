@@ -0,0 +1,99 @@
+"""
+List page cost: ORM objects validated one at a time (the previous
+get_employees path) vs. plain column rows validated in one TypeAdapter
+call, vs. plain rows turned into dicts without validation. Each variant
+includes encoding the response. With --profile, a cProfile summary of
+each variant shows where the time goes.
+
+    python -m benchmarks.bench_list_rows [--rows N] [--page-size N] [--profile]
+"""
+import argparse
+import asyncio
+import cProfile
+import io
+import os
+import pstats
+import tempfile
+import time
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from app.core.responses import FastJSONResponse
+from app.models.employee import Employee
+from app.schemas.base import BaseResponse
+from app.schemas.employee import EmployeeResponse
+from app.services.employee import EMPLOYEE_RESPONSE_COLUMNS, EMPLOYEE_RESPONSE_FIELDS, rows_to_employees
+from benchmarks.common import seed_employees_sqlite, silence_logging
+
+
+async def orm_per_row(db: AsyncSession, page_size: int) -> bytes:
+    employees = (await db.execute(select(Employee).limit(page_size))).scalars().all()
+    detail = [EmployeeResponse.model_validate(employee) for employee in employees]
+    return FastJSONResponse(BaseResponse.response(status=1, msg="ok", detail=detail)).body
+
+
+async def rows_type_adapter(db: AsyncSession, page_size: int) -> bytes:
+    rows = (await db.execute(select(*EMPLOYEE_RESPONSE_COLUMNS).limit(page_size))).all()
+    detail = rows_to_employees(rows)
+    return FastJSONResponse(BaseResponse.response(status=1, msg="ok", detail=detail)).body
+
+
+async def rows_trusted(db: AsyncSession, page_size: int) -> bytes:
+    rows = (await db.execute(select(*EMPLOYEE_RESPONSE_COLUMNS).limit(page_size))).all()
+    detail = [dict(zip(EMPLOYEE_RESPONSE_FIELDS, row)) for row in rows]
+    return FastJSONResponse(BaseResponse.response(status=1, msg="ok", detail=detail)).body
+
+
+async def best_ms(db: AsyncSession, func, page_size: int, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        db.expunge_all()
+        t_begin = time.perf_counter()
+        await func(db, page_size)
+        best = min(best, time.perf_counter() - t_begin)
+    return best * 1000
+
+
+async def profile(db: AsyncSession, func, page_size: int, top: int = 12) -> str:
+    db.expunge_all()
+    profiler = cProfile.Profile()
+    profiler.enable()
+    await func(db, page_size)
+    profiler.disable()
+    out = io.StringIO()
+    pstats.Stats(profiler, stream=out).sort_stats("tottime").print_stats(top)
+    return out.getvalue()
+
+
+async def main(rows: int, page_size: int, with_profile: bool):
+    silence_logging()
+    variants = [orm_per_row, rows_type_adapter, rows_trusted]
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        seed_employees_sqlite(path, rows)
+        engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+        async with AsyncSession(engine) as db:
+            # Every variant must produce the same response body
+            bodies = {await func(db, page_size) for func in variants}
+            assert len(bodies) == 1, "variants disagree"
+
+            baseline = None
+            print(f"{'variant':<20} {'ms/page':>10} {'speedup':>9}")
+            for func in variants:
+                elapsed = await best_ms(db, func, page_size)
+                baseline = baseline or elapsed
+                print(f"{func.__name__:<20} {elapsed:>10.2f} {baseline / elapsed:>8.1f}x")
+
+            if with_profile:
+                for func in variants:
+                    print(f"\n=== {func.__name__} ===")
+                    print(await profile(db, func, page_size))
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--page-size", type=int, default=10000)
+    parser.add_argument("--profile", action="store_true")
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.page_size, args.profile))
@@ -0,0 +1,57 @@
+"""
+Logging cost per request on the calling thread: colorized console sink vs.
+the batched JSON sink used in production mode.
+
+    python -m benchmarks.bench_logging [--requests N] [--lines-per-request N]
+
+The console sink writes to a temporary file instead of a terminal so the
+numbers reflect the synchronous write, not terminal rendering.
+"""
+import argparse
+import tempfile
+import time
+from loguru import logger
+from app.core.log_sink import BatchedLogSink
+
+
+def emit_request(lines: int, request_id: str):
+    log = logger.bind(request_id=request_id)
+    for i in range(lines):
+        log.info("Call {service}.{func} with input {args}", service="EmployeeService", func="get_employee", args=(i,))
+
+
+def measure(name: str, requests: int, lines: int) -> float:
+    started = time.perf_counter()
+    for i in range(requests):
+        emit_request(lines, f"req-{i}")
+    elapsed = time.perf_counter() - started
+    print(f"{name:<28} {elapsed / requests * 1e6:>10.1f} us/request {requests * lines / elapsed:>12.0f} lines/s")
+    return elapsed
+
+
+def main(requests: int, lines: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        logger.remove()
+        with open(f"{tmp}/console.log", "w") as console:
+            logger.add(
+                console,
+                format="<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | <cyan>request_id={extra[request_id]}</cyan> | <white>{message}</white>",
+                level="INFO", colorize=True, backtrace=True, diagnose=True,
+            )
+            measure("console (sync, colorized)", requests, lines)
+            logger.remove()
+
+        sink = BatchedLogSink(path=f"{tmp}/app.log")
+        logger.add(sink, format="{message}", level="INFO", backtrace=False, diagnose=False)
+        measure("batched JSON sink", requests, lines)
+        logger.remove()
+        sink.stop()
+        print(f"batched sink stats: {sink.stats()}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--lines-per-request", type=int, default=8)
+    args = parser.parse_args()
+    main(args.requests, args.lines_per_request)
@@ -0,0 +1,81 @@
+"""
+Login storm: latency of a cheap endpoint while concurrent logins run bcrypt
+verification on the event loop (verify_password) vs. on the password pool
+(verify_password_async).
+
+    python -m benchmarks.bench_login_storm [--logins N] [--concurrency N]
+"""
+import argparse
+import asyncio
+import time
+import httpx
+from fastapi import FastAPI
+from app.core.security import get_password_hash, password_pool, verify_password, verify_password_async
+from benchmarks.common import print_report, silence_logging, summarize
+
+
+def build_app(hashed: str) -> FastAPI:
+    app = FastAPI()
+
+    @app.post("/login-sync")
+    async def login_sync():
+        return {"ok": verify_password("secret", hashed)}
+
+    @app.post("/login-async")
+    async def login_async():
+        return {"ok": await verify_password_async("secret", hashed)}
+
+    @app.get("/ping")
+    async def ping():
+        return {}
+
+    return app
+
+
+async def storm(client: httpx.AsyncClient, path: str, logins: int, concurrency: int) -> dict:
+    samples = []
+    done = asyncio.Event()
+
+    async def pinger(interval: float = 0.005):
+        # Latency counts from when each ping was due, so time spent blocked
+        # behind a login is not hidden by the late start
+        due = time.perf_counter()
+        while True:
+            await client.get("/ping")
+            samples.append(time.perf_counter() - due)
+            if done.is_set():
+                break
+            due += interval
+            await asyncio.sleep(max(0.0, due - time.perf_counter()))
+
+    async def logger_in(count: int):
+        for _ in range(count):
+            await client.post(path)
+
+    started = time.perf_counter()
+    ping_task = asyncio.create_task(pinger())
+    if path:
+        await asyncio.gather(*[logger_in(logins // concurrency) for _ in range(concurrency)])
+    else:
+        await asyncio.sleep(1)
+    done.set()
+    await ping_task
+    return summarize(f"/ping during {path or 'no logins'}", samples, time.perf_counter() - started)
+
+
+async def main(logins: int, concurrency: int):
+    silence_logging()
+    app = build_app(get_password_hash("secret"))
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        results = [await storm(client, path, logins, concurrency) for path in ("", "/login-sync", "/login-async")]
+    print_report(results)
+    print(f"password pool: {password_pool.stats()}")
+    password_pool.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--logins", type=int, default=16)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+    asyncio.run(main(args.logins, args.concurrency))
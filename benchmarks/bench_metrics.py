@@ -0,0 +1,58 @@
+"""
+Hot-path cost of the metrics registry: Counter.inc and Histogram.observe
+per call, and MetricsMiddleware per request over a bare FastAPI route.
+
+    python -m benchmarks.bench_metrics [--iterations N]
+"""
+import argparse
+import asyncio
+import time
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
+from app.core.metrics import MetricsRegistry
+from app.middleware.metrics import MetricsMiddleware
+from benchmarks.bench_middleware import make_call
+from benchmarks.common import print_report, run_timed, silence_logging
+
+
+def per_call_us(func, iterations: int) -> float:
+    t_begin = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - t_begin) / iterations * 1e6
+
+
+def build_app(with_metrics: bool) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/ping")
+    async def ping():
+        return PlainTextResponse("pong")
+
+    if with_metrics:
+        app.add_middleware(MetricsMiddleware)
+    return app
+
+
+async def main(iterations: int):
+    silence_logging()
+    registry = MetricsRegistry()
+    counter = registry.counter("requests_total", "Requests", ("method", "route", "status"))
+    histogram = registry.histogram("latency_seconds", "Latency", ("method", "route"))
+    print(f"Counter.inc:       {per_call_us(lambda: counter.inc('GET', '/ping', '200'), iterations * 10):.3f} us")
+    print(f"Histogram.observe: {per_call_us(lambda: histogram.observe(0.0042, 'GET', '/ping'), iterations * 10):.3f} us")
+
+    results = []
+    for with_metrics in (False, True):
+        call = make_call(build_app(with_metrics))
+        await run_timed("warm up", call, 200)
+        results.append(await run_timed(f"metrics middleware={with_metrics}", call, iterations))
+    print_report(results)
+    print(f"MetricsMiddleware: +{(results[1]['p50_ms'] - results[0]['p50_ms']) * 1000:.1f} us per request at p50")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=10000)
+    args = parser.parse_args()
+    asyncio.run(main(args.iterations))
@@ -0,0 +1,56 @@
+"""
+Page latency by depth: OFFSET pagination vs. keyset (cursor) pagination
+over a generated SQLite employees table.
+
+    python -m benchmarks.bench_pagination [--rows N] [--page-size N]
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from app.repositories.employee import EmployeeRepository
+from benchmarks.common import seed_employees_sqlite, silence_logging
+
+
+async def time_call(func, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t_begin = time.perf_counter()
+        await func()
+        best = min(best, time.perf_counter() - t_begin)
+    return best * 1000
+
+
+async def main(rows: int, page_size: int):
+    silence_logging()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        seed_employees_sqlite(path, rows)
+        engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+        session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+        print(f"{'depth (rows)':>14} {'offset ms':>12} {'keyset ms':>12}")
+        async with session_factory() as db:
+            repository = EmployeeRepository(db)
+            for depth in (0, rows // 10, rows // 4, rows // 2, rows - page_size):
+                offset_ms = await time_call(
+                    lambda: repository.get_all(request_id="bench", skip=depth, limit=page_size)
+                )
+                # Ids are dense in the generated table, so the last seen id equals the depth
+                keyset_ms = await time_call(
+                    lambda: repository.get_page(request_id="bench", limit=page_size, after={"id": depth})
+                )
+                db.expunge_all()
+                print(f"{depth:>14} {offset_ms:>12.2f} {keyset_ms:>12.2f}")
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=500000)
+    parser.add_argument("--page-size", type=int, default=100)
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.page_size))
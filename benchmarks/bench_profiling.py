@@ -0,0 +1,54 @@
+"""
+Per request cost of ProfilingMiddleware on a trivial endpoint: without
+the middleware, with it disabled, enabled with a token but not triggered,
+and with every request profiled (sampling plus the file write).
+
+    python -m benchmarks.bench_profiling [--iterations N]
+"""
+import argparse
+import asyncio
+import tempfile
+import httpx
+from fastapi import FastAPI
+from app.middleware.profiling import ProfilingMiddleware
+from benchmarks.common import print_report, run_timed, silence_logging
+
+
+def build_app(**options) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/ping")
+    async def ping():
+        return {}
+
+    if options:
+        app.add_middleware(ProfilingMiddleware, **options)
+    return app
+
+
+async def main(iterations: int):
+    silence_logging()
+    directory = tempfile.mkdtemp(prefix="profiles-")
+    cases = (
+        ("no middleware", {}),
+        ("disabled", {"token": "", "sample_rate": 0, "directory": directory}),
+        ("token set, not triggered", {"token": "secret", "sample_rate": 0, "directory": directory}),
+        ("every request profiled", {"token": "", "sample_rate": 1.0, "directory": directory}),
+    )
+    results = []
+    for name, options in cases:
+        transport = httpx.ASGITransport(app=build_app(**options))
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            async def request():
+                await client.get("/ping")
+
+            await run_timed("warm up", request, 100)
+            results.append(await run_timed(name, request, iterations))
+    print_report(results)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+    asyncio.run(main(args.iterations))
@@ -0,0 +1,60 @@
+"""
+Sparse fieldsets: response bytes and time for a get_employees page with
+all fields vs. a `fields=` projection, over a generated SQLite table with
+long department/hometown values.
+
+    python -m benchmarks.bench_projection [--rows N] [--page-size N]
+"""
+import argparse
+import asyncio
+import os
+import sqlite3
+import tempfile
+import time
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from app.core.responses import FastJSONResponse
+from app.repositories.employee import EmployeeRepository
+from app.services.employee import EmployeeService
+from benchmarks.common import seed_employees_sqlite, silence_logging
+
+
+async def measure(service: EmployeeService, page_size: int, fields, repeat: int = 5) -> tuple[float, int]:
+    best, size = float("inf"), 0
+    for _ in range(repeat):
+        t_begin = time.perf_counter()
+        response = await service.get_employees(request_id="bench", limit=page_size, fields=fields)
+        size = len(FastJSONResponse(response).body)
+        best = min(best, time.perf_counter() - t_begin)
+    return best * 1000, size
+
+
+async def main(rows: int, page_size: int):
+    silence_logging()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        seed_employees_sqlite(path, rows)
+        # Realistic widths for the 500 char columns
+        conn = sqlite3.connect(path)
+        conn.execute("UPDATE employees SET department = department || printf('%.200c', '-'), "
+                     "hometown = hometown || printf('%.200c', '-')")
+        conn.commit()
+        conn.close()
+
+        engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+        async with AsyncSession(engine) as db:
+            service = EmployeeService(EmployeeRepository(db), "bench")
+            print(f"{'fields':<16} {'ms/page':>10} {'bytes':>12} {'vs all':>8}")
+            full_ms, full_size = None, None
+            for fields in (None, "id,name,age", "id,name", "id"):
+                elapsed, size = await measure(service, page_size, fields)
+                full_ms, full_size = full_ms or elapsed, full_size or size
+                print(f"{fields or 'all':<16} {elapsed:>10.2f} {size:>12} {size / full_size:>7.0%}")
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--page-size", type=int, default=1000)
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.page_size))
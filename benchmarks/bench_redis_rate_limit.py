@@ -0,0 +1,114 @@
+"""
+Compare the Lua (single EVALSHA) rate limiter with the previous
+GET pipeline + SET/INCR pipeline implementation.
+
+    python -m benchmarks.bench_redis_rate_limit [--fake] [--iterations N]
+
+Uses the Redis from settings when reachable, otherwise (or with --fake)
+an in-process fakeredis server.
+"""
+import argparse
+import asyncio
+from datetime import datetime, timedelta
+import redis.asyncio as redis
+from fastapi import Request
+from app.core.config import settings
+from app.services.redis_rate_limit import RedisRateLimitService
+from benchmarks.common import print_report, run_timed, silence_logging
+
+
+BENCH_REQUEST = Request({"type": "http", "headers": []})
+
+
+async def legacy_check_rate_limit(client: redis.Redis, key: str, max_requests: int, time_window_seconds: int) -> bool:
+    # Two round trip implementation kept here as the baseline
+    current_time = datetime.utcnow()
+    pipe = client.pipeline()
+    pipe.get(key)
+    pipe.get(f"{key}:window_start")
+    count, window_start_str = await pipe.execute()
+    count = int(count) if count else 0
+    window_start = datetime.fromisoformat(window_start_str.decode()) if window_start_str else current_time
+    if current_time - window_start > timedelta(seconds=time_window_seconds):
+        pipe = client.pipeline()
+        pipe.set(key, 1)
+        pipe.set(f"{key}:window_start", current_time.isoformat())
+        pipe.expire(key, time_window_seconds)
+        pipe.expire(f"{key}:window_start", time_window_seconds)
+        await pipe.execute()
+        return True
+    if count >= max_requests:
+        return False
+    pipe = client.pipeline()
+    pipe.incr(key)
+    pipe.expire(key, time_window_seconds)
+    pipe.expire(f"{key}:window_start", time_window_seconds)
+    await pipe.execute()
+    return True
+
+
+async def get_client(fake: bool) -> redis.Redis:
+    if not fake:
+        client = redis.Redis(
+            host=settings.REDIS_HOST, port=settings.REDIS_PORT,
+            db=settings.REDIS_DB, password=settings.REDIS_PASSWORD,
+        )
+        try:
+            await client.ping()
+            return client
+        except Exception:
+            print("Redis not reachable, falling back to fakeredis")
+    import fakeredis
+    return fakeredis.FakeAsyncRedis()
+
+
+async def count_admitted(check, concurrency: int) -> int:
+    results = await asyncio.gather(*[check() for _ in range(concurrency)])
+    return sum(1 for r in results if r)
+
+
+async def main(fake: bool, iterations: int):
+    silence_logging()
+    client = await get_client(fake)
+    limit = iterations * 10
+    results = []
+
+    async def legacy():
+        return await legacy_check_rate_limit(client, "bench:legacy", limit, 60)
+    results.append(await run_timed("legacy (2 round trips)", legacy, iterations))
+
+    for algorithm in ("fixed_window", "sliding_window_log", "gcra"):
+        service = RedisRateLimitService(client, algorithm)
+
+        async def lua():
+            response = await service.check_rate_limit(
+                customer_id="bench", endpoint=f"/{algorithm}", max_requests=limit,
+                time_window_seconds=60, request=BENCH_REQUEST,
+            )
+            return response.detail
+        results.append(await run_timed(f"lua {algorithm}", lua, iterations))
+
+    print_report(results)
+
+    # Admission accuracy: 200 concurrent requests against a limit of 50
+    await client.delete("bench:race", "bench:race:window_start", "rate_limit:fixed_window:race:/race")
+    race_service = RedisRateLimitService(client, "fixed_window")
+    legacy_admitted = await count_admitted(lambda: legacy_check_rate_limit(client, "bench:race", 50, 60), 200)
+
+    async def lua_race():
+        response = await race_service.check_rate_limit(
+            customer_id="race", endpoint="/race", max_requests=50,
+            time_window_seconds=60, request=BENCH_REQUEST,
+        )
+        return response.detail
+    lua_admitted = await count_admitted(lua_race, 200)
+    print(f"\nadmitted out of 200 concurrent with limit 50: legacy={legacy_admitted} lua={lua_admitted}")
+    await client.aclose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--fake", action="store_true")
+    parser.add_argument("--iterations", type=int, default=5000)
+    args = parser.parse_args()
+    asyncio.run(main(args.fake, args.iterations))
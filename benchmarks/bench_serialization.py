@@ -0,0 +1,60 @@
+"""
+Serialization time of a list BaseResponse: FastAPI's default path
+(jsonable_encoder + JSONResponse) vs. FastJSONResponse, plus a pre-encoded
+SystemMessages response.
+
+    python -m benchmarks.bench_serialization [--repeat N]
+"""
+import argparse
+import time
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from app.core.global_define import SystemMessages
+from app.core.responses import FastJSONResponse
+from app.schemas.base import BaseResponse
+from app.schemas.employee import EmployeeResponse
+
+
+def best_ms(func, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t_begin = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - t_begin)
+    return best * 1000
+
+
+def list_response(rows: int) -> BaseResponse:
+    return BaseResponse.response(
+        status=1,
+        msg="Employees retrieved successfully",
+        detail=[
+            EmployeeResponse(
+                id=i + 1, name=f"Employee {i:07d}", department=f"Department {i % 50}", role="Developer",
+                type_of_working="Fulltime", hometown=f"Hometown {i % 63}", age=20 + i % 40, active=1
+            )
+            for i in range(rows)
+        ],
+    )
+
+
+def main(repeat: int):
+    print(f"{'rows':>8} {'default ms':>12} {'fast ms':>10} {'speedup':>9} {'bytes':>10}")
+    for rows in (100, 1000, 10000):
+        content = list_response(rows)
+        default_ms = best_ms(lambda: JSONResponse(jsonable_encoder(content)), repeat)
+        fast_ms = best_ms(lambda: FastJSONResponse(content), repeat)
+        size = len(FastJSONResponse(content).body)
+        print(f"{rows:>8} {default_ms:>12.3f} {fast_ms:>10.3f} {default_ms / fast_ms:>8.1f}x {size:>10}")
+
+    message = SystemMessages.WRONG_PARAMS
+    default_ms = best_ms(lambda: JSONResponse(jsonable_encoder(message)), repeat * 100)
+    fast_ms = best_ms(lambda: FastJSONResponse(message), repeat * 100)
+    print(f"\nSystemMessages.WRONG_PARAMS: default {default_ms * 1000:.1f}us, pre-encoded {fast_ms * 1000:.1f}us")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    main(args.repeat)
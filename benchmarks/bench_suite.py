@@ -0,0 +1,273 @@
+"""
+End-to-end benchmark suite: scripted workloads sent to main:app in-process
+over ASGI, with SQLite (aiosqlite) standing in for MySQL and fakeredis for
+Redis, so the whole stack is measured: middleware, log_service_call,
+services, repositories, caches and serialization.
+
+    python -m benchmarks.bench_suite [--workload NAME ...] [--requests N] [--concurrency N] [--runs 5]
+                                     [--baseline PATH] [--threshold 0.25] [--update-baseline]
+
+Each workload runs --runs times and its median figures are compared with
+the stored baseline; the run exits with status 1 when throughput, p50 or
+p95 regress by more than --threshold, or by more than the spread between
+the baseline's own runs when that is wider, or when any request fails. Requests
+shed by the concurrency limiter (503) are counted apart, not as failures.
+Baselines only compare on the machine that recorded them: refresh with
+--update-baseline on the machine that runs the check, and again whenever
+a change moves the hot paths on purpose.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+import fakeredis
+import httpx
+from loguru import logger
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+import app.core.responses as responses_module
+import app.db.session as session_module
+from app.core.cache import LRUCache
+from app.core.concurrency import request_limiter
+from app.core.redis_scripts import load_rate_limit_scripts
+from app.core.sql_logging import setup_sql_logging
+from app.db.redis import redis_client
+from app.db.routing import ReplicaRouter, RoutingSession
+from app.middleware.rate_limit import RateLimitMiddleware, RateLimitPolicy, RedisRateLimitBackend
+from app.services.employee import employee_cache
+from benchmarks.common import print_report, seed_employees_sqlite, silence_logging, summarize
+from main import app as main_app
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+# Metric -> direction in which a change is a regression
+CHECKED_METRICS = {"throughput": -1, "p50_ms": 1, "p95_ms": 1}
+MEDIAN_METRICS = ("throughput", "p50_ms", "p95_ms", "p99_ms", "rejected", "shed")
+
+# (method, path, keyword arguments for httpx)
+Call = Tuple[str, str, dict]
+
+
+@dataclass
+class Workload:
+    name: str
+    # (weight, build a call from the worker's random generator)
+    mix: List[Tuple[float, Callable[[random.Random], Call]]]
+    rate_limited: bool = False
+    customers: int = 50
+
+
+def employee_payload(rng: random.Random) -> dict:
+    return dict(name=f"Bench {rng.randrange(10**9)}", department=f"Department {rng.randrange(50)}",
+                role="Developer", type_of_working="Fulltime", hometown=f"Hometown {rng.randrange(63)}",
+                age=rng.randrange(20, 60))
+
+
+def workloads(rows: int) -> Dict[str, Workload]:
+    def get_one(rng):
+        return "POST", f"/api/v1/employees/get/{rng.randint(1, rows)}", {}
+
+    def get_page(rng):
+        return "POST", "/api/v1/employees/get-list", {"params": {"skip": rng.randrange(0, rows, 50), "limit": 50}}
+
+    def get_projected_page(rng):
+        return "POST", "/api/v1/employees/get-list", {
+            "params": {"pagination": "keyset", "limit": 100, "fields": "id,name"}}
+
+    def create(rng):
+        return "POST", "/api/v1/employees/create", {"json": employee_payload(rng)}
+
+    def update(rng):
+        employee_id = rng.randint(1, rows)
+        return "POST", f"/api/v1/employees/update/{employee_id}", {
+            "json": {"id": employee_id, "age": rng.randrange(20, 60)}}
+
+    def bulk_upsert(rng):
+        items = [dict(employee_payload(rng), id=rng.randint(1, rows)) for _ in range(20)]
+        return "POST", "/api/v1/employees/bulk-upsert", {"json": items}
+
+    return {
+        "read_heavy": Workload("read_heavy", [(0.7, get_one), (0.2, get_page), (0.1, get_projected_page)]),
+        "write_heavy": Workload("write_heavy", [(0.4, create), (0.3, update), (0.1, bulk_upsert), (0.2, get_one)]),
+        "rate_limited": Workload("rate_limited", [(1.0, get_one)], rate_limited=True),
+    }
+
+
+@asynccontextmanager
+async def local_stack(rows: int):
+    """
+    Point the app at a seeded SQLite file and an empty fakeredis server for
+    the duration of one workload, the way startup would wire MySQL/Redis.
+    """
+    saved = (session_module.AsyncSessionLocal, redis_client._redis, employee_cache.l1, responses_module.response_cache)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        seed_employees_sqlite(path, rows)
+        engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+        setup_sql_logging(engine)
+        session_module.AsyncSessionLocal = sessionmaker(
+            bind=engine,
+            class_=AsyncSession,
+            sync_session_class=RoutingSession,
+            info={"router": ReplicaRouter(engine, [])},
+            expire_on_commit=False,
+            autoflush=False,
+        )
+        redis_client._redis = fakeredis.FakeAsyncRedis(server=fakeredis.FakeServer(), decode_responses=True)
+        await load_rate_limit_scripts(redis_client.redis)
+        employee_cache.l1 = LRUCache(employee_cache.l1.max_size, employee_cache.l1.ttl)
+        responses_module.response_cache = LRUCache(responses_module.response_cache.max_size,
+                                                   responses_module.response_cache.ttl)
+        # Each run starts from the initial limit, not what the last one learned
+        request_limiter.reset()
+        try:
+            yield
+        finally:
+            await engine.dispose()
+            (session_module.AsyncSessionLocal, redis_client._redis,
+             employee_cache.l1, responses_module.response_cache) = saved
+
+
+async def run_workload(workload: Workload, requests: int, concurrency: int, rows: int, seed: int) -> dict:
+    asgi_app = main_app
+    if workload.rate_limited:
+        # About a quarter of each customer's requests go over the limit
+        limit = max(1, requests // workload.customers * 3 // 4)
+        asgi_app = RateLimitMiddleware(
+            main_app, backend=RedisRateLimitBackend(),
+            policies={"/api/v1/employees": RateLimitPolicy(max_requests=limit, time_window_seconds=3600)},
+        )
+    weights = [weight for weight, _ in workload.mix]
+    builders = [builder for _, builder in workload.mix]
+    samples: List[float] = []
+    counts = {"errors": 0, "rejected": 0, "shed": 0}
+    remaining = requests
+
+    async with local_stack(rows):
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=asgi_app), base_url="http://bench") as client:
+            async def worker(worker_id: int):
+                nonlocal remaining
+                rng = random.Random(seed * 1000 + worker_id)
+                while remaining > 0:
+                    remaining -= 1
+                    method, path, kwargs = rng.choices(builders, weights)[0](rng)
+                    headers = {"X-Customer-ID": f"customer-{rng.randrange(workload.customers)}"}
+                    t_begin = time.perf_counter()
+                    response = await client.request(method, path, headers=headers, **kwargs)
+                    samples.append(time.perf_counter() - t_begin)
+                    if response.status_code == 429:
+                        counts["rejected"] += 1
+                    elif response.status_code == 503:
+                        counts["shed"] += 1
+                    elif response.status_code != 200 or response.json().get("status") != 1:
+                        counts["errors"] += 1
+
+            started = time.perf_counter()
+            await asyncio.gather(*[worker(i) for i in range(concurrency)])
+            elapsed = time.perf_counter() - started
+
+    return dict(summarize(workload.name, samples, elapsed), **counts)
+
+
+def median_run(runs: List[dict]) -> dict:
+    """
+    Median of each figure over repeated runs of one workload; a failed
+    request in any run is kept. `spread` holds, per checked metric, the
+    range between runs relative to the median.
+    """
+    result = dict(runs[0])
+    for metric in MEDIAN_METRICS:
+        result[metric] = statistics.median(run[metric] for run in runs)
+    result["errors"] = max(run["errors"] for run in runs)
+    result["spread"] = {
+        metric: (max(run[metric] for run in runs) - min(run[metric] for run in runs)) / result[metric]
+        if result[metric] else 0.0
+        for metric in CHECKED_METRICS
+    }
+    return result
+
+
+def compare(results: List[dict], baseline: dict, threshold: float) -> List[str]:
+    failures = []
+    for result in results:
+        if result["errors"]:
+            failures.append(f"{result['name']}: {result['errors']} failed requests")
+        base = baseline.get("results", {}).get(result["name"])
+        if base is None:
+            continue
+        for metric, direction in CHECKED_METRICS.items():
+            if not base.get(metric):
+                continue
+            change = (result[metric] - base[metric]) / base[metric]
+            # Noisier metrics get a band as wide as their baseline runs varied
+            tolerance = max(threshold, base.get("spread", {}).get(metric, 0.0))
+            status = "REGRESSED" if change * direction > tolerance else "ok"
+            print(f"{result['name']:<16} {metric:<12} {base[metric]:>10.3f} -> {result[metric]:>10.3f} "
+                  f"{change:>+8.1%}  {status}")
+            if status != "ok":
+                failures.append(f"{result['name']} {metric}: {base[metric]:.3f} -> {result[metric]:.3f} ({change:+.1%})")
+    return failures
+
+
+async def main(args) -> int:
+    silence_logging()
+    # Keep message formatting in the measured path, just discard the output
+    logger.add(lambda message: None, format="{message}", level="INFO")
+
+    available = workloads(args.rows)
+    config = {"requests": args.requests, "concurrency": args.concurrency, "rows": args.rows, "runs": args.runs}
+    results = []
+    for name in args.workload or list(available):
+        runs = [
+            await run_workload(available[name], args.requests, args.concurrency, args.rows, args.seed)
+            for _ in range(args.runs)
+        ]
+        results.append(median_run(runs))
+    print_report(results)
+    for result in results:
+        print(f"{result['name']}: {result['errors']} errors, {result['rejected']:g} rate limited, "
+              f"{result['shed']:g} shed")
+
+    if args.update_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump({"config": config, "results": {r["name"]: r for r in results}}, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    baseline: Optional[dict] = None
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    if baseline is None:
+        print(f"No baseline at {args.baseline}, run with --update-baseline to record one")
+        baseline = {}
+    elif baseline.get("config") != config:
+        print(f"Baseline was recorded with {baseline.get('config')}, not {config}: skipping comparison")
+        baseline = {}
+
+    failures = compare(results, baseline, args.threshold)
+    for failure in failures:
+        print(f"FAIL {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workload", action="append", choices=["read_heavy", "write_heavy", "rate_limited"])
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--threshold", type=float, default=0.25)
+    parser.add_argument("--update-baseline", action="store_true")
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,38 @@
+"""
+Token verification: get_current_user with every call running jwt.decode
+vs. with the verified claims cache, over a pool of distinct tokens.
+
+    python -m benchmarks.bench_token_cache [--iterations N] [--tokens N]
+"""
+import argparse
+import asyncio
+import itertools
+import app.core.security as security
+from app.core.security import create_access_token, get_current_user
+from app.core.token_cache import TokenCache
+from benchmarks.common import print_report, run_timed, silence_logging
+
+
+async def main(iterations: int, tokens: int):
+    silence_logging()
+    pool = itertools.cycle([create_access_token({"sub": f"user-{i}"}) for i in range(tokens)])
+
+    async def call():
+        await get_current_user(next(pool))
+
+    results = []
+    # max_size=0 evicts every entry as soon as it is stored
+    for name, cache in (("uncached (jwt.decode)", TokenCache(max_size=0)),
+                        ("cached", TokenCache(max_size=tokens))):
+        security.token_cache = cache
+        results.append(await run_timed(name, call, iterations))
+        print(f"{name}: {cache.stats()}")
+    print_report(results)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=20000)
+    parser.add_argument("--tokens", type=int, default=100)
+    args = parser.parse_args()
+    asyncio.run(main(args.iterations, args.tokens))
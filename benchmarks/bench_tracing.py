@@ -0,0 +1,102 @@
+"""
+Per request cost of call instrumentation over an API -> service ->
+repository chain with a session and a pydantic payload as arguments: the
+previous log_service_call (two log lines per call, arguments formatted
+eagerly) vs. traced spans, unsampled and sampled with the summary emitted.
+
+    python -m benchmarks.bench_tracing [--iterations N]
+"""
+import argparse
+import asyncio
+import functools
+import time
+from loguru import logger
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from app.core.global_define import ErrorResponse
+from app.core.tracing import end_trace, start_trace, traced
+from app.schemas.employee import EmployeeCreate
+from benchmarks.common import print_report, run_timed, silence_logging
+
+
+def log_service_call(service_name: str):
+    # Previous implementation, kept as the baseline
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            log = logger.bind(request_id=kwargs.get("request_id", ""))
+            t_begin = time.time()
+            log.info("Call {service}.{func} with input {args} {kwargs}", service=service_name, func=func.__name__, args=args, kwargs=kwargs)
+            try:
+                result = await func(*args, **kwargs)
+                log.info("Call completed: {service}.{func} in {time:.2f}s",
+                         service=service_name, func=func.__name__, time=time.time() - t_begin)
+                return result
+            except Exception:
+                return ErrorResponse.DEFAULT
+        return wrapper
+    return decorator
+
+
+def build_chain(decorate):
+    class Repository:
+        def __init__(self, db):
+            self.db = db
+
+        @decorate("Repository")
+        async def create(self, request_id: str, employee: EmployeeCreate):
+            return employee
+
+    class Service:
+        def __init__(self, repository):
+            self.repository = repository
+
+        @decorate("Service")
+        async def create(self, request_id: str, employee: EmployeeCreate):
+            return await self.repository.create(request_id=request_id, employee=employee)
+
+    @decorate("API")
+    async def endpoint(employee: EmployeeCreate, db: AsyncSession, request_id: str = ""):
+        return await Service(Repository(db)).create(request_id=request_id, employee=employee)
+
+    return endpoint
+
+
+async def main(iterations: int):
+    silence_logging()
+    # A sink that formats every record like the console one, then drops it
+    logger.add(lambda message: None, level="INFO",
+               format="{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | request_id={extra[request_id]} | {message}")
+    engine = create_async_engine("sqlite+aiosqlite://")
+    db = AsyncSession(engine)
+    employee = EmployeeCreate(name="Nguyen Van A", department="Engineering", role="Developer",
+                              type_of_working="Fulltime", hometown="Ha Noi", age=30)
+
+    results = []
+    for name, decorate, sampled in (("log_service_call", log_service_call, None),
+                                    ("traced, not sampled", traced, False),
+                                    ("traced, sampled", traced, True)):
+        endpoint = build_chain(decorate)
+
+        async def request():
+            if sampled is None:
+                await endpoint(employee, db, request_id="bench")
+                return
+            trace, token = start_trace("bench", sampled=sampled)
+            await endpoint(employee, db, request_id="bench")
+            end_trace(token)
+            if trace.sampled:
+                tree, spans = trace.summary()
+                logger.bind(request_id="bench", trace=spans).info("Request completed\n{tree}", tree=tree)
+
+        await run_timed("warm up", request, 200)
+        results.append(await run_timed(name, request, iterations))
+    print_report(results)
+    await db.close()
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=10000)
+    args = parser.parse_args()
+    asyncio.run(main(args.iterations))
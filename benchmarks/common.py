@@ -0,0 +1,73 @@
+import time
+from typing import Awaitable, Callable, List
+from loguru import logger
+
+
+def silence_logging():
+    # Benchmarks measure the code path, not stdout throughput
+    logger.remove()
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def summarize(name: str, samples: List[float], elapsed: float) -> dict:
+    return {
+        "name": name,
+        "count": len(samples),
+        "throughput": len(samples) / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(samples, 50) * 1000,
+        "p95_ms": percentile(samples, 95) * 1000,
+        "p99_ms": percentile(samples, 99) * 1000,
+    }
+
+
+def print_report(results: List[dict]):
+    print(f"{'name':<36} {'count':>8} {'ops/s':>12} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10}")
+    for r in results:
+        print(
+            f"{r['name']:<36} {r['count']:>8} {r['throughput']:>12.1f} "
+            f"{r['p50_ms']:>10.3f} {r['p95_ms']:>10.3f} {r['p99_ms']:>10.3f}"
+        )
+
+
+async def run_timed(name: str, func: Callable[[], Awaitable], iterations: int) -> dict:
+    samples = []
+    started = time.perf_counter()
+    for _ in range(iterations):
+        t_begin = time.perf_counter()
+        await func()
+        samples.append(time.perf_counter() - t_begin)
+    return summarize(name, samples, time.perf_counter() - started)
+
+
+def seed_employees_sqlite(path: str, rows: int, batch: int = 10000):
+    """
+    Create the schema in a SQLite file and fill the employees table.
+    """
+    import sqlite3
+    from sqlalchemy import create_engine
+    from app.db.base import Base
+    from app.models import employee  # noqa: F401 - registers the table
+
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    engine.dispose()
+
+    conn = sqlite3.connect(path)
+    for start in range(0, rows, batch):
+        conn.executemany(
+            "INSERT INTO employees (name, department, role, type_of_working, hometown, age, active, t_create) "
+            "VALUES (?, ?, ?, ?, ?, ?, 1, CURRENT_TIMESTAMP)",
+            [
+                (f"Employee {i:07d}", f"Department {i % 50}", "Developer", "Fulltime", f"Hometown {i % 63}", 20 + i % 40)
+                for i in range(start, min(start + batch, rows))
+            ],
+        )
+    conn.commit()
+    conn.close()
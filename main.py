@@ -1,9 +1,21 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.api.v1.router import api_router
-from app.core.logging import setup_logging, RequestLoggingMiddleware
+from app.core.logging import setup_logging, shutdown_logging, RequestLoggingMiddleware
+from app.core.metrics import exporter as metrics_exporter
+from app.middleware.concurrency import ConcurrencyLimitMiddleware
+from app.middleware.deadline import DeadlineMiddleware
+from app.middleware.metrics import MetricsMiddleware
+from app.middleware.profiling import ProfilingMiddleware
 from app.db.base import Base
-from app.db.session import engine
+from app.db.session import engine, replica_router
+from app.db.redis import redis_client
+from app.core.redis_scripts import load_rate_limit_scripts
+from app.core.security import password_pool
+from app.core.config import settings
+from app.services.hybrid_rate_limit import hybrid_rate_limiter
+from app.services.employee import employee_cache
+from loguru import logger
 
 
 app = FastAPI(
@@ -23,7 +35,18 @@ app.add_middleware(
 
 # Setup logging
 setup_logging()
+# Inside the logging middleware, so profiles carry the request_id
+app.add_middleware(ProfilingMiddleware)
 app.add_middleware(RequestLoggingMiddleware)
+# Shed load before any per request work, but still count it in the metrics
+app.add_middleware(ConcurrencyLimitMiddleware)
+# The budget starts on arrival, so time queued for a slot counts against it
+app.add_middleware(DeadlineMiddleware, budgets={
+    "/api/v1/employees/bulk-": settings.BULK_REQUEST_DEADLINE_MS / 1000,
+    "/api/v1/employees/export": None,
+})
+# Outermost, so request latency includes the logging middleware
+app.add_middleware(MetricsMiddleware)
 
 # Include API routes
 app.include_router(api_router, prefix="/api/v1")
@@ -34,11 +57,32 @@ async def startup():
     # Create database tables
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+    await replica_router.check_health()
+
+    # Create the shared Redis pool and register the rate limit scripts
+    redis_client.connect()
+    try:
+        await load_rate_limit_scripts(redis_client.redis)
+    except Exception as e:
+        logger.bind(request_id="startup").warning("Could not preload Redis scripts: {error}", error=str(e))
+
+    # Drop L1 cache entries invalidated by other workers
+    await employee_cache.start()
+
+    # Share this worker's metrics with the others
+    await metrics_exporter.start()
 
 
 @app.on_event("shutdown")
 async def shutdown():
+    await hybrid_rate_limiter.stop()
+    await employee_cache.stop()
+    await metrics_exporter.stop()
+    await redis_client.close()
+    await replica_router.dispose()
     await engine.dispose()
+    password_pool.shutdown()
+    shutdown_logging()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,56 @@
+import fakeredis
+import pytest
+import pytest_asyncio
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from app.db.base import Base
+from app.core.cache import LRUCache
+from app.db.redis import RedisClient
+from app.core.versioning import table_versions
+from app.core.metrics import exporter as metrics_exporter
+from app.models.employee import Employee
+from app.services.employee import employee_cache
+
+
+@pytest.fixture(autouse=True)
+def fake_cache_redis(monkeypatch):
+    # Keep the employee cache, table versions and metrics off a real Redis
+    client = RedisClient()
+    client._redis = fakeredis.FakeAsyncRedis(decode_responses=True)
+    monkeypatch.setattr(employee_cache, "_redis", client)
+    monkeypatch.setattr(table_versions, "_redis", client)
+    monkeypatch.setattr(metrics_exporter, "_redis", client)
+    monkeypatch.setattr(employee_cache, "l1", LRUCache(employee_cache.l1.max_size, employee_cache.l1.ttl))
+    monkeypatch.setattr(employee_cache, "_generations", LRUCache(employee_cache.l1.max_size, employee_cache.tombstone_ttl))
+    monkeypatch.setattr(employee_cache, "_unpublished", set())
+    return client
+
+
+@pytest_asyncio.fixture
+async def sqlite_engine(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/test.db")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield engine
+    await engine.dispose()
+
+
+@pytest_asyncio.fixture
+async def db_session(sqlite_engine):
+    session_factory = sessionmaker(sqlite_engine, class_=AsyncSession, expire_on_commit=False)
+    async with session_factory() as session:
+        yield session
+
+
+def make_employee(i: int, **overrides) -> Employee:
+    values = dict(
+        name=f"Employee {i:05d}",
+        department="Engineering",
+        role="Developer",
+        type_of_working="Fulltime",
+        hometown="Ha Noi",
+        age=20 + i % 40,
+        active=1,
+    )
+    values.update(overrides)
+    return Employee(**values)
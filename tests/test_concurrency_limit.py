@@ -0,0 +1,175 @@
+import asyncio
+import time
+import httpx
+import orjson
+import pytest
+from fastapi import FastAPI
+from app.core.concurrency import AdaptiveLimiter
+from app.core.global_define import SystemMessages
+from app.middleware.concurrency import ConcurrencyLimitMiddleware
+
+
+class SlowDatabase:
+    """
+    A pool of `size` connections whose queries take `delay` seconds.
+    """
+
+    def __init__(self, size: int, delay: float):
+        self.pool = asyncio.Semaphore(size)
+        self.delay = delay
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def query(self):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            async with self.pool:
+                await asyncio.sleep(self.delay)
+        finally:
+            self.in_flight -= 1
+
+
+def build_app(db: SlowDatabase, limiter: AdaptiveLimiter) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/employees")
+    async def employees():
+        await db.query()
+        return {"status": 1}
+
+    @app.get("/api/v1/employees/export")
+    async def export():
+        await asyncio.sleep(0.05)
+        return {"status": 1}
+
+    @app.get("/api/v1/employees/bulk-create")
+    async def bulk_create():
+        await asyncio.sleep(0.05)
+        return {"status": 1}
+
+    app.add_middleware(ConcurrencyLimitMiddleware, limiter=limiter)
+    return app
+
+
+async def timed_get(client: httpx.AsyncClient, path: str):
+    t_begin = time.perf_counter()
+    response = await client.get(path)
+    return response, time.perf_counter() - t_begin
+
+
+@pytest.mark.asyncio
+async def test_slow_database_sheds_load_with_bounded_latency():
+    # Arrange
+    db = SlowDatabase(size=4, delay=0.002)
+    limiter = AdaptiveLimiter(initial_limit=20, min_limit=2, queue_size=5, queue_timeout=0.05)
+    transport = httpx.ASGITransport(app=build_app(db, limiter))
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        for _ in range(30):
+            await client.get("/employees")
+
+        # Act
+        db.delay = 0.1
+        results = await asyncio.gather(*(timed_get(client, "/employees") for _ in range(100)))
+
+    # Assert
+    served = [elapsed for response, elapsed in results if response.status_code == 200]
+    shed = [(response, elapsed) for response, elapsed in results if response.status_code == 503]
+    assert served and shed
+    assert len(served) + len(shed) == 100
+    assert db.max_in_flight <= 20
+    # Without the limiter the last of 100 requests would wait 25 rounds of 0.1s
+    assert max(served) < 1.0
+    assert max(elapsed for _, elapsed in shed) < 0.5
+    assert shed[0][0].content == orjson.dumps(SystemMessages.SYSTEM_BUSY.model_dump())
+    assert shed[0][0].headers["Retry-After"] == "1"
+    assert limiter.limit < 20
+    assert limiter.in_flight == 0 and limiter.queued == 0
+
+
+@pytest.mark.asyncio
+async def test_queued_requests_run_in_order_or_time_out():
+    # Arrange
+    limiter = AdaptiveLimiter(initial_limit=1, min_limit=1, queue_size=2, queue_timeout=0.05)
+    assert await limiter.acquire()
+    started = time.perf_counter()
+
+    # Act
+    first = asyncio.create_task(limiter.acquire())
+    second = asyncio.create_task(limiter.acquire())
+    await asyncio.sleep(0)
+    full = await limiter.acquire()
+    limiter.release(started)
+    granted = await first
+    timed_out = await second
+
+    # Assert
+    assert full is False and granted is True and timed_out is False
+    assert limiter.rejected == {"queue_full": 1, "queue_timeout": 1}
+    assert limiter.in_flight == 1 and limiter.queued == 0
+
+
+@pytest.mark.asyncio
+async def test_limit_grows_back_when_latency_recovers():
+    # Arrange
+    limiter = AdaptiveLimiter(initial_limit=4, min_limit=1, max_limit=8)
+    limiter.limit = 2.0
+
+    # Act: requests that each took 10ms
+    for _ in range(50):
+        assert await limiter.acquire()
+        assert await limiter.acquire()
+        started = time.perf_counter() - 0.01
+        limiter.release(started)
+        limiter.release(started)
+
+    # Assert
+    assert limiter.limit > 4
+
+
+@pytest.mark.asyncio
+async def test_limit_stays_cut_while_latency_stays_high(monkeypatch):
+    # Arrange
+    clock = [0.0]
+    monkeypatch.setattr("app.core.concurrency.time.perf_counter", lambda: clock[0])
+    limiter = AdaptiveLimiter(initial_limit=4, min_limit=1, max_limit=200)
+
+    async def full_round(latency: float):
+        # Every slot taken, and all of them complete after `latency`
+        held = int(limiter.limit)
+        for _ in range(held):
+            assert await limiter.acquire()
+        started = clock[0]
+        clock[0] += latency
+        for _ in range(held):
+            limiter.release(started)
+
+    for _ in range(20):
+        await full_round(0.01)
+
+    # Act: the database slows down tenfold and stays slow
+    for _ in range(2000):
+        await full_round(0.1)
+
+    # Assert
+    assert limiter.baseline < 0.02
+    assert limiter.latency > 0.09
+    assert limiter.limit < 4
+
+
+@pytest.mark.asyncio
+async def test_long_running_routes_do_not_skew_the_limit():
+    # Arrange
+    limiter = AdaptiveLimiter(initial_limit=2, min_limit=1, queue_size=0)
+    limiter.baseline = 0.001
+    transport = httpx.ASGITransport(app=build_app(SlowDatabase(size=4, delay=0), limiter))
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        # Act
+        exports = await asyncio.gather(*(client.get("/api/v1/employees/export") for _ in range(5)))
+        bulk = await client.get("/api/v1/employees/bulk-create")
+
+    # Assert
+    assert [response.status_code for response in exports] == [200] * 5
+    assert bulk.status_code == 200
+    assert limiter.accepted == 1
+    assert limiter.baseline == 0.001 and limiter.limit == 2
@@ -0,0 +1,142 @@
+import asyncio
+import time
+import fakeredis
+import httpx
+import orjson
+import pytest
+import pytest_asyncio
+from fastapi import FastAPI
+from sqlalchemy import event, select
+from sqlalchemy.dialects import mysql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+import app.db.session as session_module
+from app.api.v1.router import api_router
+from app.core.deadline import DeadlineExceeded, deadline_scope, end_deadline, remaining, start_deadline
+from app.core.global_define import SystemMessages
+from app.core.logging import RequestLoggingMiddleware
+from app.core.versioning import TableVersions
+from app.db.base import Base
+from app.db.redis import InstrumentedRedis, RedisClient
+from app.db.statement_timeout import limit_execution_time
+from app.middleware.deadline import DeadlineMiddleware
+from app.models.employee import Employee
+from tests.conftest import make_employee
+
+DB_FAILED = orjson.dumps(SystemMessages.DB_FAILED.model_dump())
+
+
+def build_app(budget: float) -> FastAPI:
+    app = FastAPI()
+    app.include_router(api_router, prefix="/api/v1")
+    app.add_middleware(DeadlineMiddleware, default=budget, budgets={"/api/v1/employees/export": None})
+    app.add_middleware(RequestLoggingMiddleware)
+    return app
+
+
+@pytest_asyncio.fixture
+async def small_pool_engine(tmp_path, monkeypatch):
+    # One connection and the usual long pool timeout
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path}/test.db", poolclass=AsyncAdaptedQueuePool, pool_size=1, max_overflow=0, pool_timeout=30
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with factory() as db:
+        db.add_all([make_employee(i) for i in range(3)])
+        await db.commit()
+    monkeypatch.setattr(session_module, "AsyncSessionLocal", factory)
+    yield engine
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_exhausted_pool_returns_db_failed_at_the_deadline(small_pool_engine):
+    # Arrange
+    app = build_app(budget=0.1)
+    held = await small_pool_engine.connect()
+
+    # Act
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        t_begin = time.perf_counter()
+        response = await client.post("/api/v1/employees/get/1")
+        elapsed = time.perf_counter() - t_begin
+        await held.close()
+        recovered = await client.post("/api/v1/employees/get/1")
+
+    # Assert
+    assert response.content == DB_FAILED
+    assert elapsed < 1.0
+    assert recovered.json()["status"] == 1
+
+
+@pytest.mark.asyncio
+async def test_slow_query_is_cancelled(small_pool_engine):
+    # Arrange
+    @event.listens_for(small_pool_engine.sync_engine, "connect")
+    def add_pause(dbapi_connection, connection_record):
+        dbapi_connection.create_function("pause", 1, time.sleep)
+
+    @event.listens_for(small_pool_engine.sync_engine, "before_cursor_execute", retval=True)
+    def slow_selects(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("SELECT"):
+            statement = f"SELECT * FROM ({statement}) WHERE pause(0.5) IS NULL"
+        return statement, parameters
+
+    await small_pool_engine.dispose()
+    app = build_app(budget=0.1)
+
+    # Act
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.post("/api/v1/employees/get-list")
+        event.remove(small_pool_engine.sync_engine, "before_cursor_execute", slow_selects)
+        recovered = await client.post("/api/v1/employees/get-list")
+
+    # Assert
+    assert response.content == DB_FAILED
+    # The cancelled connection was thrown away, not returned to the pool
+    assert len(recovered.json()["detail"]) == 3
+
+
+@pytest.mark.asyncio
+async def test_deadline_scope_and_statement_hint():
+    # Arrange
+    token = start_deadline(0.05)
+
+    # Act
+    left = remaining()
+    with pytest.raises(TimeoutError):
+        async with deadline_scope():
+            await asyncio.sleep(1)
+    with pytest.raises(DeadlineExceeded):
+        deadline_scope()
+    end_deadline(token)
+    statement = limit_execution_time(select(Employee.id), 2.345)
+
+    # Assert
+    assert 0 < left <= 0.05
+    assert remaining() is None
+    assert str(statement.compile(dialect=mysql.dialect())).startswith("SELECT /*+ MAX_EXECUTION_TIME(2300) */ ")
+    assert "MAX_EXECUTION_TIME" not in str(statement.compile(dialect=sqlite.dialect()))
+
+
+@pytest.mark.asyncio
+async def test_after_commit_redis_calls_ignore_the_deadline(db_session):
+    # Arrange
+    client = RedisClient()
+    client._redis = InstrumentedRedis(connection_pool=fakeredis.FakeAsyncRedis(decode_responses=True).connection_pool)
+    versions = TableVersions(redis=client)
+    token = start_deadline(0.01)
+    db_session.add(make_employee(1))
+    versions.bump_on_commit(db_session, "employees")
+
+    # Act
+    await asyncio.sleep(0.02)
+    await db_session.commit()
+    end_deadline(token)
+    await asyncio.sleep(0.01)
+
+    # Assert
+    assert await versions.get("employees") == 1
@@ -0,0 +1,66 @@
+import pytest
+from sqlalchemy import func, select
+from app.models.employee import Employee
+from app.repositories.employee import EmployeeRepository
+from app.services.employee import EmployeeService
+
+
+def payload(i: int, **overrides) -> dict:
+    item = dict(
+        name=f"Employee {i:05d}", department="Engineering", role="Developer",
+        type_of_working="Fulltime", hometown="Ha Noi", age=30,
+    )
+    item.update(overrides)
+    return item
+
+
+@pytest.mark.asyncio
+async def test_bulk_create_batches_and_reports_invalid_items(db_session):
+    # Arrange
+    service = EmployeeService(EmployeeRepository(db_session), "test")
+    items = [payload(i) for i in range(25)]
+    items[3]["age"] = 500
+    items[10].pop("name")
+
+    # Act
+    response = await service.bulk_create_employees(request_id="test", employees=items, batch_size=10)
+
+    # Assert
+    assert response.detail.created == 23
+    assert [error.index for error in response.detail.errors] == [3, 10]
+    assert await db_session.scalar(select(func.count(Employee.id))) == 23
+
+
+@pytest.mark.asyncio
+async def test_bulk_upsert_inserts_and_updates(db_session):
+    # Arrange
+    service = EmployeeService(EmployeeRepository(db_session), "test")
+    await service.bulk_create_employees(request_id="test", employees=[payload(i) for i in range(5)])
+    items = [payload(i, id=i + 1, role="Manager") for i in range(3)] + [payload(9, id=100), payload(9, id=100)]
+
+    # Act
+    response = await service.bulk_upsert_employees(request_id="test", employees=items, batch_size=2)
+
+    # Assert
+    assert (response.detail.created, response.detail.updated, response.detail.failed) == (1, 3, 1)
+    assert response.detail.errors[0].index == 4
+    roles = (await db_session.execute(select(Employee.id, Employee.role).order_by(Employee.id))).all()
+    assert roles == [(1, "Manager"), (2, "Manager"), (3, "Manager"), (4, "Developer"), (5, "Developer"), (100, "Developer")]
+
+
+@pytest.mark.asyncio
+async def test_bulk_upsert_fallback_without_native_upsert(db_session, monkeypatch):
+    # Arrange
+    repository = EmployeeRepository(db_session)
+    monkeypatch.setattr(repository, "_upsert_statement", lambda rows: None)
+    service = EmployeeService(repository, "test")
+    await service.bulk_create_employees(request_id="test", employees=[payload(0)])
+
+    # Act
+    response = await service.bulk_upsert_employees(
+        request_id="test", employees=[payload(0, id=1, age=41), payload(1, id=7)]
+    )
+
+    # Assert
+    assert (response.detail.created, response.detail.updated) == (1, 1)
+    assert await db_session.scalar(select(Employee.age).where(Employee.id == 1)) == 41
@@ -0,0 +1,262 @@
+import asyncio
+import fakeredis
+import httpx
+import pytest
+import pytest_asyncio
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+import app.db.session as session_module
+from app.core.cache import LRUCache, TwoTierCache
+from app.db.redis import RedisClient
+from app.services.employee import employee_cache
+from main import app
+
+
+def fake_redis_client(server: fakeredis.FakeServer) -> RedisClient:
+    client = RedisClient()
+    client._redis = fakeredis.FakeAsyncRedis(server=server, decode_responses=True)
+    return client
+
+
+class BrokenRedisClient(RedisClient):
+    async def get(self, key):
+        raise ConnectionError("redis is down")
+
+    async def set(self, key, value, expire=None, only_if_absent=False):
+        raise ConnectionError("redis is down")
+
+
+@pytest.fixture
+def server():
+    return fakeredis.FakeServer()
+
+
+@pytest.fixture
+def cache(server, monkeypatch):
+    # Fresh state on the app's cache instance, backed by fake Redis
+    monkeypatch.setattr(employee_cache, "_redis", fake_redis_client(server))
+    monkeypatch.setattr(employee_cache, "l1", LRUCache(100, 30))
+    for counter in ("l1_hits", "l2_hits", "misses", "invalidations", "l2_errors"):
+        monkeypatch.setattr(employee_cache, counter, 0)
+    return employee_cache
+
+
+@pytest_asyncio.fixture
+async def client(sqlite_engine, cache, monkeypatch):
+    factory = sessionmaker(sqlite_engine, class_=AsyncSession, expire_on_commit=False)
+    monkeypatch.setattr(session_module, "AsyncSessionLocal", factory)
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+
+
+@pytest.fixture
+def selects(sqlite_engine):
+    statements = []
+
+    def on_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append(statement)
+
+    event.listen(sqlite_engine.sync_engine, "before_cursor_execute", on_execute)
+    return statements
+
+
+EMPLOYEE = dict(name="Nguyen Van A", department="Engineering", role="Developer",
+                type_of_working="Fulltime", hometown="Ha Noi", age=30)
+
+
+def test_lru_evicts_least_recently_used():
+    # Arrange
+    lru = LRUCache(max_size=2, ttl=30)
+    lru.set(1, "a")
+    lru.set(2, "b")
+    lru.get(1)
+
+    # Act
+    lru.set(3, "c")
+
+    # Assert
+    assert lru.get(2) is None
+    assert lru.get(1) == "a"
+    assert lru.get(3) == "c"
+    assert lru.evictions == 1
+
+
+@pytest.mark.asyncio
+async def test_lru_entries_expire():
+    # Arrange
+    lru = LRUCache(max_size=10, ttl=0.01)
+    lru.set(1, "a")
+
+    # Act
+    await asyncio.sleep(0.02)
+
+    # Assert
+    assert lru.get(1) is None
+    assert lru.expirations == 1
+    assert len(lru) == 0
+
+
+@pytest.mark.asyncio
+async def test_read_through_l1_then_l2(server):
+    # Arrange
+    cache = TwoTierCache("test", redis=fake_redis_client(server))
+    await cache.set(1, {"id": 1})
+
+    # Act
+    from_l1 = await cache.get(1)
+    cache.l1.clear()
+    from_l2 = await cache.get(1)
+    missing = await cache.get(2)
+
+    # Assert
+    assert from_l1 == from_l2 == {"id": 1}
+    assert missing is None
+    assert cache.stats()["l1_hits"] == 1
+    assert cache.stats()["l2_hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+@pytest.mark.asyncio
+async def test_invalidation_is_broadcast_to_other_workers(server):
+    # Arrange
+    worker_a = TwoTierCache("test", redis=fake_redis_client(server))
+    worker_b = TwoTierCache("test", redis=fake_redis_client(server))
+    await worker_b.start()
+    await asyncio.sleep(0.05)
+    await worker_a.set(1, {"id": 1})
+    await worker_b.get(1)
+    assert worker_b.l1.get(1) is not None
+
+    # Act
+    await worker_a.invalidate([1])
+    for _ in range(50):
+        if worker_b.l1.get(1) is None:
+            break
+        await asyncio.sleep(0.01)
+
+    # Assert
+    assert worker_b.l1.get(1) is None
+    assert await worker_b.get(1) is None
+    await worker_b.stop()
+
+
+@pytest.mark.asyncio
+async def test_read_racing_an_invalidation_is_not_cached(server):
+    # Arrange
+    worker_a = TwoTierCache("test", redis=fake_redis_client(server))
+    worker_b = TwoTierCache("test", redis=fake_redis_client(server))
+    generation = worker_a.generation(1)
+    assert await worker_a.get(1) is None
+
+    # Act: the write commits while the old row is being loaded
+    await worker_a.invalidate([1])
+    await worker_a.set(1, {"id": 1, "age": 30}, generation=generation)
+    await worker_b.set(1, {"id": 1, "age": 30})
+    worker_b.l1.clear()
+
+    # Assert
+    assert await worker_a.get(1) is None
+    assert await worker_b.get(1) is None
+
+
+@pytest.mark.asyncio
+async def test_invalidation_during_redis_outage_is_retried(server):
+    # Arrange
+    cache = TwoTierCache("test", redis=fake_redis_client(server), l2_retry_after=0.01)
+    await cache.set(1, {"id": 1})
+    cache._l2_down_until = float("inf")
+
+    # Act
+    await cache.invalidate([1])
+    cache.l1.clear()
+    during_outage = await cache.get(1)
+    cache._l2_down_until = 0.0
+    await asyncio.sleep(0.05)
+
+    # Assert
+    assert during_outage is None
+    assert cache.stats()["unpublished_invalidations"] == 0
+    assert await cache.get(1) is None
+
+
+@pytest.mark.asyncio
+async def test_redis_failure_falls_back_to_caller():
+    # Arrange
+    cache = TwoTierCache("test", redis=BrokenRedisClient(), l2_retry_after=60)
+
+    # Act
+    await cache.set(1, {"id": 1})
+    cache.l1.clear()
+    first = await cache.get(1)
+    second = await cache.get(1)
+
+    # Assert
+    assert first is None and second is None
+    # L2 is skipped after the first failure instead of erroring on every call
+    assert cache.stats()["l2_errors"] == 1
+
+
+@pytest.mark.asyncio
+async def test_get_employee_hit_skips_database(client, selects):
+    # Arrange
+    await client.post("/api/v1/employees/create", json=EMPLOYEE)
+    selects.clear()
+
+    # Act
+    first = await client.post("/api/v1/employees/get/1")
+    second = await client.post("/api/v1/employees/get/1")
+
+    # Assert
+    assert first.json() == second.json()
+    assert second.json()["detail"]["name"] == EMPLOYEE["name"]
+    assert len(selects) == 1
+    assert employee_cache.stats()["l1_hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_update_invalidates_cached_employee(client, server, cache):
+    # Arrange
+    await client.post("/api/v1/employees/create", json=EMPLOYEE)
+    await client.post("/api/v1/employees/get/1")
+
+    # Act
+    await client.post("/api/v1/employees/update/1", json={"id": 1, "age": 31})
+    await asyncio.sleep(0.01)
+    response = await client.post("/api/v1/employees/get/1")
+
+    # Assert
+    assert response.json()["detail"]["age"] == 31
+    assert cache.stats()["invalidations"] >= 1
+
+
+@pytest.mark.asyncio
+async def test_rollback_discards_pending_invalidation(db_session, cache):
+    # Arrange
+    await cache.set(1, {"id": 1})
+
+    # Act
+    await db_session.execute(text("SELECT 1"))
+    cache.invalidate_on_commit(db_session, [1])
+    await db_session.rollback()
+    await db_session.execute(text("SELECT 1"))
+    await db_session.commit()
+
+    # Assert
+    assert await cache.get(1) == {"id": 1}
+
+
+@pytest.mark.asyncio
+async def test_commit_applies_pending_invalidation(db_session, cache):
+    # Arrange
+    await cache.set(1, {"id": 1})
+    await db_session.execute(text("SELECT 1"))
+
+    # Act
+    cache.invalidate_on_commit(db_session, [1])
+    await db_session.commit()
+    await asyncio.sleep(0.01)
+
+    # Assert
+    assert await cache.get(1) is None
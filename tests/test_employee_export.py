@@ -0,0 +1,80 @@
+import csv
+import io
+import json
+import os
+import sqlite3
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+from app.repositories.employee import EmployeeRepository
+from app.services.employee import EmployeeService
+from tests.conftest import make_employee
+
+
+def current_rss() -> int:
+    with open("/proc/self/statm") as statm:
+        return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+async def export(db_session, format, batch_size=1000):
+    service = EmployeeService(EmployeeRepository(db_session), "test")
+    return b"".join([chunk async for chunk in service.export_employees(request_id="test", format=format, batch_size=batch_size)])
+
+
+@pytest.mark.asyncio
+async def test_export_ndjson(db_session):
+    # Arrange
+    db_session.add_all([make_employee(i) for i in range(5)])
+    await db_session.commit()
+
+    # Act
+    body = await export(db_session, "ndjson", batch_size=2)
+
+    # Assert
+    rows = [json.loads(line) for line in body.decode().splitlines()]
+    assert [row["id"] for row in rows] == [1, 2, 3, 4, 5]
+    assert rows[0]["name"] == "Employee 00000"
+
+
+@pytest.mark.asyncio
+async def test_export_csv(db_session):
+    # Arrange
+    db_session.add_all([make_employee(i, hometown="Da Nang, VN") for i in range(3)])
+    await db_session.commit()
+
+    # Act
+    body = await export(db_session, "csv")
+
+    # Assert
+    rows = list(csv.reader(io.StringIO(body.decode())))
+    assert rows[0][:2] == ["id", "name"]
+    assert len(rows) == 4
+    assert rows[1][5] == "Da Nang, VN"
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(not os.path.exists("/proc/self/statm"), reason="needs /proc to sample RSS")
+async def test_export_memory_is_constant_for_million_rows(sqlite_engine, tmp_path):
+    # Arrange
+    rows = 1_000_000
+    conn = sqlite3.connect(tmp_path / "test.db")
+    conn.executemany(
+        "INSERT INTO employees (name, department, role, type_of_working, hometown, age, active) VALUES (?, ?, ?, ?, ?, ?, 1)",
+        ((f"Employee {i:07d}", "Engineering", "Developer", "Fulltime", "Ha Noi", 30) for i in range(rows)),
+    )
+    conn.commit()
+    conn.close()
+    session_factory = sessionmaker(sqlite_engine, class_=AsyncSession, expire_on_commit=False)
+
+    # Act
+    exported_lines = 0
+    async with session_factory() as db:
+        service = EmployeeService(EmployeeRepository(db), "test")
+        baseline = peak = current_rss()
+        async for chunk in service.export_employees(request_id="test", format="ndjson", batch_size=2000):
+            exported_lines += chunk.count(b"\n")
+            peak = max(peak, current_rss())
+
+    # Assert: the full export is ~150 MB, the stream must hold only a few batches
+    assert exported_lines == rows
+    assert peak - baseline < 32 * 1024 * 1024
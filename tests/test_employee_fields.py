@@ -0,0 +1,108 @@
+import httpx
+import pytest
+import pytest_asyncio
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+import app.db.session as session_module
+from app.core.global_define import SystemMessages
+from main import app
+from tests.conftest import make_employee
+
+
+@pytest_asyncio.fixture
+async def client(sqlite_engine, monkeypatch):
+    factory = sessionmaker(sqlite_engine, class_=AsyncSession, expire_on_commit=False)
+    monkeypatch.setattr(session_module, "AsyncSessionLocal", factory)
+    async with factory() as db:
+        db.add_all([make_employee(i, age=30 + i % 3) for i in range(25)])
+        await db.commit()
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+
+
+@pytest.fixture
+def selects(sqlite_engine):
+    captured = []
+
+    def on_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            captured.append(statement)
+
+    event.listen(sqlite_engine.sync_engine, "before_cursor_execute", on_execute)
+    return captured
+
+
+@pytest.mark.asyncio
+async def test_list_returns_only_requested_fields(client, selects):
+    # Act
+    response = await client.post("/api/v1/employees/get-list", params={"fields": "name,id", "limit": 5})
+
+    # Assert
+    detail = response.json()["detail"]
+    assert detail[0] == {"id": 1, "name": "Employee 00000"}
+    assert len(detail) == 5
+    assert "department" not in selects[0] and "hometown" not in selects[0]
+
+
+@pytest.mark.asyncio
+async def test_keyset_pages_with_fields_outside_cursor(client):
+    # Arrange
+    params = {"pagination": "keyset", "sort_by": "age", "fields": "name", "limit": 10}
+
+    # Act
+    first = (await client.post("/api/v1/employees/get-list", params=params)).json()
+    second = (await client.post("/api/v1/employees/get-list", params={**params, "cursor": first["next_cursor"]})).json()
+
+    # Assert
+    assert set(first["detail"][0]) == {"name"}
+    assert first["next_cursor"] and second["next_cursor"]
+    names = [employee["name"] for employee in first["detail"] + second["detail"]]
+    assert len(set(names)) == 20
+
+
+@pytest.mark.asyncio
+async def test_get_returns_only_requested_fields(client, selects):
+    # Act
+    projected = await client.post("/api/v1/employees/get/2", params={"fields": "id,age"})
+    full = await client.post("/api/v1/employees/get/2")
+    # Served from the cache filled by the full read
+    cached = await client.post("/api/v1/employees/get/2", params={"fields": "name"})
+
+    # Assert
+    assert projected.json()["detail"] == {"id": 2, "age": 31}
+    assert len(full.json()["detail"]) == 8
+    assert cached.json()["detail"] == {"name": "Employee 00001"}
+    assert "department" not in selects[0]
+    assert len(selects) == 2
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("fields", ["password", "id,t_create", ","])
+async def test_invalid_fields_rejected(client, fields):
+    # Act
+    listed = await client.post("/api/v1/employees/get-list", params={"fields": fields})
+    single = await client.post("/api/v1/employees/get/1", params={"fields": fields})
+
+    # Assert
+    assert listed.json() == SystemMessages.WRONG_PARAMS.model_dump()
+    assert single.json() == SystemMessages.WRONG_PARAMS.model_dump()
+
+
+@pytest.mark.asyncio
+async def test_list_rejects_out_of_range_limit(client):
+    # Act
+    responses = [
+        await client.post("/api/v1/employees/get-list", params=params)
+        for params in (
+            {"limit": 0},
+            {"limit": -1},
+            {"limit": 1001},
+            {"skip": -1},
+            {"pagination": "keyset", "limit": 0},
+            {"pagination": "keyset", "limit": -1},
+        )
+    ]
+
+    # Assert
+    assert [response.json() for response in responses] == [SystemMessages.WRONG_PARAMS.model_dump()] * 6
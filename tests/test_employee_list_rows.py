@@ -0,0 +1,66 @@
+from datetime import datetime, timedelta
+import pytest
+import pytest_asyncio
+from sqlalchemy import event
+from app.repositories.employee import EmployeeRepository
+from app.schemas.employee import EmployeeResponse
+from app.services.employee import EmployeeService
+from tests.conftest import make_employee
+
+
+@pytest_asyncio.fixture
+async def seeded_session(db_session):
+    db_session.add_all([make_employee(i, t_create=datetime(2024, 1, 1) + timedelta(minutes=i)) for i in range(30)])
+    await db_session.commit()
+    return db_session
+
+
+@pytest.fixture
+def statements(sqlite_engine):
+    captured = []
+    event.listen(
+        sqlite_engine.sync_engine, "before_cursor_execute",
+        lambda conn, cursor, statement, *args: captured.append(statement)
+    )
+    return captured
+
+
+@pytest.mark.asyncio
+async def test_list_matches_per_row_orm_path(seeded_session):
+    # Arrange
+    service = EmployeeService(EmployeeRepository(seeded_session), "test")
+    orm_rows = await EmployeeRepository(seeded_session).get_all(request_id="test", skip=5, limit=10)
+
+    # Act
+    response = await service.get_employees(request_id="test", skip=5, limit=10)
+
+    # Assert
+    assert response.detail == [EmployeeResponse.model_validate(employee) for employee in orm_rows]
+    assert all(isinstance(employee, EmployeeResponse) for employee in response.detail)
+
+
+@pytest.mark.asyncio
+async def test_list_selects_only_response_columns(seeded_session, statements):
+    # Arrange
+    service = EmployeeService(EmployeeRepository(seeded_session), "test")
+
+    # Act
+    await service.get_employees(request_id="test", limit=10)
+
+    # Assert
+    assert len(statements) == 1
+    assert "t_create" not in statements[0]
+
+
+@pytest.mark.asyncio
+async def test_keyset_sort_by_column_outside_response(seeded_session):
+    # Arrange
+    service = EmployeeService(EmployeeRepository(seeded_session), "test")
+
+    # Act
+    first = await service.get_employees_page(request_id="test", limit=20, sort_by="t_create")
+    second = await service.get_employees_page(request_id="test", limit=20, sort_by="t_create", cursor=first.next_cursor)
+
+    # Assert
+    assert [employee.id for employee in first.detail + second.detail] == list(range(1, 31))
+    assert "t_create" not in first.detail[0].model_dump()
@@ -0,0 +1,176 @@
+import asyncio
+import pytest
+import pytest_asyncio
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.dataloader import DataLoader
+from app.core.deadline import deadline_scope, end_deadline, start_deadline
+from app.core.sql_logging import get_request_id, set_request_id
+from app.repositories.employee import EmployeeRepository, employee_loader
+from app.schemas.employee import EmployeeCreate
+from tests.conftest import make_employee
+
+
+@pytest_asyncio.fixture
+async def seeded_engine(sqlite_engine):
+    async with AsyncSession(sqlite_engine) as db:
+        db.add_all([make_employee(i) for i in range(100)])
+        await db.commit()
+    return sqlite_engine
+
+
+@pytest.fixture
+def selects(sqlite_engine):
+    statements = []
+
+    def on_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append(statement)
+
+    event.listen(sqlite_engine.sync_engine, "before_cursor_execute", on_execute)
+    return statements
+
+
+async def lookup(engine, employee_id: int):
+    async with AsyncSession(engine, expire_on_commit=False) as db:
+        return await EmployeeRepository(db).get_by_id(request_id="test", employee_id=employee_id)
+
+
+@pytest.mark.asyncio
+async def test_thousand_concurrent_lookups_use_few_queries(seeded_engine, selects):
+    # Arrange
+    ids = [i % 100 + 1 for i in range(1000)]
+
+    # Act
+    employees = await asyncio.gather(*[lookup(seeded_engine, employee_id) for employee_id in ids])
+
+    # Assert
+    assert [employee.id for employee in employees] == ids
+    assert all(employee.name == f"Employee {employee.id - 1:05d}" for employee in employees)
+    assert len(selects) <= 3
+
+
+@pytest.mark.asyncio
+async def test_identical_lookups_share_one_query(seeded_engine, selects):
+    # Arrange
+    loader = employee_loader(seeded_engine)
+    coalesced_before = loader.coalesced
+
+    # Act
+    employees = await asyncio.gather(*[lookup(seeded_engine, 7) for _ in range(50)])
+
+    # Assert
+    assert {employee.id for employee in employees} == {7}
+    # Every caller gets its own instance
+    assert len({id(employee) for employee in employees}) == 50
+    assert len(selects) == 1
+    assert loader.coalesced - coalesced_before == 49
+
+
+@pytest.mark.asyncio
+async def test_missing_id_returns_none(seeded_engine):
+    # Act
+    employees = await asyncio.gather(lookup(seeded_engine, 1), lookup(seeded_engine, 999))
+
+    # Assert
+    assert employees[0].id == 1
+    assert employees[1] is None
+
+
+@pytest.mark.asyncio
+async def test_session_with_writes_reads_its_own_rows(sqlite_engine):
+    # Arrange
+    async with AsyncSession(sqlite_engine, expire_on_commit=False) as db:
+        repository = EmployeeRepository(db)
+        created = await repository.create(request_id="test", employee=EmployeeCreate(
+            name="Nguyen Van A", department="Engineering", role="Developer",
+            type_of_working="Fulltime", hometown="Ha Noi", age=30
+        ))
+
+        # Act
+        employee = await repository.get_by_id(request_id="test", employee_id=created.id)
+
+    # Assert
+    assert employee is created
+
+
+@pytest.mark.asyncio
+async def test_batches_are_split_at_max_batch_size():
+    # Arrange
+    batches = []
+
+    async def load_many(keys):
+        batches.append(list(keys))
+        return {key: key * 10 for key in keys}
+
+    loader = DataLoader(load_many, window=0.01, max_batch_size=4)
+
+    # Act
+    values = await asyncio.gather(*[loader.load(key) for key in range(10)])
+
+    # Assert
+    assert values == [key * 10 for key in range(10)]
+    assert [len(batch) for batch in batches] == [4, 4, 2]
+
+
+@pytest.mark.asyncio
+async def test_load_error_reaches_every_caller():
+    # Arrange
+    async def load_many(keys):
+        raise RuntimeError("database is down")
+
+    loader = DataLoader(load_many)
+
+    # Act
+    results = await asyncio.gather(*[loader.load(key) for key in (1, 1, 2)], return_exceptions=True)
+
+    # Assert
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert loader.stats()["pending"] == 0
+
+
+@pytest.mark.asyncio
+async def test_batch_ignores_the_context_of_the_caller_who_opened_it():
+    # Arrange
+    seen_request_ids = []
+
+    async def load_many(keys):
+        seen_request_ids.append(get_request_id())
+        async with deadline_scope():
+            await asyncio.sleep(0.05)
+        return {key: key for key in keys}
+
+    loader = DataLoader(load_many, window=0.001)
+
+    async def hurried_caller():
+        set_request_id("hurried")
+        token = start_deadline(0.01)
+        try:
+            async with deadline_scope():
+                return await loader.load(1)
+        finally:
+            end_deadline(token)
+
+    # Act
+    results = await asyncio.gather(hurried_caller(), loader.load(2), return_exceptions=True)
+
+    # Assert
+    assert isinstance(results[0], TimeoutError)
+    assert results[1] == 2
+    assert seen_request_ids == [""]
+
+
+@pytest.mark.asyncio
+async def test_batch_is_bounded_by_its_own_timeout():
+    # Arrange
+    async def load_many(keys):
+        await asyncio.sleep(1)
+
+    loader = DataLoader(load_many, timeout=0.01)
+
+    # Act
+    results = await asyncio.gather(*[loader.load(key) for key in (1, 2)], return_exceptions=True)
+
+    # Assert
+    assert all(isinstance(result, TimeoutError) for result in results)
+    assert loader.stats()["pending"] == 0
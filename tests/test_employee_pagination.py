@@ -0,0 +1,102 @@
+from datetime import datetime, timedelta
+import pytest
+import pytest_asyncio
+from sqlalchemy import MetaData, update
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from app.core.pagination import decode_cursor, encode_cursor
+from app.core.global_define import SystemMessages
+from app.models.employee import Employee
+from app.repositories.employee import EmployeeRepository
+from app.services.employee import EmployeeService
+from tests.conftest import make_employee
+
+
+@pytest_asyncio.fixture
+async def seeded_session(db_session):
+    db_session.add_all([make_employee(i, age=30 + i % 3) for i in range(25)])
+    await db_session.commit()
+    return db_session
+
+
+async def collect_pages(service, **kwargs):
+    ids, cursor, pages = [], None, 0
+    while True:
+        response = await service.get_employees_page(request_id="test", limit=10, cursor=cursor, **kwargs)
+        ids.extend(emp.id for emp in response.detail)
+        pages += 1
+        cursor = response.next_cursor
+        if not cursor:
+            return ids, pages
+
+
+@pytest.mark.asyncio
+async def test_keyset_pages_cover_all_rows_once(seeded_session):
+    # Arrange
+    service = EmployeeService(EmployeeRepository(seeded_session), "test")
+
+    # Act
+    ids, pages = await collect_pages(service)
+
+    # Assert
+    assert ids == list(range(1, 26))
+    assert pages == 3
+
+
+@pytest.mark.asyncio
+async def test_keyset_with_secondary_sort_handles_ties(seeded_session):
+    # Arrange
+    service = EmployeeService(EmployeeRepository(seeded_session), "test")
+
+    # Act
+    ids, _ = await collect_pages(service, sort_by="age")
+
+    # Assert
+    expected = sorted(range(1, 26), key=lambda i: (30 + (i - 1) % 3, i))
+    assert ids == expected
+
+
+@pytest.mark.asyncio
+async def test_invalid_cursor_and_sort_rejected(seeded_session):
+    # Arrange
+    service = EmployeeService(EmployeeRepository(seeded_session), "test")
+
+    # Act
+    bad_cursor = await service.get_employees_page(request_id="test", cursor="not-a-cursor")
+    bad_sort = await service.get_employees_page(request_id="test", sort_by="password")
+    mismatched = await service.get_employees_page(request_id="test", cursor=encode_cursor(3), sort_by="age")
+
+    # Assert
+    assert bad_cursor == SystemMessages.WRONG_PARAMS
+    assert bad_sort == SystemMessages.WRONG_PARAMS
+    assert mismatched == SystemMessages.WRONG_PARAMS
+
+
+@pytest.mark.asyncio
+async def test_keyset_by_t_create_includes_null_rows(tmp_path):
+    # Arrange: a table from before t_create was NOT NULL
+    metadata = MetaData()
+    legacy = Employee.__table__.to_metadata(metadata)
+    legacy.c.t_create.nullable = True
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/legacy.db")
+    async with engine.begin() as conn:
+        await conn.run_sync(metadata.create_all)
+    async with AsyncSession(engine, expire_on_commit=False) as db:
+        # Pairs of rows share a timestamp; every third row has none
+        db.add_all([make_employee(i, t_create=datetime(2024, 1, 1) + timedelta(minutes=i // 2)) for i in range(25)])
+        await db.commit()
+        await db.execute(update(legacy).where(legacy.c.id % 3 == 0).values(t_create=None))
+        await db.commit()
+        service = EmployeeService(EmployeeRepository(db), "test")
+
+        # Act
+        ids, pages = await collect_pages(service, sort_by="t_create")
+    await engine.dispose()
+
+    # Assert
+    assert sorted(ids) == list(range(1, 26))
+    assert ids[-8:] == [i for i in range(1, 26) if i % 3 == 0]
+    assert pages == 3
+
+
+def test_cursor_round_trip():
+    assert decode_cursor(encode_cursor(7, "name", "An"), "name") == {"id": 7, "value": "An"}
@@ -0,0 +1,211 @@
+import asyncio
+import httpx
+import pytest
+import pytest_asyncio
+from fastapi import Request
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+import app.core.responses as responses_module
+import app.db.session as session_module
+from app.core.cache import LRUCache
+from app.core.responses import versioned_response
+from app.core.versioning import TableVersions, table_versions
+from app.db.redis import RedisClient
+from app.schemas.base import BaseResponse
+from main import app
+from tests.conftest import make_employee
+
+
+class BrokenRedisClient(RedisClient):
+    async def get(self, key):
+        raise ConnectionError("redis is down")
+
+
+@pytest_asyncio.fixture
+async def client(sqlite_engine, monkeypatch):
+    factory = sessionmaker(sqlite_engine, class_=AsyncSession, expire_on_commit=False)
+    monkeypatch.setattr(session_module, "AsyncSessionLocal", factory)
+    async with factory() as db:
+        db.add_all([make_employee(i) for i in range(5)])
+        await db.commit()
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+
+
+@pytest.fixture
+def statements(sqlite_engine):
+    captured = []
+    event.listen(
+        sqlite_engine.sync_engine, "before_cursor_execute",
+        lambda conn, cursor, statement, *args: captured.append(statement)
+    )
+    return captured
+
+
+@pytest.fixture
+def response_cache(monkeypatch):
+    cache = LRUCache(max_size=100, ttl=5)
+    monkeypatch.setattr(responses_module, "response_cache", cache)
+    return cache
+
+
+EMPLOYEE = dict(name="Nguyen Van A", department="Engineering", role="Developer",
+                type_of_working="Fulltime", hometown="Ha Noi", age=30)
+
+
+@pytest.mark.asyncio
+async def test_matching_etag_returns_304_without_queries(client, statements):
+    # Arrange
+    first = await client.post("/api/v1/employees/get-list")
+    statements.clear()
+
+    # Act
+    second = await client.post("/api/v1/employees/get-list", headers={"If-None-Match": first.headers["etag"]})
+    weak = await client.post("/api/v1/employees/get-list", headers={"If-None-Match": f'"x", W/{first.headers["etag"]}'})
+
+    # Assert
+    assert first.status_code == 200 and first.headers["etag"]
+    assert second.status_code == 304 and weak.status_code == 304
+    assert second.content == b""
+    assert second.headers["etag"] == first.headers["etag"]
+    assert statements == []
+
+
+@pytest.mark.asyncio
+async def test_write_changes_etag(client):
+    # Arrange
+    before = await client.post("/api/v1/employees/get-list")
+
+    # Act
+    await client.post("/api/v1/employees/create", json=EMPLOYEE)
+    after = await client.post("/api/v1/employees/get-list", headers={"If-None-Match": before.headers["etag"]})
+
+    # Assert
+    assert after.status_code == 200
+    assert after.headers["etag"] != before.headers["etag"]
+    assert len(after.json()["detail"]) == 6
+    assert await table_versions.get("employees") == 1
+
+
+@pytest.mark.asyncio
+async def test_response_cache_serves_repeat_pages(client, statements, response_cache):
+    # Arrange
+    first = await client.post("/api/v1/employees/get-list", params={"limit": 2, "skip": 1})
+    statements.clear()
+
+    # Act
+    # Same query in a different parameter order
+    repeat = await client.post("/api/v1/employees/get-list", params={"skip": 1, "limit": 2})
+    cached_statements = list(statements)
+    other = await client.post("/api/v1/employees/get-list", params={"limit": 3})
+
+    # Assert
+    assert repeat.content == first.content
+    assert cached_statements == []
+    assert len(other.json()["detail"]) == 3
+    assert len(statements) == 1
+
+
+@pytest.mark.asyncio
+async def test_response_cache_misses_after_write(client, response_cache):
+    # Arrange
+    await client.post("/api/v1/employees/get-list")
+
+    # Act
+    await client.post("/api/v1/employees/update/1", json={"id": 1, "age": 55})
+    response = await client.post("/api/v1/employees/get-list")
+
+    # Assert
+    assert response.json()["detail"][0]["age"] == 55
+
+
+@pytest.mark.asyncio
+async def test_errors_are_not_tagged(client, response_cache):
+    # Act
+    response = await client.post("/api/v1/employees/get-list", params={"fields": "password"})
+
+    # Assert
+    assert response.json()["status"] != 1
+    assert "etag" not in response.headers
+    assert len(response_cache) == 0
+
+
+@pytest.mark.asyncio
+async def test_no_etag_without_redis(client, monkeypatch):
+    # Arrange
+    monkeypatch.setattr(table_versions, "_redis", BrokenRedisClient())
+    monkeypatch.setattr(table_versions, "_down_until", 0.0)
+
+    # Act
+    response = await client.post("/api/v1/employees/get-list", headers={"If-None-Match": "*"})
+
+    # Assert
+    assert response.status_code == 200
+    assert "etag" not in response.headers
+    assert len(response.json()["detail"]) == 5
+
+
+@pytest.mark.asyncio
+async def test_rolled_back_write_keeps_version(db_session, fake_cache_redis):
+    # Arrange
+    versions = TableVersions(redis=fake_cache_redis)
+    db_session.add(make_employee(0))
+    await db_session.flush()
+
+    # Act
+    versions.bump_on_commit(db_session, "employees")
+    await db_session.rollback()
+
+    # Assert
+    assert await versions.get("employees") == 0
+
+
+@pytest.mark.asyncio
+async def test_failed_bump_disables_etags_until_retried(db_session, fake_cache_redis, monkeypatch):
+    # Arrange
+    versions = TableVersions(redis=fake_cache_redis, bump_retry_interval=0.01)
+    incr = fake_cache_redis.redis.incr
+    failures = [ConnectionError("redis is down")] * 2
+
+    async def flaky_incr(key):
+        if failures:
+            raise failures.pop()
+        return await incr(key)
+
+    monkeypatch.setattr(fake_cache_redis.redis, "incr", flaky_incr)
+    db_session.add(make_employee(0))
+    versions.bump_on_commit(db_session, "employees")
+
+    # Act
+    await db_session.commit()
+    await asyncio.sleep(0)
+    monkeypatch.setattr(versions, "_down_until", 0.0)
+    while_unbumped = await versions.get("employees")
+    await asyncio.sleep(0.05)
+
+    # Assert
+    assert while_unbumped is None
+    assert await versions.get("employees") == 1
+
+
+@pytest.mark.asyncio
+async def test_body_built_while_version_moved_is_not_tagged(response_cache):
+    # Arrange
+    build_calls = []
+
+    async def build():
+        build_calls.append(1)
+        # A write commits while the page is being read
+        await table_versions.bump("employees")
+        return BaseResponse.response(status=1, msg="ok", detail=[])
+
+    request = Request({"type": "http", "method": "POST", "path": "/list", "query_string": b"", "headers": []})
+
+    # Act
+    response = await versioned_response(request, "employees", build)
+
+    # Assert
+    assert build_calls == [1]
+    assert "etag" not in response.headers
+    assert len(response_cache) == 0
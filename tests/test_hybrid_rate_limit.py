@@ -0,0 +1,132 @@
+import asyncio
+import pytest
+import fakeredis
+from fastapi import Request
+from app.services.hybrid_rate_limit import HybridRateLimiter
+from app.services.redis_rate_limit import RedisRateLimitService
+
+
+@pytest.fixture
+def server():
+    return fakeredis.FakeServer()
+
+
+def make_limiter(server, max_drift=5):
+    return HybridRateLimiter(fakeredis.FakeAsyncRedis(server=server), sync_interval=0.01, max_drift=max_drift)
+
+
+@pytest.mark.asyncio
+async def test_single_worker_enforces_limit_exactly(server):
+    # Arrange
+    limiter = make_limiter(server)
+
+    # Act
+    results = [await limiter.acquire("c1", "/e", 12, 60) for _ in range(20)]
+    await limiter.stop()
+
+    # Assert
+    assert results == [True] * 12 + [False] * 8
+    keys = await limiter.redis.keys("rate_limit:hybrid:c1:/e:*")
+    assert int(await limiter.redis.get(keys[0])) == 12
+
+
+@pytest.mark.asyncio
+async def test_overshoot_bounded_across_workers(server):
+    # Arrange
+    workers = [make_limiter(server, max_drift=5) for _ in range(4)]
+
+    # Act
+    results = await asyncio.gather(*[
+        worker.acquire("c1", "/e", 50, 60) for worker in workers for _ in range(40)
+    ])
+    for worker in workers:
+        await worker.stop()
+
+    # Assert
+    admitted = sum(results)
+    assert 50 <= admitted <= 50 + (len(workers) - 1) * 5
+
+
+@pytest.mark.asyncio
+async def test_background_sync_batches_usage(server):
+    # Arrange
+    limiter = make_limiter(server, max_drift=100)
+
+    # Act
+    for _ in range(30):
+        await limiter.acquire("c1", "/e", 1000, 60)
+    await asyncio.sleep(0.05)
+
+    # Assert
+    keys = await limiter.redis.keys("rate_limit:hybrid:c1:/e:*")
+    assert int(await limiter.redis.get(keys[0])) == 30
+    await limiter.stop()
+
+
+@pytest.mark.asyncio
+async def test_service_hybrid_mode(server):
+    # Arrange
+    limiter = make_limiter(server, max_drift=2)
+    service = RedisRateLimitService(limiter.redis, "hybrid", hybrid_limiter=limiter)
+    request = Request({"type": "http", "headers": []})
+
+    # Act
+    responses = [
+        await service.check_rate_limit(
+            customer_id="c1", endpoint="/e", max_requests=3, time_window_seconds=60, request=request
+        )
+        for _ in range(4)
+    ]
+    await limiter.stop()
+
+    # Assert
+    assert [r.detail for r in responses] == [True, True, True, False]
+
+
+@pytest.mark.asyncio
+async def test_window_rollover_during_inline_sync(server, monkeypatch):
+    # Arrange
+    clock = [1000.0]
+    monkeypatch.setattr("app.services.hybrid_rate_limit.time.time", lambda: clock[0])
+    limiter = make_limiter(server, max_drift=2)
+    limiter._ensure_sync_task = lambda: None
+    for _ in range(2):
+        await limiter.acquire("c1", "/e", 10, 60)
+    flush = limiter.flush
+
+    async def rolling_flush(keys=None):
+        if clock[0] < 1060.0:
+            # Another request opens the next window while this sync is in flight
+            clock[0] = 1060.0
+            await limiter.acquire("c1", "/e", 10, 60)
+        await flush(keys)
+
+    monkeypatch.setattr(limiter, "flush", rolling_flush)
+
+    # Act
+    allowed = await asyncio.wait_for(limiter.acquire("c1", "/e", 10, 60), timeout=1)
+
+    # Assert
+    assert allowed is True
+    assert limiter._buckets["c1:/e"].window_id == 1060 // 60
+
+
+@pytest.mark.asyncio
+async def test_flush_drops_buckets_of_finished_windows(server, monkeypatch):
+    # Arrange
+    clock = [1000.0]
+    monkeypatch.setattr("app.services.hybrid_rate_limit.time.time", lambda: clock[0])
+    limiter = make_limiter(server)
+    limiter._ensure_sync_task = lambda: None
+    for customer in range(10):
+        await limiter.acquire(f"c{customer}", "/e", 10, 60)
+
+    # Act
+    await limiter.flush()
+    kept = len(limiter._buckets)
+    clock[0] = 1080.0
+    await limiter.flush()
+
+    # Assert
+    assert kept == 10
+    assert limiter._buckets == {} and limiter._ttl_ms == {}
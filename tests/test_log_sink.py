@@ -0,0 +1,89 @@
+import io
+import json
+import os
+import threading
+from loguru import logger
+from app.core.log_sink import BatchedLogSink
+
+
+class BlockedSink(BatchedLogSink):
+    def __init__(self, *args, **kwargs):
+        self.release = threading.Event()
+        super().__init__(*args, **kwargs)
+
+    def _write_batch(self, batch):
+        self.release.wait()
+        super()._write_batch(batch)
+
+
+def log_to(sink, count):
+    handler_id = logger.add(sink, format="{message}", level="INFO")
+    for i in range(count):
+        logger.bind(request_id=f"r{i}").info("message {}", i)
+    logger.remove(handler_id)
+
+
+def test_writes_json_lines_in_batches():
+    # Arrange
+    stream = io.StringIO()
+    sink = BatchedLogSink(stream=stream, batch_size=10, flush_interval=0.05)
+
+    # Act
+    log_to(sink, 25)
+    sink.stop()
+
+    # Assert
+    lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert [line["message"] for line in lines] == [f"message {i}" for i in range(25)]
+    assert lines[3]["request_id"] == "r3"
+    assert lines[0]["level"] == "INFO"
+    assert sink.stats()["written"] == 25
+    assert sink.stats()["batches"] >= 3
+
+
+def test_overflow_drops_instead_of_blocking():
+    # Arrange
+    stream = io.StringIO()
+    sink = BlockedSink(stream=stream, queue_size=5, batch_size=1, flush_interval=0.01)
+
+    # Act
+    log_to(sink, 50)
+    dropped = sink.stats()["dropped"]
+    sink.release.set()
+    sink.stop()
+
+    # Assert
+    assert dropped >= 40
+    assert sink.stats()["written"] + dropped == 50
+
+
+def test_drop_oldest_keeps_newest():
+    # Arrange
+    stream = io.StringIO()
+    sink = BlockedSink(stream=stream, queue_size=5, batch_size=100, flush_interval=0.01, overflow="drop_oldest")
+
+    # Act
+    log_to(sink, 50)
+    sink.release.set()
+    sink.stop()
+
+    # Assert
+    messages = [json.loads(line)["message"] for line in stream.getvalue().splitlines()]
+    assert messages[-1] == "message 49"
+
+
+def test_file_rotation(tmp_path):
+    # Arrange
+    path = tmp_path / "app.log"
+    sink = BatchedLogSink(path=str(path), batch_size=5, flush_interval=0.01, rotation_bytes=500)
+
+    # Act
+    log_to(sink, 50)
+    sink.stop()
+
+    # Assert
+    files = os.listdir(tmp_path)
+    assert "app.log" in files
+    assert len(files) > 1
+    total = sum(len(open(tmp_path / name).read().splitlines()) for name in files)
+    assert total == 50
@@ -0,0 +1,143 @@
+import fakeredis
+import httpx
+import pytest
+import pytest_asyncio
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+import app.db.session as session_module
+from app.core.config import settings
+from app.core.metrics import (
+    MetricsExporter, MetricsRegistry, add_hit_ratios, db_pool_checkout_wait, merge,
+    redis_command_duration, render
+)
+from app.db.pool import InstrumentedQueuePool
+from app.db.redis import InstrumentedRedis
+from main import app
+from tests.conftest import make_employee
+
+
+@pytest_asyncio.fixture
+async def client(sqlite_engine, monkeypatch):
+    factory = sessionmaker(sqlite_engine, class_=AsyncSession, expire_on_commit=False)
+    monkeypatch.setattr(session_module, "AsyncSessionLocal", factory)
+    async with factory() as db:
+        db.add_all([make_employee(i) for i in range(3)])
+        await db.commit()
+    monkeypatch.setattr(settings, "DIAGNOSTICS_TOKEN", "secret")
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+
+
+def test_histogram_renders_cumulative_buckets():
+    # Arrange
+    registry = MetricsRegistry()
+    latency = registry.histogram("latency_seconds", "Latency", ("route",), buckets=(0.1, 1.0))
+
+    # Act
+    for value in (0.05, 0.1, 0.5, 3.0):
+        latency.observe(value, "/a")
+    output = render(merge([registry.snapshot()]))
+
+    # Assert
+    assert 'latency_seconds_bucket{route="/a",le="0.1"} 2' in output
+    assert 'latency_seconds_bucket{route="/a",le="1"} 3' in output
+    assert 'latency_seconds_bucket{route="/a",le="+Inf"} 4' in output
+    assert 'latency_seconds_count{route="/a"} 4' in output
+    assert 'latency_seconds_sum{route="/a"} 3.65' in output
+    assert "# TYPE latency_seconds histogram" in output
+
+
+def test_merge_adds_up_workers():
+    # Arrange
+    workers = []
+    for hits in (3, 1):
+        registry = MetricsRegistry()
+        registry.counter("requests_total", "Requests", ("route",)).inc("/a", amount=hits)
+        registry.histogram("latency_seconds", "Latency", buckets=(1.0,)).observe(0.5)
+        registry.counter("cache_lookups_total", "Lookups", ("cache", "result"),
+                         collect=lambda hits=hits: {("employee", "l1"): hits, ("employee", "miss"): 1})
+        workers.append(registry.snapshot())
+
+    # Act
+    merged = add_hit_ratios(merge(workers))
+
+    # Assert
+    assert merged["requests_total"]["samples"][("/a",)] == 4
+    assert merged["latency_seconds"]["samples"][()] == [2, 0, 1.0]
+    assert merged["cache_hit_ratio"]["samples"][("employee",)] == pytest.approx(4 / 6)
+
+
+@pytest.mark.asyncio
+async def test_requests_are_recorded_per_route(client):
+    # Act
+    await client.post("/api/v1/employees/get/1")
+    await client.post("/api/v1/employees/get/2")
+    await client.post("/no-such-route")
+    response = await client.get("/api/v1/diagnostics/metrics", headers={"Authorization": "Bearer secret"})
+
+    # Assert
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    lines = response.text.splitlines()
+    count = next(line for line in lines if line.startswith(
+        'http_request_duration_seconds_count{method="POST",route="/api/v1/employees/get/{employee_id}"}'))
+    assert int(count.rsplit(" ", 1)[1]) >= 2
+    assert any(line.startswith('http_requests_total{method="POST",route="<unmatched>",status="404"}') for line in lines)
+    assert any(line.startswith('cache_lookups_total{cache="employee",result="miss"}') for line in lines)
+    assert any(line.startswith('cache_hit_ratio{cache="employee"}') for line in lines)
+
+
+@pytest.mark.asyncio
+async def test_diagnostics_require_the_token(client, monkeypatch):
+    # Act
+    missing = await client.get("/api/v1/diagnostics/metrics")
+    wrong = await client.post("/api/v1/diagnostics/sql-stats?reset=true", headers={"Authorization": "Bearer guess"})
+    allowed = await client.post("/api/v1/diagnostics/cache-stats", headers={"Authorization": "Bearer secret"})
+    monkeypatch.setattr(settings, "DIAGNOSTICS_TOKEN", "")
+    disabled = await client.get("/api/v1/diagnostics/metrics", headers={"Authorization": "Bearer "})
+
+    # Assert
+    assert missing.status_code == 401 and wrong.status_code == 401
+    assert allowed.status_code == 200 and allowed.json()["status"] == 1
+    assert disabled.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_exporter_merges_other_workers(fake_cache_redis):
+    # Arrange
+    exporters = []
+    for hits in (2, 5):
+        registry = MetricsRegistry()
+        registry.counter("requests_total", "Requests").inc(amount=hits)
+        exporters.append(MetricsExporter(registry, redis=fake_cache_redis))
+    await exporters[1].publish()
+
+    # Act
+    merged = await exporters[0].collect()
+    await exporters[1].stop()
+    alone = await exporters[0].collect()
+
+    # Assert
+    assert merged["requests_total"]["samples"][()] == 7
+    assert alone["requests_total"]["samples"][()] == 2
+
+
+@pytest.mark.asyncio
+async def test_pool_and_redis_latency_are_recorded(tmp_path):
+    # Arrange
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/pool.db", poolclass=InstrumentedQueuePool)
+    engine.pool.metrics_name = "test-pool"
+    client = InstrumentedRedis(connection_pool=fakeredis.FakeAsyncRedis().connection_pool)
+
+    # Act
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+        checked_out = engine.pool.checkedout()
+    await client.set("key", "value")
+    await engine.dispose()
+
+    # Assert
+    assert checked_out == 1
+    assert sum(db_pool_checkout_wait.samples()[("test-pool",)][:-1]) == 1
+    assert sum(redis_command_duration.samples()[("SET",)][:-1]) >= 1
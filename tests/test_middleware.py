@@ -0,0 +1,156 @@
+import pytest
+import httpx
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+from app.core.logging import RequestLoggingMiddleware
+from app.middleware.rate_limit import InMemoryRateLimitBackend, RateLimitBackend, RateLimitMiddleware, RateLimitPolicy
+
+
+def build_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/ping")
+    async def ping(request: Request):
+        return {"request_id": request.state.request_id}
+
+    @app.get("/stream")
+    async def stream():
+        async def chunks():
+            for i in range(3):
+                yield f"chunk{i}\n"
+        return StreamingResponse(chunks(), media_type="text/plain")
+
+    app.add_middleware(
+        RateLimitMiddleware,
+        backend=InMemoryRateLimitBackend(),
+        policies={"/ping": RateLimitPolicy(max_requests=2, time_window_seconds=60)},
+        max_requests=100,
+    )
+    app.add_middleware(RequestLoggingMiddleware)
+    return app
+
+
+@pytest.fixture
+def client():
+    transport = httpx.ASGITransport(app=build_app())
+    return httpx.AsyncClient(transport=transport, base_url="http://test", headers={"X-Customer-ID": "c1"})
+
+
+@pytest.mark.asyncio
+async def test_request_id_header_matches_state(client):
+    # Act
+    response = await client.get("/ping")
+
+    # Assert
+    assert response.status_code == 200
+    assert response.headers["X-Request-ID"] == response.json()["request_id"]
+
+
+@pytest.mark.asyncio
+async def test_streaming_response_passes_through(client):
+    # Act
+    response = await client.get("/stream")
+
+    # Assert
+    assert response.text == "chunk0\nchunk1\nchunk2\n"
+    assert "X-Request-ID" in response.headers
+
+
+@pytest.mark.asyncio
+async def test_route_policy_applied(client):
+    # Act
+    codes = [(await client.get("/ping")).status_code for _ in range(3)]
+
+    # Assert
+    assert codes == [200, 200, 429]
+    assert (await client.get("/stream")).status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_customer_id_required_and_docs_exempt(client):
+    # Act
+    missing = await client.get("/ping", headers={"X-Customer-ID": ""})
+    docs = await client.get("/openapi.json", headers={"X-Customer-ID": ""})
+
+    # Assert
+    assert missing.status_code == 400
+    assert docs.status_code == 200
+
+
+def test_policy_prefixes_match_whole_segments():
+    # Arrange
+    middleware = RateLimitMiddleware(
+        app=None,
+        backend=InMemoryRateLimitBackend(),
+        policies={"/api/v1/employees": RateLimitPolicy(max_requests=5), "/api/v1/": RateLimitPolicy(max_requests=7)},
+    )
+
+    # Act
+    docs_page = middleware.resolve("/docs/oauth2-redirect")
+    lookalike = middleware.resolve("/docsx")
+    employees = middleware.resolve("/api/v1/employees/get/1")
+    employees_root = middleware.resolve("/api/v1/employees")
+    other = middleware.resolve("/api/v1/employeesx")
+
+    # Assert
+    assert docs_page == ("/docs", None)
+    assert lookalike == ("/docsx", middleware.default_policy)
+    assert employees == employees_root == ("/api/v1/employees", RateLimitPolicy(max_requests=5))
+    assert other == ("/api/v1/", RateLimitPolicy(max_requests=7))
+
+
+def test_backend_must_implement_check_rate_limit():
+    # Arrange
+    class IncompleteBackend(RateLimitBackend):
+        pass
+
+    # Act
+    with pytest.raises(TypeError) as error:
+        IncompleteBackend()
+
+    # Assert
+    assert "check_rate_limit" in str(error.value)
+
+
+@pytest.mark.asyncio
+async def test_throttled_client_stays_throttled_after_overflow():
+    # Arrange
+    backend = InMemoryRateLimitBackend(max_keys=10)
+    policy = RateLimitPolicy(max_requests=2, time_window_seconds=60)
+
+    async def allowed(customer_id: str) -> bool:
+        return (await backend.check_rate_limit(customer_id, "/ping", policy, None)).detail
+
+    for _ in range(2):
+        assert await allowed("c1")
+
+    # Act: another client cycles through many ids while c1 keeps retrying
+    retries = []
+    for i in range(50):
+        await allowed(f"spoofed-{i}")
+        if i % 5 == 0:
+            retries.append(await allowed("c1"))
+
+    # Assert
+    assert not any(retries)
+    assert not await allowed("c1")
+    assert len(backend._counters) <= 10
+
+
+@pytest.mark.asyncio
+async def test_overflow_drops_expired_windows_first(monkeypatch):
+    # Arrange
+    clock = [0.0]
+    monkeypatch.setattr("app.middleware.rate_limit.time.time", lambda: clock[0])
+    backend = InMemoryRateLimitBackend(max_keys=3)
+    policy = RateLimitPolicy(max_requests=5, time_window_seconds=60)
+    for customer_id in ("old-1", "old-2"):
+        await backend.check_rate_limit(customer_id, "/ping", policy, None)
+    clock[0] = 61.0
+    await backend.check_rate_limit("current", "/ping", policy, None)
+
+    # Act
+    await backend.check_rate_limit("new", "/ping", policy, None)
+
+    # Assert
+    assert list(backend._counters) == [("current", "/ping"), ("new", "/ping")]
@@ -0,0 +1,94 @@
+import asyncio
+import threading
+import time
+import httpx
+import pytest
+from fastapi import FastAPI
+import app.core.security as security
+from app.core.blocking import BlockingPool
+from app.core.security import get_password_hash_async, verify_password_async
+
+
+@pytest.fixture
+def password_pool(monkeypatch):
+    pool = BlockingPool("test-password-hash", max_workers=2)
+    monkeypatch.setattr(security, "password_pool", pool)
+    yield pool
+    pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_async_variants_round_trip(password_pool):
+    # Act
+    hashed = await get_password_hash_async("secret")
+
+    # Assert
+    assert await verify_password_async("secret", hashed)
+    assert not await verify_password_async("wrong", hashed)
+    assert password_pool.stats()["calls"] == 3
+
+
+@pytest.mark.asyncio
+async def test_pool_caps_concurrency_and_records_queue_time():
+    # Arrange
+    pool = BlockingPool("test-cap", max_workers=2)
+    lock = threading.Lock()
+    running, peak = 0, 0
+
+    def work():
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        time.sleep(0.05)
+        with lock:
+            running -= 1
+
+    # Act
+    await asyncio.gather(*[pool.run(work) for _ in range(6)])
+    stats = pool.stats()
+    pool.shutdown()
+
+    # Assert
+    assert peak == 2
+    assert stats["calls"] == 6 and stats["in_flight"] == 0 and stats["waiting"] == 0
+    # The last pair waited for two rounds of 50ms
+    assert stats["queue_max_ms"] >= 80
+
+
+@pytest.mark.asyncio
+async def test_other_requests_stay_fast_during_login_storm(password_pool):
+    # Arrange
+    hashed = security.get_password_hash("secret")
+    app = FastAPI()
+
+    @app.post("/login")
+    async def login():
+        return {"ok": await verify_password_async("secret", hashed)}
+
+    @app.get("/ping")
+    async def ping():
+        return {}
+
+    latencies = []
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        async def pinger(stop: asyncio.Event):
+            while not stop.is_set():
+                t_begin = time.perf_counter()
+                await client.get("/ping")
+                latencies.append(time.perf_counter() - t_begin)
+                await asyncio.sleep(0.005)
+
+        # Act
+        stop = asyncio.Event()
+        ping_task = asyncio.create_task(pinger(stop))
+        logins = await asyncio.gather(*[client.post("/login") for _ in range(4)])
+        stop.set()
+        await ping_task
+
+    # Assert
+    assert all(response.json()["ok"] for response in logins)
+    assert len(latencies) > 20
+    # One bcrypt verification alone takes far longer than this
+    assert sorted(latencies)[int(len(latencies) * 0.99)] < 0.1
+    assert password_pool.stats()["queue_max_ms"] > 0
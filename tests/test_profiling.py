@@ -0,0 +1,98 @@
+import asyncio
+import json
+import os
+import time
+import httpx
+import pytest
+from fastapi import FastAPI
+from app.core.logging import RequestLoggingMiddleware
+from app.core.profiling import ProfileRing
+from app.middleware.profiling import ProfilingMiddleware
+
+
+def burn_cpu(seconds: float):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+def build_app(directory, **options) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/slow")
+    async def slow():
+        burn_cpu(0.03)
+        await asyncio.sleep(0.03)
+        return {}
+
+    app.add_middleware(ProfilingMiddleware, directory=str(directory), **options)
+    app.add_middleware(RequestLoggingMiddleware)
+    return app
+
+
+def client_for(app: FastAPI) -> httpx.AsyncClient:
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+
+
+@pytest.mark.asyncio
+async def test_authorized_header_writes_speedscope_profile(tmp_path):
+    # Arrange
+    app = build_app(tmp_path, token="secret", sample_rate=0)
+
+    # Act
+    async with client_for(app) as client:
+        response = await client.get("/slow", headers={"X-Profile": "secret"})
+
+    # Assert
+    name = response.headers["X-Profile-Id"]
+    assert response.headers["X-Request-ID"] in name
+    with open(tmp_path / name) as f:
+        profile = json.load(f)
+    frames = [frame["name"] for frame in profile["shared"]["frames"]]
+    assert "burn_cpu" in frames
+    assert "(waiting)" in frames
+    assert profile["profiles"][0]["endValue"] >= 60
+    assert sum(profile["profiles"][0]["weights"]) > 0
+
+
+@pytest.mark.asyncio
+async def test_unprofiled_requests(tmp_path):
+    # Arrange
+    app = build_app(tmp_path, token="secret", sample_rate=0)
+
+    # Act
+    async with client_for(app) as client:
+        wrong = await client.get("/slow", headers={"X-Profile": "guess"})
+        plain = await client.get("/slow")
+
+    # Assert
+    assert "X-Profile-Id" not in wrong.headers and "X-Profile-Id" not in plain.headers
+    assert not tmp_path.exists() or os.listdir(tmp_path) == []
+
+
+@pytest.mark.asyncio
+async def test_sampled_requests_write_collapsed_stacks(tmp_path):
+    # Arrange
+    app = build_app(tmp_path, token="", sample_rate=1.0, output_format="collapsed")
+
+    # Act
+    async with client_for(app) as client:
+        response = await client.get("/slow")
+
+    # Assert
+    lines = (tmp_path / response.headers["X-Profile-Id"]).read_text().splitlines()
+    assert any("burn_cpu" in line.rsplit(" ", 1)[0] for line in lines)
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+
+
+def test_ring_keeps_newest_files(tmp_path):
+    # Arrange
+    ring = ProfileRing(str(tmp_path), max_files=3)
+
+    # Act
+    names = [ring.file_name(f"r{i}.txt") for i in range(5)]
+    for name in names:
+        ring.write(name, "x")
+
+    # Assert
+    assert sorted(os.listdir(tmp_path)) == names[2:]
@@ -0,0 +1,47 @@
+import asyncio
+import pytest
+import fakeredis
+from fakeredis.aioredis import FakeAsyncRedisConnection
+import redis.asyncio as redis
+from app.core.redis import get_redis_client
+from app.db.redis import InstrumentedConnectionPool, redis_client
+
+
+@pytest.fixture
+def pool():
+    return InstrumentedConnectionPool(
+        connection_class=FakeAsyncRedisConnection,
+        server=fakeredis.FakeServer(),
+        max_connections=2,
+        timeout=1,
+        decode_responses=True,
+    )
+
+
+@pytest.mark.asyncio
+async def test_get_redis_client_is_shared():
+    # Act
+    first = await get_redis_client()
+    second = await get_redis_client()
+
+    # Assert
+    assert first is second
+    assert first.connection_pool is redis_client.pool
+
+
+@pytest.mark.asyncio
+async def test_pool_stats_bounded_by_max_connections(pool):
+    # Arrange
+    client = redis.Redis(connection_pool=pool)
+
+    # Act
+    await asyncio.gather(*[client.incr("counter") for _ in range(20)])
+    stats = pool.stats()
+
+    # Assert
+    assert await client.get("counter") == "20"
+    assert stats["in_use"] == 0
+    assert 1 <= stats["idle"] <= 2
+    assert stats["acquisitions"] == 20
+    assert stats["wait_time_max_ms"] >= stats["wait_time_avg_ms"] >= 0
+    await pool.disconnect()
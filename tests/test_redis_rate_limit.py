@@ -0,0 +1,72 @@
+import asyncio
+import pytest
+import fakeredis
+from fastapi import Request, status
+from app.core.redis_scripts import FIXED_WINDOW
+from app.services.redis_rate_limit import RedisRateLimitService
+
+
+@pytest.fixture
+def redis_client():
+    return fakeredis.FakeAsyncRedis()
+
+
+@pytest.fixture
+def request_obj():
+    return Request({"type": "http", "headers": []})
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("algorithm", ["fixed_window", "sliding_window_log", "gcra"])
+async def test_check_rate_limit_blocks_after_limit(redis_client, request_obj, algorithm):
+    # Arrange
+    service = RedisRateLimitService(redis_client, algorithm)
+
+    # Act
+    responses = [
+        await service.check_rate_limit(
+            customer_id="c1", endpoint="/e", max_requests=5, time_window_seconds=60, request=request_obj
+        )
+        for _ in range(7)
+    ]
+
+    # Assert
+    assert [r.detail for r in responses] == [True] * 5 + [False] * 2
+    assert responses[-1].status == status.HTTP_429_TOO_MANY_REQUESTS
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("algorithm", ["fixed_window", "sliding_window_log", "gcra"])
+async def test_check_rate_limit_is_atomic_under_concurrency(redis_client, request_obj, algorithm):
+    # Arrange
+    service = RedisRateLimitService(redis_client, algorithm)
+
+    # Act
+    responses = await asyncio.gather(*[
+        service.check_rate_limit(
+            customer_id="c1", endpoint="/e", max_requests=10, time_window_seconds=60, request=request_obj
+        )
+        for _ in range(50)
+    ])
+
+    # Assert
+    assert sum(1 for r in responses if r.detail) == 10
+
+
+@pytest.mark.asyncio
+async def test_script_reloaded_after_flush(redis_client):
+    # Arrange
+    await FIXED_WINDOW.load(redis_client)
+    await redis_client.script_flush()
+
+    # Act
+    allowed, remaining, _ = await FIXED_WINDOW(redis_client, keys=["k"], args=[3, 1000])
+
+    # Assert
+    assert allowed == 1
+    assert remaining == 2
+
+
+def test_unknown_algorithm_rejected(redis_client):
+    with pytest.raises(ValueError):
+        RedisRateLimitService(redis_client, "leaky")
@@ -0,0 +1,207 @@
+import asyncio
+import httpx
+import pytest
+import pytest_asyncio
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+import app.db.session as session_module
+from app.core.config import settings
+from app.db.base import Base
+from app.db.routing import ReplicaRouter, RoutingSession, read_bind
+from app.models.employee import Employee
+from app.repositories.employee import EmployeeRepository, employee_loader
+from app.schemas.employee import EmployeeUpdate
+from main import app
+from tests.conftest import make_employee
+
+
+async def create_database(path: str, name: str):
+    # The same row with a different name in each file shows where a read went
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with AsyncSession(engine) as db:
+        db.add(make_employee(0, name=name))
+        await db.commit()
+    return engine
+
+
+@pytest_asyncio.fixture
+async def router(tmp_path):
+    primary = await create_database(tmp_path / "primary.db", "on primary")
+    replica = await create_database(tmp_path / "replica.db", "on replica")
+    router = ReplicaRouter(primary, [replica])
+    yield router
+    await router.dispose()
+    await primary.dispose()
+
+
+@pytest.fixture
+def session_factory(router):
+    return sessionmaker(
+        class_=AsyncSession,
+        sync_session_class=RoutingSession,
+        info={"router": router},
+        expire_on_commit=False,
+    )
+
+
+@pytest.mark.asyncio
+async def test_reads_go_to_replica(session_factory):
+    # Act
+    async with session_factory() as db:
+        employee = await EmployeeRepository(db).get_by_id(request_id="test", employee_id=1)
+
+    # Assert
+    assert employee.name == "on replica"
+
+
+@pytest.mark.asyncio
+async def test_reads_after_write_stick_to_primary(session_factory, router):
+    # Arrange
+    async with session_factory() as db:
+        repository = EmployeeRepository(db)
+
+        # Act
+        await repository.update(request_id="test", employee_update=EmployeeUpdate(id=1, age=50))
+        employee = await repository.get_by_id(request_id="test", employee_id=1)
+        listed = await repository.get_all(request_id="test")
+        await db.commit()
+
+    # Assert
+    assert employee.name == "on primary" and employee.age == 50
+    assert listed[0].name == "on primary"
+    async with AsyncSession(router.primary) as db:
+        assert (await db.get(Employee, 1)).age == 50
+    async with AsyncSession(router.replicas[0]) as db:
+        assert (await db.get(Employee, 1)).age != 50
+
+
+@pytest.mark.asyncio
+async def test_select_for_update_goes_to_primary(session_factory):
+    # Act
+    async with session_factory() as db:
+        result = await db.execute(select(Employee).where(Employee.id == 1).with_for_update())
+
+    # Assert
+    assert result.scalar_one().name == "on primary"
+
+
+@pytest.mark.asyncio
+async def test_round_robin_spreads_reads(tmp_path, router):
+    # Arrange
+    second = await create_database(tmp_path / "second.db", "on second replica")
+    round_robin = ReplicaRouter(router.primary, [router.replicas[0], second])
+    factory = sessionmaker(class_=AsyncSession, sync_session_class=RoutingSession, info={"router": round_robin})
+
+    # Act
+    names = []
+    for _ in range(4):
+        async with factory() as db:
+            names.append((await db.execute(select(Employee.name))).scalar_one())
+
+    # Assert
+    assert names == ["on replica", "on second replica"] * 2
+    await second.dispose()
+
+
+@pytest.mark.asyncio
+async def test_session_keeps_one_replica(tmp_path, router):
+    # Arrange
+    second = await create_database(tmp_path / "second.db", "on second replica")
+    round_robin = ReplicaRouter(router.primary, [router.replicas[0], second])
+    factory = sessionmaker(class_=AsyncSession, sync_session_class=RoutingSession, info={"router": round_robin})
+
+    # Act
+    async with factory() as db:
+        peeked = read_bind(db)
+        names = [(await db.execute(select(Employee.name))).scalar_one() for _ in range(3)]
+        pinned = read_bind(db)
+    async with factory() as db:
+        next_session = (await db.execute(select(Employee.name))).scalar_one()
+
+    # Assert
+    assert names == ["on replica"] * 3
+    assert peeked is pinned is router.replicas[0].sync_engine
+    assert next_session == "on second replica"
+    assert sum(round_robin.reads.values()) == 4
+    await second.dispose()
+
+
+@pytest.mark.asyncio
+async def test_unhealthy_replica_falls_back_to_primary(tmp_path, router):
+    # Arrange
+    broken = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/missing/replica.db")
+    failing = ReplicaRouter(router.primary, [broken], retry_after=60)
+    factory = sessionmaker(class_=AsyncSession, sync_session_class=RoutingSession, info={"router": failing})
+
+    # Act
+    with pytest.raises(Exception):
+        async with factory() as db:
+            await db.execute(select(Employee.name))
+    async with factory() as db:
+        name = (await db.execute(select(Employee.name))).scalar_one()
+
+    # Assert
+    assert failing.healthy_replicas() == []
+    assert name == "on primary"
+    await broken.dispose()
+
+
+@pytest.mark.asyncio
+async def test_check_health_marks_replicas(tmp_path, router):
+    # Arrange
+    broken = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/missing/replica.db")
+    checked = ReplicaRouter(router.primary, [router.replicas[0], broken])
+
+    # Act
+    await checked.check_health()
+
+    # Assert
+    assert checked.healthy_replicas() == [router.replicas[0]]
+    assert checked.reader() is router.replicas[0]
+    await broken.dispose()
+
+
+@pytest.mark.asyncio
+async def test_api_reads_replica_and_writes_primary(session_factory, monkeypatch):
+    # Arrange
+    monkeypatch.setattr(session_module, "AsyncSessionLocal", session_factory)
+
+    # Act
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        listed = await client.post("/api/v1/employees/get-list")
+        updated = await client.post("/api/v1/employees/update/1", json={"id": 1, "role": "Manager"})
+
+    # Assert
+    assert "etag" in listed.headers
+    assert listed.json()["detail"][0]["name"] == "on replica"
+    assert updated.json()["detail"]["name"] == "on primary"
+    assert updated.json()["detail"]["role"] == "Manager"
+
+
+@pytest.mark.asyncio
+async def test_tagged_reads_are_coalesced_on_the_replica(session_factory, router, monkeypatch):
+    # Arrange
+    monkeypatch.setattr(session_module, "AsyncSessionLocal", session_factory)
+    # Every request misses the employee cache and reaches the repository
+    monkeypatch.setattr(settings, "EMPLOYEE_CACHE_ENABLED", False)
+    selects = {"primary": 0, "replica": 0}
+    for name, engine in (("primary", router.primary), ("replica", router.replicas[0])):
+        def count(conn, cursor, statement, parameters, context, executemany, name=name):
+            if statement.startswith("SELECT"):
+                selects[name] += 1
+        event.listen(engine.sync_engine, "before_cursor_execute", count)
+
+    # Act
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        responses = await asyncio.gather(*[client.post("/api/v1/employees/get/1") for _ in range(38)])
+
+    # Assert
+    assert all("etag" in response.headers for response in responses)
+    assert {response.json()["detail"]["name"] for response in responses} == {"on replica"}
+    assert selects["primary"] == 0
+    # Batches close after a few milliseconds, so a slow start may need one more
+    assert selects["replica"] <= 5
+    assert employee_loader(router.replicas[0]).coalesced > 0
@@ -0,0 +1,76 @@
+import json
+import httpx
+import pytest
+import pytest_asyncio
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+import app.core.responses as responses_module
+import app.db.session as session_module
+from app.core.global_define import ErrorResponse, SystemMessages
+from app.core.responses import FastJSONResponse, encode
+from app.schemas.base import BaseResponse, CursorPageResponse
+from app.schemas.employee import EmployeeResponse
+from main import app
+from tests.conftest import make_employee
+
+
+def employee_response(i: int) -> EmployeeResponse:
+    return EmployeeResponse.model_validate(make_employee(i, id=i + 1))
+
+
+@pytest_asyncio.fixture
+async def client(sqlite_engine, monkeypatch):
+    factory = sessionmaker(sqlite_engine, class_=AsyncSession, expire_on_commit=False)
+    monkeypatch.setattr(session_module, "AsyncSessionLocal", factory)
+    async with factory() as db:
+        db.add_all([make_employee(i) for i in range(3)])
+        await db.commit()
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+
+
+@pytest.mark.parametrize("content", [
+    BaseResponse.response(status=1, msg="Xin chào", detail=[employee_response(i) for i in range(3)]),
+    CursorPageResponse(status=1, msg="ok", detail=[employee_response(0)], next_cursor="abc"),
+    BaseResponse.response(status=1, msg="ok", detail={"nested": {"values": [1, 2.5, None]}}),
+    {"status": 1, "msg": "ok", "detail": [employee_response(0)]},
+])
+def test_encode_matches_fastapi_encoding(content):
+    # Act
+    body = encode(content)
+
+    # Assert
+    assert json.loads(body) == jsonable_encoder(content)
+
+
+def test_system_messages_are_pre_encoded(monkeypatch):
+    # Arrange
+    def fail(content):
+        raise AssertionError("encoded again")
+    monkeypatch.setattr(responses_module, "encode", fail)
+
+    # Act
+    wrong_params = FastJSONResponse(SystemMessages.WRONG_PARAMS).body
+    default_error = FastJSONResponse(ErrorResponse.DEFAULT).body
+
+    # Assert
+    assert json.loads(wrong_params) == SystemMessages.WRONG_PARAMS.model_dump()
+    assert json.loads(default_error) == ErrorResponse.DEFAULT
+
+
+@pytest.mark.asyncio
+async def test_endpoints_skip_jsonable_encoder(client, monkeypatch):
+    # Arrange
+    def fail(*args, **kwargs):
+        raise AssertionError("jsonable_encoder called")
+    monkeypatch.setattr("fastapi.routing.jsonable_encoder", fail)
+
+    # Act
+    listed = await client.post("/api/v1/employees/get-list")
+    missing = await client.post("/api/v1/employees/get/999")
+
+    # Assert
+    assert listed.headers["content-type"] == "application/json"
+    assert [employee["id"] for employee in listed.json()["detail"]] == [1, 2, 3]
+    assert missing.json() == SystemMessages.WRONG_PARAMS.model_dump()
@@ -0,0 +1,62 @@
+import pytest
+from loguru import logger
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+from app.core.sql_logging import SqlStatsAggregator, fingerprint, set_request_id, setup_sql_logging
+
+
+def test_fingerprint_normalizes_literals_and_lists():
+    assert fingerprint("SELECT * FROM t WHERE id = 5 AND name = 'x'") == "SELECT * FROM t WHERE id = ? AND name = ?"
+    assert fingerprint("SELECT * FROM t WHERE id IN (%s, %s, %s)") == fingerprint("SELECT * FROM t WHERE id IN (?)")
+    assert fingerprint("INSERT INTO t (a, b) VALUES (?, ?), (?, ?)") == "INSERT INTO t (a, b) VALUES (...)"
+    assert fingerprint("SELECT  t1.id\n FROM t1 WHERE t1.id = :id_1") == "SELECT t1.id FROM t1 WHERE t1.id = ?"
+
+
+@pytest.mark.asyncio
+async def test_aggregates_per_fingerprint_and_flags_n_plus_one():
+    # Arrange
+    engine = create_async_engine("sqlite+aiosqlite://")
+    aggregator = SqlStatsAggregator(slow_query_ms=10_000, n_plus_one_threshold=5)
+    setup_sql_logging(engine, aggregator)
+    set_request_id("req-1")
+
+    # Act
+    async with engine.connect() as conn:
+        for i in range(6):
+            await conn.execute(text("SELECT :value"), {"value": i})
+        await conn.execute(text("SELECT 1, 2"))
+    await engine.dispose()
+    snapshot = aggregator.snapshot()
+
+    # Assert
+    by_sql = {s["sql"]: s for s in snapshot["statements"]}
+    assert by_sql["SELECT ?"]["count"] == 6
+    assert by_sql["SELECT ?, ?"]["count"] == 1
+    assert by_sql["SELECT ?"]["p99_ms"] >= by_sql["SELECT ?"]["p50_ms"]
+    request_stats = aggregator.get_request_stats("req-1")
+    assert request_stats.count == 7
+    assert request_stats.flagged == ["SELECT ?"]
+    assert snapshot["n_plus_one_detected"] == 1
+    assert snapshot["slow_queries"] == 0
+
+
+@pytest.mark.asyncio
+async def test_slow_query_logged_without_values():
+    # Arrange
+    engine = create_async_engine("sqlite+aiosqlite://")
+    aggregator = SqlStatsAggregator(slow_query_ms=0)
+    setup_sql_logging(engine, aggregator)
+    captured = []
+    handler_id = logger.add(lambda message: captured.append(message.record["message"]), level="WARNING")
+
+    # Act
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT 1 WHERE 'x' = :password"), {"password": "hunter2"})
+    await engine.dispose()
+    logger.remove(handler_id)
+
+    # Assert
+    assert aggregator.snapshot()["slow_queries"] == 1
+    assert len(captured) == 1
+    assert captured[0].endswith("SELECT ? WHERE ? = ?")
+    assert "hunter2" not in captured[0] and "'x'" not in captured[0]
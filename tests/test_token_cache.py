@@ -0,0 +1,142 @@
+import time
+from datetime import timedelta
+import pytest
+from fastapi import HTTPException
+from jose import ExpiredSignatureError, JWTError
+import app.core.security as security
+from app.core.security import create_access_token, decode_access_token, get_current_user
+from app.core.token_cache import TokenCache
+
+
+class CountingDecoder:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, token: str) -> dict:
+        self.calls += 1
+        return decode_access_token(token)
+
+
+@pytest.fixture
+def decode():
+    return CountingDecoder()
+
+
+@pytest.fixture
+def token_cache(monkeypatch):
+    cache = TokenCache(max_size=100, max_ttl=300)
+    monkeypatch.setattr(security, "token_cache", cache)
+    return cache
+
+
+def test_repeat_token_skips_verification(decode):
+    # Arrange
+    cache = TokenCache()
+    token = create_access_token({"sub": "alice"})
+
+    # Act
+    first = cache.verify(token, decode)
+    second = cache.verify(token, decode)
+
+    # Assert
+    assert first["sub"] == second["sub"] == "alice"
+    assert decode.calls == 1
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+
+def test_entry_expires_with_token(decode):
+    # Arrange
+    cache = TokenCache()
+    token = create_access_token({"sub": "alice"}, expires_delta=timedelta(seconds=1))
+    cache.verify(token, decode)
+
+    # Act
+    time.sleep(1.1)
+
+    # Assert
+    # jose compares whole seconds, so the token itself may still pass
+    try:
+        cache.verify(token, decode)
+    except ExpiredSignatureError:
+        pass
+    assert decode.calls == 2
+    assert cache.stats()["expirations"] == 1
+
+
+def test_revoked_token_is_refused_on_hit(decode):
+    # Arrange
+    cache = TokenCache()
+    token = create_access_token({"sub": "alice"})
+    other = create_access_token({"sub": "bob"})
+    cache.verify(token, decode)
+    cache.verify(other, decode)
+
+    # Act
+    cache.revoke(token)
+
+    # Assert
+    with pytest.raises(JWTError):
+        cache.verify(token, decode)
+    assert cache.verify(other, decode)["sub"] == "bob"
+    assert cache.stats()["rejections"] == 1
+
+
+def test_revoke_by_jti_covers_cached_entries(decode):
+    # Arrange
+    cache = TokenCache()
+    token = create_access_token({"sub": "alice", "jti": "session-1"})
+    cache.verify(token, decode)
+
+    # Act
+    cache.revoke_id("session-1", time.time() + 60)
+
+    # Assert
+    with pytest.raises(JWTError):
+        cache.verify(token, decode)
+    assert decode.calls == 1
+
+
+def test_invalid_tokens_are_not_cached(decode):
+    # Arrange
+    cache = TokenCache()
+    token = create_access_token({"sub": "alice"})[:-2] + "xx"
+
+    # Act
+    for _ in range(2):
+        with pytest.raises(JWTError):
+            cache.verify(token, decode)
+
+    # Assert
+    assert decode.calls == 2
+    assert len(cache.entries) == 0
+
+
+def test_cache_is_bounded(decode):
+    # Arrange
+    cache = TokenCache(max_size=2)
+
+    # Act
+    for user in ("a", "b", "c"):
+        cache.verify(create_access_token({"sub": user}), decode)
+
+    # Assert
+    assert len(cache.entries) == 2
+    assert cache.stats()["evictions"] == 1
+
+
+@pytest.mark.asyncio
+async def test_get_current_user_uses_cache(token_cache):
+    # Arrange
+    token = create_access_token({"sub": "alice"})
+
+    # Act
+    first = await get_current_user(token)
+    second = await get_current_user(token)
+    token_cache.revoke(token)
+
+    # Assert
+    assert first.username == second.username == "alice"
+    assert token_cache.stats()["hits"] == 1
+    with pytest.raises(HTTPException) as exc_info:
+        await get_current_user(token)
+    assert exc_info.value.status_code == 401
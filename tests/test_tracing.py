@@ -0,0 +1,143 @@
+import httpx
+import pytest
+import pytest_asyncio
+from loguru import logger
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+import app.db.session as session_module
+from app.core.config import settings
+from app.core.global_define import ErrorResponse
+from app.core.sql_logging import setup_sql_logging
+from app.core.tracing import end_trace, start_trace, traced
+from main import app
+from tests.conftest import make_employee
+
+
+class Expensive:
+    reprs = 0
+
+    def __repr__(self):
+        Expensive.reprs += 1
+        return "x" * 10000
+
+
+class Service:
+    @traced("Service")
+    async def outer(self, value, request_id=""):
+        return await self.inner(value)
+
+    @traced("Service")
+    async def inner(self, value):
+        return value
+
+    @traced("Service")
+    async def fail(self):
+        raise RuntimeError("boom")
+
+
+@pytest.fixture
+def messages():
+    captured = []
+    handler_id = logger.add(lambda message: captured.append(message.record), level="INFO")
+    yield captured
+    logger.remove(handler_id)
+
+
+@pytest.fixture
+def sample_all(monkeypatch):
+    monkeypatch.setattr(settings, "TRACE_SAMPLE_RATE", 1.0)
+
+
+@pytest_asyncio.fixture
+async def client(sqlite_engine, monkeypatch):
+    setup_sql_logging(sqlite_engine)
+    factory = sessionmaker(sqlite_engine, class_=AsyncSession, expire_on_commit=False)
+    monkeypatch.setattr(session_module, "AsyncSessionLocal", factory)
+    async with factory() as db:
+        db.add_all([make_employee(i) for i in range(3)])
+        await db.commit()
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+
+
+@pytest.mark.asyncio
+async def test_spans_nest_and_args_are_formatted_lazily():
+    # Arrange
+    Expensive.reprs = 0
+    trace, token = start_trace("r1", sampled=True)
+
+    # Act
+    await Service().outer(Expensive(), request_id="r1")
+    reprs_during_call = Expensive.reprs
+    tree, spans = trace.summary()
+    end_trace(token)
+
+    # Assert
+    assert reprs_during_call == 0
+    assert [(span["name"], span["depth"]) for span in spans] == [("Service.outer", 0), ("Service.inner", 1)]
+    assert len(spans[0]["args"]) <= settings.TRACE_ARG_MAX_LEN + len(", request_id='r1'")
+    assert "Service" not in spans[0]["args"]  # self is left out
+    assert "  Service.inner" in tree
+
+
+@pytest.mark.asyncio
+async def test_unsampled_trace_records_nothing():
+    # Arrange
+    trace, token = start_trace("r2", sampled=False)
+
+    # Act
+    result = await Service().outer(1)
+    end_trace(token)
+
+    # Assert
+    assert result == 1
+    assert trace.spans == []
+
+
+@pytest.mark.asyncio
+async def test_failure_returns_default_error_and_marks_span(messages):
+    # Arrange
+    trace, token = start_trace("r3", sampled=True)
+
+    # Act
+    result = await Service().fail()
+    end_trace(token)
+
+    # Assert
+    assert result is ErrorResponse.DEFAULT
+    assert trace.spans[0].error == "boom"
+    errors = [record for record in messages if record["level"].name == "ERROR"]
+    assert errors[0]["extra"]["request_id"] == "r3"
+
+
+@pytest.mark.asyncio
+async def test_span_limit(monkeypatch):
+    # Arrange
+    monkeypatch.setattr(settings, "TRACE_MAX_SPANS", 3)
+    trace, token = start_trace("r4", sampled=True)
+
+    # Act
+    for _ in range(5):
+        await Service().inner(1)
+    end_trace(token)
+
+    # Assert
+    assert len(trace.spans) == 3
+    assert trace.dropped == 2
+
+
+@pytest.mark.asyncio
+async def test_request_emits_one_summary_with_sql(client, messages, sample_all):
+    # Act
+    await client.post("/api/v1/employees/get-list")
+
+    # Assert
+    summaries = [record for record in messages if "trace" in record["extra"]]
+    assert len(summaries) == 1
+    names = [span["name"] for span in summaries[0]["extra"]["trace"]]
+    assert names[0] == "EmployeeAPI.get_employees"
+    assert "EmployeeService.get_employees" in names
+    assert "EmployeeRepository.get_all" in names
+    assert any(name.startswith("SQL SELECT") for name in names)
+    # No per call log lines any more
+    assert not any(record["message"].startswith("Call ") for record in messages)
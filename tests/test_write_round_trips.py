@@ -0,0 +1,107 @@
+import httpx
+import pytest
+import pytest_asyncio
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+import app.db.session as session_module
+from app.models.employee import Employee
+from main import app
+
+
+class StatementCounter:
+    def __init__(self, engine):
+        self.statements = []
+        self.commits = 0
+        event.listen(engine.sync_engine, "before_cursor_execute", self.on_execute)
+        event.listen(engine.sync_engine, "commit", self.on_commit)
+
+    def on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement.split()[0].upper())
+
+    def on_commit(self, conn):
+        self.commits += 1
+
+    def reset(self):
+        self.statements, self.commits = [], 0
+
+
+@pytest_asyncio.fixture
+async def client(sqlite_engine, monkeypatch):
+    factory = sessionmaker(sqlite_engine, class_=AsyncSession, expire_on_commit=False)
+    monkeypatch.setattr(session_module, "AsyncSessionLocal", factory)
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+
+
+@pytest.fixture
+def counter(sqlite_engine):
+    return StatementCounter(sqlite_engine)
+
+
+EMPLOYEE = dict(name="Nguyen Van A", department="Engineering", role="Developer",
+                type_of_working="Fulltime", hometown="Ha Noi", age=30)
+
+
+@pytest.mark.asyncio
+async def test_create_is_one_insert_and_one_commit(client, counter):
+    # Act
+    response = await client.post("/api/v1/employees/create", json=EMPLOYEE)
+
+    # Assert
+    assert response.json()["detail"]["id"] == 1
+    assert counter.statements == ["INSERT"]
+    assert counter.commits == 1
+
+
+@pytest.mark.asyncio
+async def test_update_is_one_update_returning_and_one_commit(client, counter):
+    # Arrange
+    await client.post("/api/v1/employees/create", json=EMPLOYEE)
+    counter.reset()
+
+    # Act
+    response = await client.post("/api/v1/employees/update/1", json={"id": 1, "age": 31})
+
+    # Assert
+    assert response.json()["detail"]["age"] == 31
+    assert counter.statements == ["UPDATE"]
+    assert counter.commits == 1
+
+
+@pytest.mark.asyncio
+async def test_update_without_returning_is_update_plus_one_read(client, counter, sqlite_engine, monkeypatch):
+    # Arrange
+    await client.post("/api/v1/employees/create", json=EMPLOYEE)
+    monkeypatch.setattr(sqlite_engine.dialect, "update_returning", False)
+    counter.reset()
+
+    # Act
+    response = await client.post("/api/v1/employees/update/1", json={"id": 1, "role": "Manager"})
+
+    # Assert
+    assert response.json()["detail"]["role"] == "Manager"
+    assert counter.statements == ["UPDATE", "SELECT"]
+    assert counter.commits == 1
+
+
+@pytest.mark.asyncio
+async def test_update_missing_employee(client, counter):
+    # Act
+    response = await client.post("/api/v1/employees/update/42", json={"id": 42, "age": 31})
+
+    # Assert
+    assert response.json()["status"] == 400
+    assert counter.statements == ["UPDATE"]
+
+
+@pytest.mark.asyncio
+async def test_bulk_create_is_one_insert_per_batch(client, counter, db_session):
+    # Act
+    response = await client.post("/api/v1/employees/bulk-create?batch_size=10", json=[EMPLOYEE] * 25)
+
+    # Assert
+    assert response.json()["detail"]["created"] == 25
+    assert counter.statements.count("INSERT") == 3
+    assert counter.commits == 1
+    assert len((await db_session.execute(select(Employee.id))).all()) == 25